@@ -2,18 +2,36 @@
 AutoRevise Flask Backend
 """
 
-from flask import Flask, request, jsonify, session
+from flask import Flask, Response, request, jsonify, session, g, has_request_context
 from flask_cors import CORS
-from functools import wraps
+from functools import lru_cache, wraps
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
+from mysql.connector.errors import PoolError
+import base64
+import bisect
 import bcrypt
 import os
 import csv
-import io
+import atexit
+import codecs
+import hashlib
+import json
+import queue
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+import numpy as np
 from datetime import datetime, timedelta, date
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -46,8 +64,8 @@ CORS(app,
         "http://127.0.0.1:8080", "http://localhost:8080",
         "null"  # allow file:// origins (sent as "null")
     ],
-    allow_headers=["Content-Type", "Authorization"],
-    expose_headers=["Content-Type"],
+    allow_headers=["Content-Type", "Authorization", "If-None-Match"],
+    expose_headers=["Content-Type", "ETag"],
     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     max_age=3600,
     send_wildcard=False,
@@ -77,7 +95,9 @@ def after_request(response):
         response.headers['Access-Control-Allow-Origin'] = origin
         response.headers['Access-Control-Allow-Credentials'] = 'true'
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, If-None-Match'
+        # flask-cors adds nothing once Allow-Origin is set here, so expose ETag ourselves
+        response.headers['Access-Control-Expose-Headers'] = 'Content-Type, ETag'
     
     return response
 
@@ -90,29 +110,906 @@ DB_CONFIG = {
 }
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+# Records are handed to a listener thread through a queue so request threads
+# never block on log I/O
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+log_queue = queue.SimpleQueue()
+_log_output = logging.StreamHandler()
+_log_output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+log_listener = QueueListener(log_queue, _log_output, respect_handler_level=True)
+_log_enqueue = QueueHandler(log_queue)
+_log_enqueue.setFormatter(logging.Formatter('%(message)s'))  # the listener's handler formats
+logging.basicConfig(level=LOG_LEVEL, handlers=[_log_enqueue])
+log_listener.start()
+atexit.register(log_listener.stop)
+# The per-request log line below replaces the development server's access log
+logging.getLogger('werkzeug').setLevel(os.environ.get('WERKZEUG_LOG_LEVEL', 'WARNING').upper())
 logger = logging.getLogger(__name__)
 
 
 # DATABASE CONNECTION
 
+# Connection pool settings
+DB_POOL_CONFIG = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+    'borrow_timeout': float(os.environ.get('DB_POOL_BORROW_TIMEOUT', 5)),
+    'health_check_after': float(os.environ.get('DB_POOL_HEALTH_CHECK_AFTER', 30))
+}
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections.
+    Connections idle for longer than health_check_after seconds are pinged
+    before being handed out; borrowers wait at most borrow_timeout seconds.
+    """
+
+    def __init__(self, db_config, min_size=2, max_size=10, borrow_timeout=5.0, health_check_after=30.0):
+        self.db_config = db_config
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.borrow_timeout = borrow_timeout
+        self.health_check_after = health_check_after
+        
+        self._cond = threading.Condition()
+        self._idle = []  # stack of (connection, last_used)
+        self._size = 0   # open connections, idle + in use
+        self._in_use = 0
+        self._prefilled = False
+        
+        # Counters reported by stats()
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+
+    def _connect(self):
+        connection = mysql.connector.connect(**self.db_config)
+        with self._cond:
+            self._created += 1
+        return connection
+
+    def _discard(self, connection):
+        """Close a connection that is no longer usable"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._discarded += 1
+
+    def _prefill(self):
+        """Open min_size connections the first time the pool is used"""
+        with self._cond:
+            if self._prefilled:
+                return
+            self._prefilled = True
+            missing = max(0, self.min_size - self._size)
+            self._size += missing
+        
+        opened = 0
+        try:
+            for _ in range(missing):
+                connection = self._connect()
+                opened += 1
+                with self._cond:
+                    self._idle.append((connection, time.monotonic()))
+                    self._cond.notify()
+        except Error as e:
+            logger.error(f"Connection pool prefill error: {e}")
+        finally:
+            with self._cond:
+                self._size -= missing - opened
+
+    def acquire(self):
+        """Borrow a connection, waiting up to borrow_timeout if the pool is exhausted"""
+        if not self._prefilled:
+            self._prefill()
+        
+        deadline = time.monotonic() + self.borrow_timeout
+        wait_started = None
+        connection = None
+        
+        with self._cond:
+            while True:
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    if wait_started is not None:
+                        self._wait_time += time.monotonic() - wait_started
+                    raise PoolError(f"No database connection available within {self.borrow_timeout}s")
+                
+                if wait_started is None:
+                    wait_started = time.monotonic()
+                    self._waits += 1
+                self._cond.wait(remaining)
+            
+            self._in_use += 1
+            if wait_started is not None:
+                self._wait_time += time.monotonic() - wait_started
+        
+        try:
+            if connection is None:
+                connection = self._connect()
+            elif time.monotonic() - last_used > self.health_check_after:
+                try:
+                    connection.ping(reconnect=False)
+                except Error:
+                    logger.warning("Discarding stale pooled database connection")
+                    self._discard(connection)
+                    connection = self._connect()
+        except Error:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        
+        return connection
+
+    def release(self, connection):
+        """Return a connection to the pool, rolling back any uncommitted work"""
+        healthy = True
+        try:
+            # Ending the transaction also drops the read snapshot so the next borrower sees fresh data
+            if connection.in_transaction:
+                connection.rollback()
+        except Error as e:
+            logger.warning(f"Discarding pooled connection after failed rollback: {e}")
+            healthy = False
+        
+        if not healthy:
+            self._discard(connection)
+        
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+    def stats(self):
+        """Snapshot of pool utilisation"""
+        with self._cond:
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waits': self._waits,
+                'wait_time_ms': round(self._wait_time * 1000, 2),
+                'timeouts': self._timeouts,
+                'created': self._created,
+                'discarded': self._discarded
+            }
+
+db_pool = ConnectionPool(DB_CONFIG, **DB_POOL_CONFIG)
+
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections"""
-    connection = None
+    """
+    Context manager for database connections.
+    Inside a request the same pooled connection is shared by decorators and
+    handlers and returned to the pool when the request ends.
+    """
+    if has_request_context():
+        if 'db_conn' not in g:
+            try:
+                g.db_conn = db_pool.acquire()
+            except Error as e:
+                logger.error(f"Database connection error: {e}")
+                raise
+        yield g.db_conn
+        return
+    
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        yield connection
+        connection = db_pool.acquire()
     except Error as e:
         logger.error(f"Database connection error: {e}")
         raise
+    try:
+        yield connection
     finally:
-        if connection and connection.is_connected():
-            connection.close()
+        db_pool.release(connection)
+
+@app.teardown_appcontext
+def release_db_connection(exception):
+    """Return the request's connection to the pool"""
+    connection = g.pop('db_conn', None)
+    if connection is not None:
+        db_pool.release(connection)
 
 def get_db_cursor(connection):
     """Get a dictionary cursor from connection"""
-    return connection.cursor(dictionary=True)
+    return TimedCursor(connection.cursor(dictionary=True))
+
+# ============================================================================
+# REQUEST LOGGING
+# ============================================================================
+
+# One structured line per request (route, user, status, latency, DB time and
+# query count). Successful requests are sampled; errors and slow requests
+# are always logged.
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', 1.0))
+REQUEST_LOG_SLOW_MS = float(os.environ.get('REQUEST_LOG_SLOW_MS', 1000))
+
+def parse_route_levels(spec):
+    """Parse "endpoint:LEVEL,..." into {endpoint: level number}, skipping unknown levels"""
+    levels = {}
+    for item in spec.split(','):
+        endpoint, _, level = item.partition(':')
+        level = logging.getLevelName(level.strip().upper())
+        if endpoint.strip() and isinstance(level, int):
+            levels[endpoint.strip()] = level
+    return levels
+
+# Level for successful requests per endpoint, e.g. "health_check:DEBUG,get_decks:INFO"
+REQUEST_LOG_LEVELS = parse_route_levels(
+    'health_check:DEBUG,pool_stats:DEBUG,event_queue_stats:DEBUG,metrics:DEBUG,'
+    + os.environ.get('REQUEST_LOG_LEVELS', '')
+)
+
+# Query parameters whose values never reach the logs
+REDACTED_PARAMS = ('password', 'token', 'secret', 'key', 'session', 'cookie', 'cursor')
+
+request_logger = logging.getLogger('autorevise.requests')
+
+class TimedCursor:
+    """
+    Cursor wrapper that adds statement time and count to the current
+    request's totals and to the per-statement aggregates in statement_stats
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, operation, params=None):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params)
+        finally:
+            self._record(operation, params, time.perf_counter() - started)
+
+    def executemany(self, operation, seq_params):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params)
+        finally:
+            self._record(operation, None, time.perf_counter() - started)
+
+    def _record(self, operation, params, elapsed):
+        fingerprint = sql_fingerprint(operation)
+        if has_request_context():
+            route = metrics_route()
+            g.db_time = g.get('db_time', 0.0) + elapsed
+            g.db_queries = g.get('db_queries', 0) + 1
+            if detect_n_plus_one():
+                g.setdefault('statement_counts', Counter())[fingerprint] += 1
+        else:
+            route = 'background'
+        statement_duration.observe((route,), elapsed)
+        statement_stats.record(fingerprint, route, elapsed)
+        if elapsed * 1000 >= SQL_SLOW_MS:
+            statement_stats.record_slow(fingerprint, route, operation, params, elapsed)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+def redact_params(params):
+    return {
+        name: '[REDACTED]' if any(secret in name.lower() for secret in REDACTED_PARAMS) else value
+        for name, value in params.items()
+    }
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def log_request(response):
+    """Emit the request's structured log line"""
+    started = g.get('request_started')
+    if started is None:
+        return response
+    latency_ms = (time.perf_counter() - started) * 1000
+    
+    endpoint = request.endpoint or 'unknown'
+    if response.status_code >= 500:
+        level = logging.ERROR
+    elif response.status_code >= 400:
+        level = logging.WARNING
+    elif latency_ms >= REQUEST_LOG_SLOW_MS:
+        level = logging.WARNING
+    else:
+        level = REQUEST_LOG_LEVELS.get(endpoint, logging.INFO)
+        if REQUEST_LOG_SAMPLE_RATE < 1 and random.random() >= REQUEST_LOG_SAMPLE_RATE:
+            return response
+    
+    if not request_logger.isEnabledFor(level):
+        return response
+    
+    request_logger.log(level, json.dumps({
+        'method': request.method,
+        'route': request.url_rule.rule if request.url_rule else request.path,
+        'endpoint': endpoint,
+        'args': redact_params(request.args),
+        'user_id': session.get('user_id'),
+        'status': response.status_code,
+        'latency_ms': round(latency_ms, 2),
+        'db_ms': round(g.get('db_time', 0.0) * 1000, 2),
+        'db_queries': g.get('db_queries', 0)
+    }))
+    return response
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+# In-process counters exposed by /metrics in the Prometheus text format.
+# Each process (worker) reports its own series; the scraper sums them.
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class Histogram:
+    """Thread-safe histogram with one series per label tuple"""
+
+    def __init__(self, name, description, label_names, buckets=METRICS_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels(self.label_names, labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_bucket{format_labels(self.label_names, labels, [("le", "+Inf")])} {series[-1]}')
+            lines.append(f'{self.name}_sum{format_labels(self.label_names, labels)} {series[-2]}')
+            lines.append(f'{self.name}_count{format_labels(self.label_names, labels)} {series[-1]}')
+        return lines
+
+class CounterMetric:
+    """Thread-safe monotonically increasing counter per label tuple"""
+
+    def __init__(self, name, description, label_names):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            snapshot = dict(self._values)
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f'{self.name}{format_labels(self.label_names, labels)} {value}')
+        return lines
+
+def render_gauge(name, description, samples, label_names=(), metric_type='gauge'):
+    """Lines for a value read at scrape time; samples is [(labels, value)]"""
+    lines = [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}']
+    for labels, value in samples:
+        if value is not None:
+            lines.append(f'{name}{format_labels(label_names, labels)} {value}')
+    return lines
+
+request_duration = Histogram(
+    'autorevise_http_request_duration_seconds', 'Request latency by route, method and status',
+    ('route', 'method', 'status')
+)
+request_db_time = CounterMetric(
+    'autorevise_http_request_db_seconds_total', 'Time spent in database statements by route',
+    ('route',)
+)
+request_db_statements = CounterMetric(
+    'autorevise_http_request_db_statements_total', 'Database statements executed by route',
+    ('route',)
+)
+statement_duration = Histogram(
+    'autorevise_db_statement_duration_seconds',
+    'Latency of individual database statements by route ("background" outside requests)',
+    ('route',)
+)
+
+def metrics_route():
+    """Route template used as a label; unmatched paths share one series"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    route = metrics_route()
+    request_duration.observe(
+        (route, request.method, str(response.status_code)), time.perf_counter() - started
+    )
+    request_db_time.inc((route,), g.get('db_time', 0.0))
+    request_db_statements.inc((route,), g.get('db_queries', 0))
+    return response
+
+def render_metrics():
+    """Current metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in (request_duration, request_db_time, request_db_statements, statement_duration):
+        lines.extend(metric.render())
+    
+    pool = db_pool.stats()
+    for key in ('size', 'in_use', 'idle', 'max_size'):
+        lines.extend(render_gauge(f'autorevise_db_pool_{key}', f'Connection pool {key.replace("_", " ")}', [((), pool[key])]))
+    for key in ('waits', 'timeouts', 'created', 'discarded'):
+        lines.extend(render_gauge(
+            f'autorevise_db_pool_{key}_total', f'Connection pool {key} since start', [((), pool[key])],
+            metric_type='counter'
+        ))
+    lines.extend(render_gauge(
+        'autorevise_db_pool_wait_seconds_total', 'Time spent waiting for a pooled connection',
+        [((), pool['wait_time_ms'] / 1000)], metric_type='counter'
+    ))
+    
+    caches = {
+        'due_queue': due_queue_cache,
+        'deck_owner': deck_owner_cache,
+        'card_deck': card_deck_cache,
+        'admin_status': admin_status_cache,
+        'achievement_catalog': achievement_catalog_cache,
+        'earned_achievements': earned_achievements_cache,
+        'mcq_categories': mcq_category_cache,
+        'forecast': forecast_cache,
+        'schedulers': scheduler_cache
+    }
+    cache_stats = {name: cache.stats() for name, cache in caches.items()}
+    for key, metric_type in (('hits', 'counter'), ('misses', 'counter'), ('entries', 'gauge')):
+        name = f'autorevise_cache_{key}_total' if metric_type == 'counter' else f'autorevise_cache_{key}'
+        lines.extend(render_gauge(
+            name, f'In-process cache {key}',
+            [((cache,), stats[key]) for cache, stats in cache_stats.items()],
+            ('cache',), metric_type
+        ))
+    lines.extend(render_gauge(
+        'autorevise_cache_hit_ratio', 'In-process cache hit ratio since start',
+        [((cache,), stats['hit_ratio']) for cache, stats in cache_stats.items()], ('cache',)
+    ))
+    
+    events = event_queue.stats()
+    lines.extend(render_gauge('autorevise_event_queue_in_flight', 'Claimed events not yet processed', [((), events['in_flight'])]))
+    for key in ('claimed', 'processed', 'failed'):
+        lines.extend(render_gauge(
+            f'autorevise_event_queue_{key}_total', f'Events {key} by this process', [((), events[key])],
+            metric_type='counter'
+        ))
+    lines.extend(render_gauge(
+        'autorevise_event_queue_lag_seconds', 'Delay between enqueue and processing of the last event',
+        [((), events['lag_ms_last'] / 1000 if events['lag_ms_last'] is not None else None)]
+    ))
+    
+    points = points_aggregator.stats()
+    lines.extend(render_gauge(
+        'autorevise_points_folded_total', 'Points ledger entries folded into Users.points by this process',
+        [((), points['folded'])], metric_type='counter'
+    ))
+    
+    review_log_stats = review_log.stats()
+    lines.extend(render_gauge('autorevise_review_log_buffered', 'Review records waiting to be inserted',
+                              [((), review_log_stats['buffered'])]))
+    for key in ('written', 'dropped', 'failed_flushes'):
+        lines.extend(render_gauge(
+            f'autorevise_review_log_{key}_total', f'Review log {key.replace("_", " ")} by this process',
+            [((), review_log_stats[key])], metric_type='counter'
+        ))
+    
+    return '\n'.join(lines) + '\n'
+
+# ============================================================================
+# SQL INSTRUMENTATION
+# ============================================================================
+
+# Every statement run through TimedCursor is aggregated by fingerprint (the
+# SQL with literals and placeholder lists normalized). Statements slower
+# than SQL_SLOW_MS are kept with their parameters so /admin/sql-stats can
+# EXPLAIN them on demand, off the request path.
+SQL_SLOW_MS = float(os.environ.get('SQL_SLOW_MS', 200))
+SQL_SLOW_LOG_SIZE = int(os.environ.get('SQL_SLOW_LOG_SIZE', 50))
+SQL_MAX_FINGERPRINTS = int(os.environ.get('SQL_MAX_FINGERPRINTS', 1000))
+
+# Warn when one request runs the same statement more than this many times.
+# Only checked in debug mode or with SQL_DETECT_N_PLUS_ONE=1.
+SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 10))
+SQL_DETECT_N_PLUS_ONE = os.environ.get('SQL_DETECT_N_PLUS_ONE', '0') == '1'
+
+SQL_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+SQL_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+SQL_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SQL_REPEATED_ROWS = re.compile(r'\(\?\+\)(?:\s*,\s*\(\?\+\))+')
+
+@lru_cache(maxsize=4096)
+def sql_fingerprint(operation):
+    """Normalize a statement so queries differing only in values group together"""
+    sql = ' '.join(operation.split())
+    sql = SQL_STRING_LITERAL.sub('?', sql)
+    sql = SQL_NUMBER_LITERAL.sub('?', sql.replace('%s', '?'))
+    sql = SQL_VALUE_LIST.sub('(?+)', sql)
+    return SQL_REPEATED_ROWS.sub('(?+), ...', sql)
+
+def detect_n_plus_one():
+    return SQL_DETECT_N_PLUS_ONE or app.debug
+
+class StatementStats:
+    """Thread-safe per-fingerprint counts and latency, plus a ring of slow statements"""
+
+    def __init__(self, max_fingerprints, slow_log_size):
+        self.max_fingerprints = max_fingerprints
+        self._stats = {}  # fingerprint -> [count, total seconds, max seconds, {route: count}]
+        self._slow = deque(maxlen=slow_log_size)
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def record(self, fingerprint, route, elapsed):
+        with self._lock:
+            entry = self._stats.get(fingerprint)
+            if entry is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    self._dropped += 1
+                    return
+                entry = self._stats[fingerprint] = [0, 0.0, 0.0, Counter()]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+            entry[3][route] += 1
+
+    def record_slow(self, fingerprint, route, operation, params, elapsed):
+        with self._lock:
+            self._slow.append({
+                'fingerprint': fingerprint,
+                'route': route,
+                'ms': round(elapsed * 1000, 2),
+                'at': datetime.now().isoformat(),
+                'sql': operation,
+                'params': params
+            })
+
+    def top(self, limit, order_by='total'):
+        """The limit statements with the highest total/count/max/avg time"""
+        with self._lock:
+            rows = [
+                {
+                    'fingerprint': fingerprint,
+                    'count': count,
+                    'total_ms': round(total * 1000, 2),
+                    'avg_ms': round(total * 1000 / count, 3),
+                    'max_ms': round(longest * 1000, 2),
+                    'routes': dict(routes.most_common(5))
+                }
+                for fingerprint, (count, total, longest, routes) in self._stats.items()
+            ]
+            dropped = self._dropped
+        key = {'total': 'total_ms', 'count': 'count', 'max': 'max_ms', 'avg': 'avg_ms'}[order_by]
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit], dropped
+
+    def slow(self):
+        with self._lock:
+            return [dict(statement) for statement in self._slow]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self._dropped = 0
+
+statement_stats = StatementStats(SQL_MAX_FINGERPRINTS, SQL_SLOW_LOG_SIZE)
+
+@app.after_request
+def warn_n_plus_one(response):
+    """In debug mode, flag statements repeated within one request"""
+    counts = g.get('statement_counts')
+    if counts:
+        for fingerprint, count in counts.most_common():
+            if count <= SQL_N_PLUS_ONE_THRESHOLD:
+                break
+            logger.warning(f"Possible N+1 in {metrics_route()}: {count} x {fingerprint}")
+    return response
+
+def explain_statement(cursor, statement):
+    """EXPLAIN plan rows for a captured statement, or an error message"""
+    if not statement['sql'].lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')):
+        return {'error': 'Statement cannot be explained'}
+    try:
+        cursor.execute(f"EXPLAIN {statement['sql']}", statement['params'])
+        return cursor.fetchall()
+    except Error as e:
+        return {'error': str(e)}
+
+# ============================================================================
+# IN-PROCESS CACHES
+# ============================================================================
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with optional TTL and hit/miss counters"""
+
+    def __init__(self, max_entries, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+            }
+
+# Caches shared by every user are invalidated across processes (other app
+# workers, maintenance scripts) by touching a stamp file; cached values are
+# only used while the file's mtime is unchanged
+
+def read_stamp(path):
+    """Modification time of a stamp file, or None if it does not exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def touch_stamp(path):
+    """Invalidate caches keyed on this stamp file in every process"""
+    try:
+        with open(path, 'a'):
+            os.utime(path, None)
+    except OSError as e:
+        logger.warning(f"Could not touch stamp file {path}: {e}")
+
+# ============================================================================
+# KEYSET PAGINATION
+# ============================================================================
+
+# Listings are returned newest first in pages of at most MAX_PAGE_SIZE rows,
+# ordered by (created_at, id). Without a limit a request gets the first
+# MAX_PAGE_SIZE rows in the original response shape, which is the whole list
+# for typical decks; next_cursor is set when more rows follow.
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 1000))
+
+def encode_page_cursor(created_at, row_id):
+    """Opaque cursor pointing just past the given row"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_page_cursor(value):
+    """Inverse of encode_page_cursor; raises ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        created_at, row_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {value}") from e
+
+def get_page_args():
+    """
+    Read ?limit= and ?cursor= from the request.
+    Returns: (limit, (created_at, id) or None)
+    Raises: ValueError for a malformed limit or cursor
+    """
+    limit = request.args.get('limit', MAX_PAGE_SIZE)
+    if not str(limit).isdigit() or int(limit) < 1:
+        raise ValueError("limit must be a positive integer")
+    limit = int(limit)
+    
+    after = request.args.get('cursor')
+    return min(limit, MAX_PAGE_SIZE), decode_page_cursor(after) if after else None
+
+def keyset_page(cursor, query, params, created_column, id_column, id_key, limit, after):
+    """
+    Run a listing query one page at a time.
+    query must contain a WHERE clause and end before ORDER BY; the keyset
+    condition, ordering and limit are appended here.
+    Returns: (rows, next_cursor or None)
+    """
+    if after is not None:
+        query += f" AND ({created_column} < %s OR ({created_column} = %s AND {id_column} < %s))"
+        params = tuple(params) + (after[0], after[0], after[1])
+    query += f" ORDER BY {created_column} DESC, {id_column} DESC LIMIT %s"
+    cursor.execute(query, tuple(params) + (limit + 1,))
+    rows = cursor.fetchall()
+    
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_page_cursor(rows[-1]['created_at'], rows[-1][id_key])
+
+# ============================================================================
+# CONDITIONAL REQUESTS
+# ============================================================================
+
+# Read-heavy listings carry an ETag derived from version counters that every
+# write path bumps (UserStats.version per user, Decks.version per deck), so a
+# matching If-None-Match is answered with 304 before the listing query runs.
+
+def make_etag(*parts):
+    """Opaque entity tag for the given validator values"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:32]
+
+def not_modified(etag):
+    """A 304 response if the request already has this version, otherwise None"""
+    if etag is None or not request.if_none_match.contains(etag):
+        return None
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def etag_response(payload, etag):
+    """JSON response carrying the ETag it was generated for"""
+    response = jsonify(payload)
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def get_user_version(cursor, user_id):
+    """The user's content version (UserStats.version), or None if the rollup is not built yet"""
+    cursor.execute("SELECT version FROM UserStats WHERE user_id = %s", (user_id,))
+    row = cursor.fetchone()
+    return row['version'] if row else None
+
+def bump_deck_versions(cursor, deck_ids):
+    """Invalidate the cached card listings of these decks, inside the caller's transaction"""
+    deck_ids = list(deck_ids)
+    placeholders = ', '.join(['%s'] * len(deck_ids))
+    cursor.execute(
+        f"UPDATE Decks SET version = version + 1 WHERE deck_id IN ({placeholders})",
+        tuple(deck_ids)
+    )
+
+# ============================================================================
+# OWNERSHIP INDEX
+# ============================================================================
+
+# Decks never change owner and cards never move between decks, and ids are
+# not reused, so deck_id -> user_id and card_id -> deck_id are cached until
+# the row is deleted. Deletes made by another process only leave entries for
+# rows that no longer exist; the TTL bounds how long those linger.
+OWNERSHIP_CACHE_SIZE = int(os.environ.get('OWNERSHIP_CACHE_SIZE', 100000))
+OWNERSHIP_CACHE_TTL = int(os.environ.get('OWNERSHIP_CACHE_TTL', 3600))
+deck_owner_cache = LRUCache(OWNERSHIP_CACHE_SIZE, ttl=OWNERSHIP_CACHE_TTL)
+card_deck_cache = LRUCache(OWNERSHIP_CACHE_SIZE, ttl=OWNERSHIP_CACHE_TTL)
+
+def get_deck_owner(cursor, deck_id):
+    """user_id owning the deck, or None if it does not exist"""
+    owner = deck_owner_cache.get(deck_id)
+    if owner is None:
+        cursor.execute("SELECT user_id FROM Decks WHERE deck_id = %s", (deck_id,))
+        deck = cursor.fetchone()
+        if not deck:
+            return None
+        owner = deck['user_id']
+        deck_owner_cache.set(deck_id, owner)
+    return owner
+
+def get_card_owners(cursor, card_ids):
+    """{card_id: (deck_id, user_id)} for the cards that exist, one query for any misses"""
+    owners = {}
+    missing = []
+    for card_id in card_ids:
+        deck_id = card_deck_cache.get(card_id)
+        owner = deck_owner_cache.get(deck_id) if deck_id is not None else None
+        if owner is None:
+            missing.append(card_id)
+        else:
+            owners[card_id] = (deck_id, owner)
+    
+    if missing:
+        placeholders = ', '.join(['%s'] * len(missing))
+        cursor.execute(f"""
+            SELECT c.card_id, c.deck_id, d.user_id 
+            FROM Cards c 
+            JOIN Decks d ON c.deck_id = d.deck_id 
+            WHERE c.card_id IN ({placeholders})
+        """, tuple(missing))
+        for row in cursor.fetchall():
+            remember_card(row['card_id'], row['deck_id'], row['user_id'])
+            owners[row['card_id']] = (row['deck_id'], row['user_id'])
+    
+    return owners
+
+def get_card_owner(cursor, card_id):
+    """(deck_id, user_id) of the card, or None if it does not exist"""
+    return get_card_owners(cursor, [card_id]).get(card_id)
+
+def remember_deck(deck_id, user_id):
+    deck_owner_cache.set(deck_id, user_id)
+
+def remember_card(card_id, deck_id, user_id):
+    card_deck_cache.set(card_id, deck_id)
+    deck_owner_cache.set(deck_id, user_id)
+
+def forget_deck(deck_id):
+    """Drop a deleted deck; entries for its cards fail over to the database"""
+    deck_owner_cache.pop(deck_id)
+
+def forget_cards(card_ids):
+    for card_id in card_ids:
+        card_deck_cache.pop(card_id)
+
+def is_missing_parent(error):
+    """True if a write failed because its deck or card no longer exists"""
+    return error.errno in (errorcode.ER_NO_REFERENCED_ROW, errorcode.ER_NO_REFERENCED_ROW_2)
 
 # ============================================================================
 # AUTHENTICATION DECORATOR
@@ -122,23 +1019,44 @@ def login_required(f):
     """Decorator to protect routes that require authentication"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        logger.info(f"=== Authentication Check for {request.path} ===")
-        logger.info(f"Request method: {request.method}")
-        logger.info(f"Origin: {request.headers.get('Origin')}")
-        logger.info(f"Referer: {request.headers.get('Referer')}")
-        logger.info(f"Cookie header: {request.headers.get('Cookie')}")
-        logger.info(f"Session keys: {list(session.keys())}")
-        logger.info(f"Session data: {dict(session)}")
-        logger.info(f"Has user_id in session: {'user_id' in session}")
-        
         if 'user_id' not in session:
-            logger.warning(f"❌ Unauthorized access to {request.path} - No user_id in session")
+            logger.warning(f"Unauthorized access to {request.path} - No user_id in session")
             return jsonify({'error': 'Authentication required'}), 401
         
-        logger.info(f"✅ Authentication successful for user_id: {session.get('user_id')}")
         return f(*args, **kwargs)
     return decorated_function
 
+# Admin status per user, cached for ADMIN_CACHE_TTL seconds. Granting or
+# revoking admin (make_me_admin, revoke_admin, make_admin.py) touches the
+# stamp file so every process re-checks on the next admin request.
+ADMIN_CACHE_TTL = int(os.environ.get('ADMIN_CACHE_TTL', 60))
+ADMIN_STAMP_FILE = os.environ.get(
+    'ADMIN_STAMP_FILE',
+    os.path.join(tempfile.gettempdir(), 'autorevise-admins.stamp')
+)
+admin_status_cache = LRUCache(int(os.environ.get('ADMIN_CACHE_SIZE', 1000)), ttl=ADMIN_CACHE_TTL)
+
+def is_admin_user(user_id):
+    """Whether the user is an admin (cached)"""
+    stamp = read_stamp(ADMIN_STAMP_FILE)
+    cached = admin_status_cache.get(user_id)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    
+    with get_db_connection() as conn:
+        cursor = get_db_cursor(conn)
+        cursor.execute("SELECT is_admin FROM Users WHERE user_id = %s", (user_id,))
+        user = cursor.fetchone()
+    
+    is_admin = bool(user and user.get('is_admin'))
+    admin_status_cache.set(user_id, (stamp, is_admin))
+    return is_admin
+
+def invalidate_admin_status():
+    """Drop cached admin status in this and every other process"""
+    admin_status_cache.clear()
+    touch_stamp(ADMIN_STAMP_FILE)
+
 def admin_required(f):
     """Decorator to protect routes that require admin privileges"""
     @wraps(f)
@@ -149,20 +1067,15 @@ def admin_required(f):
         
         # Check if user is admin
         try:
-            with get_db_connection() as conn:
-                cursor = get_db_cursor(conn)
-                cursor.execute("SELECT is_admin FROM Users WHERE user_id = %s", (session['user_id'],))
-                user = cursor.fetchone()
-                
-                if not user or not user.get('is_admin'):
-                    logger.warning(f"Non-admin user {session['user_id']} attempted to access {request.path}")
-                    return jsonify({'error': 'Admin privileges required'}), 403
-                
-                logger.info(f"Admin access granted for user {session['user_id']} to {request.path}")
-                return f(*args, **kwargs)
+            if not is_admin_user(session['user_id']):
+                logger.warning(f"Non-admin user {session['user_id']} attempted to access {request.path}")
+                return jsonify({'error': 'Admin privileges required'}), 403
         except Error as e:
             logger.error(f"Admin check error: {e}")
             return jsonify({'error': 'Failed to verify admin status'}), 500
+        
+        logger.debug(f"Admin access granted for user {session['user_id']} to {request.path}")
+        return f(*args, **kwargs)
     
     return decorated_function
 
@@ -203,8 +1116,12 @@ def register():
                 "INSERT INTO Users (username, email, password_hash) VALUES (%s, %s, %s)",
                 (username, email, password_hash)
             )
-            conn.commit()
             user_id = cursor.lastrowid
+            
+            # New users start with an initialised, empty statistics rollup and streak
+            cursor.execute("INSERT INTO UserStats (user_id) VALUES (%s)", (user_id,))
+            cursor.execute("INSERT INTO StudyStreaks (user_id) VALUES (%s)", (user_id,))
+            conn.commit()
 
             session.permanent = True
             session['user_id'] = user_id
@@ -239,7 +1156,8 @@ def login():
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             cursor.execute(
-                "SELECT user_id, username, email, password_hash, points, is_admin FROM Users WHERE email = %s",
+                f"SELECT user_id, username, email, password_hash, {CURRENT_POINTS_SQL} as points, is_admin "
+                "FROM Users u WHERE email = %s",
                 (email,)
             )
             user = cursor.fetchone()
@@ -257,9 +1175,6 @@ def login():
             session['username'] = user['username']
 
             logger.info(f"User logged in: {user['username']} (ID: {user['user_id']})")
-            logger.info(f"Session created with ID: {session.get('user_id')}, Cookie will be set")
-            logger.info(f"Session SID: {session.sid if hasattr(session, 'sid') else 'No SID'}")
-            logger.info(f"Session data: {dict(session)}")
             
             response = jsonify({
                 'message': 'Login successful',
@@ -272,9 +1187,6 @@ def login():
                 }
             })
             
-            # Log response headers to see if Set-Cookie is present
-            logger.info(f"Response headers will include: {response.headers.get('Set-Cookie', 'NO SET-COOKIE HEADER')}")
-            
             return response, 200
 
     except Error as e:
@@ -307,6 +1219,7 @@ def make_me_admin():
             # Make user admin
             cursor.execute("UPDATE Users SET is_admin = TRUE WHERE user_id = %s", (session['user_id'],))
             conn.commit()
+            invalidate_admin_status()
             
             logger.info(f"User {session['user_id']} granted admin privileges")
             
@@ -319,6 +1232,32 @@ def make_me_admin():
         logger.error(f"Make admin error: {e}")
         return jsonify({'error': 'Failed to grant admin privileges'}), 500
 
+@app.route('/admin/users/<int:user_id>/revoke-admin', methods=['POST'])
+@admin_required
+def revoke_admin(user_id):
+    """Admin-only: Remove another user's admin privileges"""
+    if user_id == session['user_id']:
+        return jsonify({'error': 'You cannot revoke your own admin privileges'}), 400
+    
+    try:
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            cursor.execute("UPDATE Users SET is_admin = FALSE WHERE user_id = %s AND is_admin", (user_id,))
+            revoked = cursor.rowcount
+            conn.commit()
+        
+        if not revoked:
+            return jsonify({'error': 'User not found or not an admin'}), 404
+        
+        invalidate_admin_status()
+        logger.info(f"Admin privileges of user {user_id} revoked by user {session['user_id']}")
+        
+        return jsonify({'message': 'Admin privileges revoked', 'user_id': user_id}), 200
+    
+    except Error as e:
+        logger.error(f"Revoke admin error: {e}")
+        return jsonify({'error': 'Failed to revoke admin privileges'}), 500
+
 @app.route('/session-check', methods=['GET'])
 def session_check():
     """Debug endpoint to check session status"""
@@ -340,7 +1279,8 @@ def get_current_user():
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             cursor.execute(
-                "SELECT user_id, username, email, points, created_at, is_admin FROM Users WHERE user_id = %s",
+                f"SELECT user_id, username, email, {CURRENT_POINTS_SQL} as points, created_at, is_admin "
+                "FROM Users u WHERE user_id = %s",
                 (session['user_id'],)
             )
             user = cursor.fetchone()
@@ -370,6 +1310,15 @@ def get_decks():
     try:
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
+            
+            # Card counts and due counts only change through writes that bump
+            # the user's version, or when the date changes
+            version = get_user_version(cursor, session['user_id'])
+            etag = make_etag('decks', session['user_id'], version, date.today()) if version is not None else None
+            cached = not_modified(etag)
+            if cached:
+                return cached
+            
             cursor.execute("""
                 SELECT 
                     d.deck_id,
@@ -387,7 +1336,7 @@ def get_decks():
             """, (session['user_id'], session['user_id']))
             
             decks = cursor.fetchall()
-            return jsonify({'decks': decks}), 200
+            return etag_response({'decks': decks}, etag), 200
 
     except Error as e:
         logger.error(f"Get decks error: {e}")
@@ -411,14 +1360,16 @@ def create_deck():
                 "INSERT INTO Decks (user_id, deck_name, description) VALUES (%s, %s, %s)",
                 (session['user_id'], deck_name, description)
             )
-            conn.commit()
             deck_id = cursor.lastrowid
+            adjust_user_stats(cursor, session['user_id'], decks=1)
+            enqueue_events(cursor, session['user_id'], ('deck_created',))
+            conn.commit()
+            event_queue.notify()
+            
+            remember_deck(deck_id, session['user_id'])
 
             logger.info(f"Deck created: {deck_name} (ID: {deck_id}) by user {session['user_id']}")
             
-            # Check for achievement
-            check_deck_achievements(conn, cursor, session['user_id'])
-            
             return jsonify({
                 'message': 'Deck created successfully',
                 'deck_id': deck_id,
@@ -464,18 +1415,57 @@ def delete_deck(deck_id):
             cursor = get_db_cursor(conn)
             
             # Check ownership
-            cursor.execute("SELECT user_id FROM Decks WHERE deck_id = %s", (deck_id,))
-            deck = cursor.fetchone()
+            owner = get_deck_owner(cursor, deck_id)
             
-            if not deck:
+            if owner is None:
                 return jsonify({'error': 'Deck not found'}), 404
             
-            if deck['user_id'] != session['user_id']:
+            if owner != session['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
+            # Cards removed with the deck, grouped by due date (NULL = never reviewed)
+            cursor.execute("""
+                SELECT cp.next_review_date, COUNT(*) as count
+                FROM Cards c
+                LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = %s
+                WHERE c.deck_id = %s
+                GROUP BY cp.next_review_date
+            """, (session['user_id'], deck_id))
+            removed = cursor.fetchall()
+            
+            # MCQs are shared, so their due dates leave other users' histograms too
+            cursor.execute("""
+                SELECT p.user_id, p.next_review_date, COUNT(*) as count
+                FROM MCQ_Questions m
+                JOIN MCQ_Performance p ON p.mcq_id = m.mcq_id
+                JOIN UserStats s ON s.user_id = p.user_id
+                WHERE m.deck_id = %s AND p.next_review_date IS NOT NULL
+                GROUP BY p.user_id, p.next_review_date
+            """, (deck_id,))
+            removed_mcqs = cursor.fetchall()
+            
             cursor.execute("DELETE FROM Decks WHERE deck_id = %s", (deck_id,))
+            if not cursor.rowcount:
+                # Deleted through another worker since it was cached
+                conn.rollback()
+                forget_deck(deck_id)
+                return jsonify({'error': 'Deck not found'}), 404
+            
+            adjust_user_stats(
+                cursor, session['user_id'],
+                decks=-1,
+                cards=-sum(row['count'] for row in removed),
+                reviewed=-sum(row['count'] for row in removed if row['next_review_date']),
+                due_changes={row['next_review_date']: -row['count'] for row in removed if row['next_review_date']}
+            )
+            adjust_due_histogram(cursor, {
+                (row['user_id'], row['next_review_date']): (0, -row['count']) for row in removed_mcqs
+            })
             conn.commit()
             
+            forget_deck(deck_id)
+            due_queue_invalidate(session['user_id'], deck_id)
+            
             logger.info(f"Deck deleted: ID {deck_id} by user {session['user_id']}")
             return jsonify({'message': 'Deck deleted successfully'}), 200
 
@@ -490,23 +1480,41 @@ def delete_deck(deck_id):
 @app.route('/decks/<int:deck_id>/cards', methods=['GET'])
 @login_required
 def get_cards(deck_id):
-    """Get all cards in a deck"""
+    """Get the cards in a deck, newest first (?limit=&cursor= to page)"""
+    try:
+        limit, after = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     try:
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             
-            # Verify deck ownership
-            cursor.execute("SELECT user_id FROM Decks WHERE deck_id = %s", (deck_id,))
+            # Verify deck ownership; the version is needed anyway, so read both at once
+            cursor.execute("SELECT user_id, version FROM Decks WHERE deck_id = %s", (deck_id,))
             deck = cursor.fetchone()
             
             if not deck:
+                forget_deck(deck_id)
                 return jsonify({'error': 'Deck not found'}), 404
             
-            if deck['user_id'] != session['user_id']:
+            owner = deck['user_id']
+            remember_deck(deck_id, owner)
+            
+            if owner != session['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
+            # Card status depends on the date as well as the deck's version
+            etag = make_etag(
+                'cards', deck_id, owner, deck['version'], date.today(),
+                limit, request.args.get('cursor')
+            )
+            cached = not_modified(etag)
+            if cached:
+                return cached
+            
             # Get cards with performance data
-            cursor.execute("""
+            cards, next_cursor = keyset_page(cursor, """
                 SELECT 
                     c.card_id,
                     c.front_content,
@@ -524,11 +1532,9 @@ def get_cards(deck_id):
                 FROM Cards c
                 LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = %s
                 WHERE c.deck_id = %s
-                ORDER BY c.created_at DESC
-            """, (session['user_id'], deck_id))
+            """, (session['user_id'], deck_id), 'c.created_at', 'c.card_id', 'card_id', limit, after)
             
-            cards = cursor.fetchall()
-            return jsonify({'cards': cards}), 200
+            return etag_response({'cards': cards, 'next_cursor': next_cursor}, etag), 200
 
     except Error as e:
         logger.error(f"Get cards error: {e}")
@@ -550,27 +1556,38 @@ def create_card(deck_id):
             cursor = get_db_cursor(conn)
             
             # Verify deck ownership
-            cursor.execute("SELECT user_id FROM Decks WHERE deck_id = %s", (deck_id,))
-            deck = cursor.fetchone()
+            owner = get_deck_owner(cursor, deck_id)
             
-            if not deck:
+            if owner is None:
                 return jsonify({'error': 'Deck not found'}), 404
             
-            if deck['user_id'] != session['user_id']:
+            if owner != session['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
             # Insert card
-            cursor.execute(
-                "INSERT INTO Cards (deck_id, front_content, back_content) VALUES (%s, %s, %s)",
-                (deck_id, front_content, back_content)
-            )
-            conn.commit()
+            try:
+                cursor.execute(
+                    "INSERT INTO Cards (deck_id, front_content, back_content) VALUES (%s, %s, %s)",
+                    (deck_id, front_content, back_content)
+                )
+            except Error as e:
+                if not is_missing_parent(e):
+                    raise
+                # Deleted through another worker since it was cached
+                conn.rollback()
+                forget_deck(deck_id)
+                return jsonify({'error': 'Deck not found'}), 404
             card_id = cursor.lastrowid
+            version_bumped = adjust_user_stats(cursor, session['user_id'], cards=1)
+            bump_deck_versions(cursor, [deck_id])
+            enqueue_events(cursor, session['user_id'], ('cards_added',))
+            conn.commit()
+            event_queue.notify()
             
             logger.info(f"Card created: ID {card_id} in deck {deck_id}")
             
-            # Check for card-related achievements
-            check_card_achievements(conn, cursor, session['user_id'])
+            remember_card(card_id, deck_id, session['user_id'])
+            due_queue_add_new(session['user_id'], deck_id, card_id, version_bumped)
             
             return jsonify({
                 'message': 'Card created successfully',
@@ -599,24 +1616,19 @@ def update_card(card_id):
             cursor = get_db_cursor(conn)
             
             # Verify ownership through deck
-            cursor.execute("""
-                SELECT d.user_id 
-                FROM Cards c 
-                JOIN Decks d ON c.deck_id = d.deck_id 
-                WHERE c.card_id = %s
-            """, (card_id,))
-            
-            card = cursor.fetchone()
+            card = get_card_owner(cursor, card_id)
             if not card:
                 return jsonify({'error': 'Card not found'}), 404
             
-            if card['user_id'] != session['user_id']:
+            deck_id, owner = card
+            if owner != session['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
             cursor.execute(
                 "UPDATE Cards SET front_content = %s, back_content = %s WHERE card_id = %s",
                 (front_content, back_content, card_id)
             )
+            bump_deck_versions(cursor, [deck_id])
             conn.commit()
             
             return jsonify({'message': 'Card updated successfully'}), 200
@@ -634,93 +1646,176 @@ def delete_card(card_id):
             cursor = get_db_cursor(conn)
             
             # Verify ownership through deck
-            cursor.execute("""
-                SELECT d.user_id 
-                FROM Cards c 
-                JOIN Decks d ON c.deck_id = d.deck_id 
-                WHERE c.card_id = %s
-            """, (card_id,))
-            
-            card = cursor.fetchone()
+            card = get_card_owner(cursor, card_id)
             if not card:
                 return jsonify({'error': 'Card not found'}), 404
             
-            if card['user_id'] != session['user_id']:
+            deck_id, owner = card
+            if owner != session['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
-            cursor.execute("DELETE FROM Cards WHERE card_id = %s", (card_id,))
-            conn.commit()
-            
+            cursor.execute("""
+                SELECT next_review_date FROM CardPerformance 
+                WHERE user_id = %s AND card_id = %s
+            """, (session['user_id'], card_id))
+            performance = cursor.fetchone()
+            
+            cursor.execute("DELETE FROM Cards WHERE card_id = %s", (card_id,))
+            if not cursor.rowcount:
+                # Deleted through another worker since it was cached
+                conn.rollback()
+                forget_cards([card_id])
+                return jsonify({'error': 'Card not found'}), 404
+            
+            reviewed = performance is not None
+            version_bumped = adjust_user_stats(
+                cursor, session['user_id'],
+                cards=-1,
+                reviewed=-1 if reviewed else 0,
+                due_changes={performance['next_review_date']: -1} if reviewed else None
+            )
+            bump_deck_versions(cursor, [deck_id])
+            conn.commit()
+            
+            forget_cards([card_id])
+            due_queue_remove(session['user_id'], [deck_id], [card_id], version_bumped)
+            
             return jsonify({'message': 'Card deleted successfully'}), 200
 
     except Error as e:
         logger.error(f"Delete card error: {e}")
         return jsonify({'error': 'Failed to delete card'}), 500
 
+# Rows validated and inserted per transaction by the bulk card import
+CARD_IMPORT_CHUNK_SIZE = int(os.environ.get('CARD_IMPORT_CHUNK_SIZE', 1000))
+
+# At most this many per-row failures are listed in the import response
+MAX_REPORTED_FAILURES = 100
+
+# Accepted column names for the two sides of a card, in order of preference
+CARD_FRONT_COLUMNS = ('front_content', 'Question', 'question', 'front')
+CARD_BACK_COLUMNS = ('back_content', 'Answer', 'answer', 'back')
+
+def card_content(row):
+    """Front and back text of an uploaded card row, or None when either is missing"""
+    front_content = next((row[key] for key in CARD_FRONT_COLUMNS if row.get(key)), None)
+    back_content = next((row[key] for key in CARD_BACK_COLUMNS if row.get(key)), None)
+    if not front_content or not back_content:
+        return None
+    front_content = str(front_content).strip()
+    back_content = str(back_content).strip()
+    if not front_content or not back_content:
+        return None
+    return front_content, back_content
+
 @app.route('/decks/<int:deck_id>/upload-cards', methods=['POST'])
 @login_required
 def upload_cards_bulk(deck_id):
-    """Bulk upload cards from CSV data"""
+    """
+    Bulk upload cards, either as a JSON body {'cards': [...]} or as a
+    multipart CSV file ('file') that is parsed as a stream
+    """
     try:
-        data = request.get_json()
-        cards_data = data.get('cards', [])
+        file = request.files.get('file')
+        
+        if file is not None:
+            if not file.filename.endswith('.csv'):
+                return jsonify({'error': 'File must be a CSV'}), 400
+            
+            # Decode line by line so the upload is never held in memory
+            csv_reader = csv.DictReader(codecs.iterdecode(file.stream, 'utf-8-sig'))
+            columns = [name.strip().lower() for name in csv_reader.fieldnames or []]
+            if len(columns) < 2:
+                return jsonify({
+                    'error': 'CSV must have a question and an answer column',
+                    'found': csv_reader.fieldnames
+                }), 400
+            
+            # Same header rules as the deck view preview: known names in any
+            # case, otherwise the first two columns
+            if not any(col in columns for col in CARD_FRONT_COLUMNS):
+                columns[0] = 'front'
+            if not any(col in columns for col in CARD_BACK_COLUMNS):
+                columns[1] = 'back'
+            csv_reader.fieldnames = columns
+            cards_data = csv_reader
+        else:
+            data = request.get_json()
+            cards_data = data.get('cards', [])
 
-        if not cards_data or not isinstance(cards_data, list):
-            return jsonify({'error': 'Invalid cards data. Expected array of cards.'}), 400
+            if not cards_data or not isinstance(cards_data, list):
+                return jsonify({'error': 'Invalid cards data. Expected array of cards.'}), 400
 
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             
             # Verify deck ownership
-            cursor.execute("SELECT user_id FROM Decks WHERE deck_id = %s", (deck_id,))
-            deck = cursor.fetchone()
+            owner = get_deck_owner(cursor, deck_id)
             
-            if not deck:
+            if owner is None:
                 return jsonify({'error': 'Deck not found'}), 404
             
-            if deck['user_id'] != session['user_id']:
+            if owner != session['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
-            # Validate and insert cards
+            # Validate and insert cards, one chunk per transaction
             inserted_count = 0
+            failed_count = 0
             failed_cards = []
+            total = 0
+            chunk = []
             
-            for idx, card in enumerate(cards_data):
-                front_content = card.get('front_content') or card.get('Question') or card.get('question')
-                back_content = card.get('back_content') or card.get('Answer') or card.get('answer')
+            def flush(chunk):
+                inserted, failures = insert_card_chunk(cursor, deck_id, chunk)
+                if inserted:
+                    # The event commits with its chunk, so cards kept by a
+                    # partly failed upload still reach the achievement workers
+                    adjust_user_stats(cursor, session['user_id'], cards=inserted)
+                    bump_deck_versions(cursor, [deck_id])
+                    enqueue_events(cursor, session['user_id'], ('cards_added',))
+                conn.commit()
+                return inserted, failures
+            
+            try:
+                for idx, card in enumerate(cards_data, start=1):
+                    total = idx
+                    content = card_content(card) if isinstance(card, dict) else None
                 
-                if not front_content or not back_content:
-                    failed_cards.append({
-                        'index': idx + 1,
-                        'reason': 'Missing question or answer'
-                    })
-                    continue
+                    if content is None:
+                        failed_count += 1
+                        if len(failed_cards) < MAX_REPORTED_FAILURES:
+                            failed_cards.append({
+                                'index': idx,
+                                'reason': 'Missing question or answer'
+                            })
+                        continue
                 
-                try:
-                    cursor.execute(
-                        "INSERT INTO Cards (deck_id, front_content, back_content) VALUES (%s, %s, %s)",
-                        (deck_id, str(front_content).strip(), str(back_content).strip())
-                    )
-                    inserted_count += 1
-                except Error as e:
-                    failed_cards.append({
-                        'index': idx + 1,
-                        'reason': str(e)
-                    })
+                    chunk.append((idx, content))
+                    if len(chunk) >= CARD_IMPORT_CHUNK_SIZE:
+                        inserted, failures = flush(chunk)
+                        inserted_count += inserted
+                        failed_count += len(failures)
+                        failed_cards.extend(failures[:MAX_REPORTED_FAILURES - len(failed_cards)])
+                        chunk = []
             
-            conn.commit()
-            
-            # Check for achievements
-            if inserted_count > 0:
-                check_card_achievements(conn, cursor, session['user_id'])
+                if chunk:
+                    inserted, failures = flush(chunk)
+                    inserted_count += inserted
+                    failed_count += len(failures)
+                    failed_cards.extend(failures[:MAX_REPORTED_FAILURES - len(failed_cards)])
+            finally:
+                # Earlier chunks stay committed even if a later one failed
+                if inserted_count > 0:
+                    event_queue.notify()
+                    due_queue_invalidate(session['user_id'], deck_id)
             
             logger.info(f"Bulk upload: {inserted_count} cards added to deck {deck_id} by user {session['user_id']}")
             
             response = {
                 'message': f'Successfully added {inserted_count} card(s)',
                 'inserted': inserted_count,
-                'failed': len(failed_cards),
-                'total': len(cards_data)
+                'failed': failed_count,
+                'total': total
             }
             
             if failed_cards:
@@ -728,13 +1823,292 @@ def upload_cards_bulk(deck_id):
             
             return jsonify(response), 201
 
+    except (UnicodeDecodeError, csv.Error) as e:
+        logger.error(f"Bulk upload parse error: {e}")
+        return jsonify({'error': f'Could not read CSV file: {e}'}), 400
     except Error as e:
         logger.error(f"Bulk upload error: {e}")
         return jsonify({'error': 'Failed to upload cards'}), 500
 
+def insert_card_chunk(cursor, deck_id, chunk):
+    """
+    Insert a chunk of validated (index, (front, back)) cards with one
+    multi-row statement. If the statement is rejected, the chunk is retried
+    row by row so the offending rows can be reported.
+    Returns: (inserted count, list of failures)
+    """
+    query = "INSERT INTO Cards (deck_id, front_content, back_content) VALUES (%s, %s, %s)"
+    try:
+        cursor.executemany(query, [(deck_id, front, back) for _, (front, back) in chunk])
+        return len(chunk), []
+    except Error:
+        pass
+    
+    inserted = 0
+    failures = []
+    for idx, (front, back) in chunk:
+        try:
+            cursor.execute(query, (deck_id, front, back))
+            inserted += 1
+        except Error as e:
+            failures.append({'index': idx, 'reason': str(e)})
+    return inserted, failures
+
+
+# ============================================================================
+# LOAD BALANCING
+# ============================================================================
+
+# SM-2 intervals are deterministic, so cards reviewed (or imported) together
+# come due together. Intervals of at least LOAD_BALANCE_MIN_INTERVAL days are
+# moved within a fuzz window to the day with the fewest cards already due
+# for the user (UserDueHistogram). Daily caps on new cards and reviews, when
+# set, bound how much of the queue a study session hands out per day.
+LOAD_BALANCE_ENABLED = os.environ.get('LOAD_BALANCE_ENABLED', '1') == '1'
+LOAD_BALANCE_MIN_INTERVAL = int(os.environ.get('LOAD_BALANCE_MIN_INTERVAL', 3))
+LOAD_BALANCE_FUZZ = float(os.environ.get('LOAD_BALANCE_FUZZ', 0.1))
+LOAD_BALANCE_MAX_FUZZ_DAYS = int(os.environ.get('LOAD_BALANCE_MAX_FUZZ_DAYS', 7))
+
+# 0 = unlimited
+DAILY_NEW_CARD_LIMIT = int(os.environ.get('DAILY_NEW_CARD_LIMIT', 0))
+DAILY_REVIEW_LIMIT = int(os.environ.get('DAILY_REVIEW_LIMIT', 0))
+
+def fuzz_window(interval):
+    """(shortest, longest) interval the scheduler may use instead of interval"""
+    if not LOAD_BALANCE_ENABLED or interval < LOAD_BALANCE_MIN_INTERVAL:
+        return interval, interval
+    delta = min(max(1, round(interval * LOAD_BALANCE_FUZZ)), LOAD_BALANCE_MAX_FUZZ_DAYS)
+    return max(1, interval - delta), interval + delta
+
+def balance_intervals(cursor, user_id, intervals, today=None):
+    """
+    Move each interval within its fuzz window to the day with the fewest cards
+    due for the user (ties: closest to the original, then earlier). Cards
+    earlier in the list count towards the load seen by later ones.
+    """
+    windows = [fuzz_window(interval) for interval in intervals]
+    fuzzed = [window for window in windows if window[0] != window[1]]
+    if not fuzzed:
+        return list(intervals)
+    
+    today = today or date.today()
+    cursor.execute("""
+        SELECT due_date, card_count FROM UserDueHistogram
+        WHERE user_id = %s AND due_date BETWEEN %s AND %s
+    """, (
+        user_id,
+        today + timedelta(days=min(low for low, _ in fuzzed)),
+        today + timedelta(days=max(high for _, high in fuzzed))
+    ))
+    load = Counter({(row['due_date'] - today).days: row['card_count'] for row in cursor.fetchall()})
+    
+    balanced = []
+    for interval, (low, high) in zip(intervals, windows):
+        if low != high:
+            interval = min(range(low, high + 1), key=lambda days: (load[days], abs(days - interval), days))
+        load[interval] += 1
+        balanced.append(interval)
+    return balanced
+
+def daily_allowance(cursor, user_id):
+    """(new cards, reviews) the user may still study today; None = unlimited"""
+    if not DAILY_NEW_CARD_LIMIT and not DAILY_REVIEW_LIMIT:
+        return None, None
+    
+    cursor.execute("""
+        SELECT cards_reviewed, new_cards_reviewed FROM StudyLog
+        WHERE user_id = %s AND study_date = %s
+    """, (user_id, date.today()))
+    today = cursor.fetchone() or {'cards_reviewed': 0, 'new_cards_reviewed': 0}
+    
+    new_left = max(DAILY_NEW_CARD_LIMIT - today['new_cards_reviewed'], 0) if DAILY_NEW_CARD_LIMIT else None
+    reviews_done = today['cards_reviewed'] - today['new_cards_reviewed']
+    reviews_left = max(DAILY_REVIEW_LIMIT - reviews_done, 0) if DAILY_REVIEW_LIMIT else None
+    return new_left, reviews_left
+
 
 # SPACED REPETITION STUDY SYSTEM
 
+# Points awarded per review rating
+REVIEW_POINTS = {'forgot': 5, 'hard': 10, 'good': 15, 'easy': 20}
+
+# Maximum number of ratings accepted by /submit-reviews in one request
+MAX_REVIEW_BATCH = int(os.environ.get('MAX_REVIEW_BATCH', 200))
+
+
+# Per-user (and per-deck) queues of due card ids, so starting a session does
+# not re-sort the user's whole collection
+DUE_QUEUE_MAX_ENTRIES = int(os.environ.get('DUE_QUEUE_MAX_ENTRIES', 10000))
+DUE_QUEUE_MAX_CARDS = int(os.environ.get('DUE_QUEUE_MAX_CARDS', 1000))
+
+due_queue_cache = LRUCache(DUE_QUEUE_MAX_ENTRIES)
+due_queue_lock = threading.Lock()
+
+class DueQueue:
+    """
+    Ordered card ids due for one user (optionally one deck) on built_for.
+    New cards come first in creation order, then reviewed cards by due date,
+    matching the ORDER BY of the original study session query.
+    version is the user's UserStats.version the queue reflects; changes made
+    through another worker bump it, so a queue behind it is rebuilt.
+    new_complete / due_complete are False when that part was truncated at
+    DUE_QUEUE_MAX_CARDS; the parts are loaded separately so a large import
+    of new cards cannot push every due review out of the queue.
+    """
+
+    def __init__(self, built_for, version, new_ids, due_ids, new_complete, due_complete):
+        self.built_for = built_for
+        self.version = version
+        self.new_ids = dict.fromkeys(new_ids)  # dicts used as ordered sets
+        self.due_ids = dict.fromkeys(due_ids)
+        self.new_complete = new_complete
+        self.due_complete = due_complete
+
+    def __len__(self):
+        return len(self.new_ids) + len(self.due_ids)
+
+    def runs_short(self, min_length):
+        """True if a truncated part holds fewer than min_length ids"""
+        return ((not self.new_complete and len(self.new_ids) < min_length)
+                or (not self.due_complete and len(self.due_ids) < min_length))
+
+    def head(self, limit, new_limit=None, due_limit=None):
+        """First limit ids, taking at most new_limit new and due_limit reviewed cards"""
+        with due_queue_lock:
+            ids = list(self.new_ids)[:limit if new_limit is None else min(limit, new_limit)]
+            due_count = limit - len(ids) if due_limit is None else min(limit - len(ids), due_limit)
+            ids.extend(list(self.due_ids)[:due_count])
+            return ids
+
+    def discard(self, card_ids):
+        with due_queue_lock:
+            for card_id in card_ids:
+                self.new_ids.pop(card_id, None)
+                self.due_ids.pop(card_id, None)
+
+    def append_new(self, card_id):
+        with due_queue_lock:
+            # A truncated queue may have cut off older new cards; leave it to the next rebuild
+            if self.new_complete:
+                self.new_ids[card_id] = None
+
+def build_due_queue(cursor, user_id, deck_id=None):
+    """Load the ordered ids of cards due today and cache them"""
+    # Read before the cards, so a change committed in between shows as a newer version
+    version = get_user_version(cursor, user_id)
+    
+    deck_filter = "AND d.deck_id = %s" if deck_id else ""
+    deck_params = (deck_id,) if deck_id else ()
+    
+    # New cards, then due cards, each up to DUE_QUEUE_MAX_CARDS (+1 to detect truncation)
+    parts = []
+    for condition, order in (
+        ("cp.next_review_date IS NULL", "c.created_at ASC, c.card_id ASC"),
+        ("cp.next_review_date <= CURDATE()", "cp.next_review_date ASC, c.created_at ASC, c.card_id ASC")
+    ):
+        cursor.execute(f"""
+            SELECT c.card_id
+            FROM Cards c
+            JOIN Decks d ON c.deck_id = d.deck_id
+            LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = %s
+            WHERE d.user_id = %s {deck_filter}
+            AND {condition}
+            ORDER BY {order}
+            LIMIT %s
+        """, (user_id, user_id, *deck_params, DUE_QUEUE_MAX_CARDS + 1))
+        parts.append([row['card_id'] for row in cursor.fetchall()])
+    
+    new_ids, due_ids = parts
+    queue = DueQueue(
+        date.today(),
+        version,
+        new_ids[:DUE_QUEUE_MAX_CARDS],
+        due_ids[:DUE_QUEUE_MAX_CARDS],
+        len(new_ids) <= DUE_QUEUE_MAX_CARDS,
+        len(due_ids) <= DUE_QUEUE_MAX_CARDS
+    )
+    due_queue_cache.set((user_id, deck_id), queue)
+    return queue
+
+def get_due_queue(cursor, user_id, deck_id=None, min_length=0):
+    """
+    Cached due queue, rebuilt at day rollover, when it has run short, or when
+    the user's cards changed through another worker (or before the rollup
+    that versions them was built)
+    """
+    queue = due_queue_cache.get((user_id, deck_id))
+    if (queue is None or queue.built_for != date.today() or queue.runs_short(min_length)
+            or queue.version is None or queue.version != get_user_version(cursor, user_id)):
+        queue = build_due_queue(cursor, user_id, deck_id)
+    return queue
+
+def due_queue_keys(user_id, deck_ids):
+    return [(user_id, None)] + [(user_id, deck_id) for deck_id in deck_ids]
+
+def due_queue_remove(user_id, deck_ids, card_ids, version_bumped=False):
+    """
+    Drop reviewed or deleted cards from the user's cached queues.
+    version_bumped: the change bumped UserStats.version once, so queues that
+    were current stay current
+    """
+    for key in due_queue_keys(user_id, deck_ids):
+        queue = due_queue_cache.get(key)
+        if queue is not None:
+            queue.discard(card_ids)
+            if version_bumped and queue.version is not None:
+                queue.version += 1
+
+def due_queue_add_new(user_id, deck_id, card_id, version_bumped=False):
+    """Add a newly created card to the user's cached queues (see due_queue_remove)"""
+    for key in due_queue_keys(user_id, [deck_id]):
+        queue = due_queue_cache.get(key)
+        if queue is not None:
+            queue.append_new(card_id)
+            if version_bumped and queue.version is not None:
+                queue.version += 1
+
+def due_queue_invalidate(user_id, deck_id=None):
+    """Forget the user's overall queue and the deck's queue; they are rebuilt on next use"""
+    due_queue_cache.pop((user_id, None))
+    if deck_id:
+        due_queue_cache.pop((user_id, deck_id))
+
+def load_session_cards(cursor, user_id, card_ids):
+    """
+    Hydrate queued card ids by primary key, in queue order.
+    Returns: (cards, stale ids that were deleted or are no longer due)
+    """
+    if not card_ids:
+        return [], []
+    
+    placeholders = ', '.join(['%s'] * len(card_ids))
+    cursor.execute(f"""
+        SELECT 
+            c.card_id,
+            c.deck_id,
+            c.front_content,
+            c.back_content,
+            d.deck_name,
+            cp.next_review_date,
+            cp.interval,
+            cp.ease_factor
+        FROM Cards c
+        JOIN Decks d ON c.deck_id = d.deck_id
+        LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = %s
+        WHERE c.card_id IN ({placeholders}) AND d.user_id = %s
+    """, (user_id, *card_ids, user_id))
+    
+    by_id = {card['card_id']: card for card in cursor.fetchall()}
+    today = date.today()
+    
+    stale = [
+        card_id for card_id in card_ids
+        if card_id not in by_id
+        or (by_id[card_id]['next_review_date'] is not None
+            and by_id[card_id]['next_review_date'] > today)
+    ]
+    cards = [by_id[card_id] for card_id in card_ids if card_id not in stale]
+    return cards, stale
 
 @app.route('/study-session', methods=['GET'])
 @login_required
@@ -747,64 +2121,32 @@ def get_study_session():
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             
-            # Build query based on whether deck_id is specified
             if deck_id:
                 # Verify deck ownership
-                cursor.execute("SELECT user_id FROM Decks WHERE deck_id = %s", (deck_id,))
-                deck = cursor.fetchone()
+                owner = get_deck_owner(cursor, deck_id)
                 
-                if not deck:
+                if owner is None:
                     return jsonify({'error': 'Deck not found'}), 404
                 
-                if deck['user_id'] != session['user_id']:
+                if owner != session['user_id']:
                     return jsonify({'error': 'Unauthorized'}), 403
-                
-                # Get due cards from specific deck
-                query = """
-                    SELECT 
-                        c.card_id,
-                        c.deck_id,
-                        c.front_content,
-                        c.back_content,
-                        d.deck_name,
-                        cp.next_review_date,
-                        cp.interval,
-                        cp.ease_factor
-                    FROM Cards c
-                    JOIN Decks d ON c.deck_id = d.deck_id
-                    LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = %s
-                    WHERE d.deck_id = %s AND d.user_id = %s
-                    AND (cp.next_review_date IS NULL OR cp.next_review_date <= CURDATE())
-                    ORDER BY cp.next_review_date ASC, c.created_at ASC
-                    LIMIT %s
-                """
-                cursor.execute(query, (session['user_id'], deck_id, session['user_id'], limit))
-            else:
-                # Get due cards from all decks
-                query = """
-                    SELECT 
-                        c.card_id,
-                        c.deck_id,
-                        c.front_content,
-                        c.back_content,
-                        d.deck_name,
-                        cp.next_review_date,
-                        cp.interval,
-                        cp.ease_factor
-                    FROM Cards c
-                    JOIN Decks d ON c.deck_id = d.deck_id
-                    LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = %s
-                    WHERE d.user_id = %s
-                    AND (cp.next_review_date IS NULL OR cp.next_review_date <= CURDATE())
-                    ORDER BY cp.next_review_date ASC, c.created_at ASC
-                    LIMIT %s
-                """
-                cursor.execute(query, (session['user_id'], session['user_id'], limit))
             
-            cards = cursor.fetchall()
+            queue = get_due_queue(cursor, session['user_id'], deck_id, min_length=limit)
+            new_left, reviews_left = daily_allowance(cursor, session['user_id'])
+            card_ids = queue.head(limit, new_limit=new_left, due_limit=reviews_left)
+            cards, stale = load_session_cards(cursor, session['user_id'], card_ids)
+            
+            if stale:
+                # Deleted or reviewed through another worker; refill from a fresh queue
+                queue = build_due_queue(cursor, session['user_id'], deck_id)
+                card_ids = queue.head(limit, new_limit=new_left, due_limit=reviews_left)
+                cards, _ = load_session_cards(cursor, session['user_id'], card_ids)
+            
             return jsonify({
                 'cards': cards,
-                'total': len(cards)
+                'total': len(cards),
+                'new_cards_remaining_today': new_left,
+                'reviews_remaining_today': reviews_left
             }), 200
 
     except Error as e:
@@ -823,25 +2165,24 @@ def submit_review():
         if not card_id or not rating:
             return jsonify({'error': 'card_id and rating are required'}), 400
 
-        if rating not in ['forgot', 'hard', 'good', 'easy']:
+        if rating not in REVIEW_POINTS:
             return jsonify({'error': 'Invalid rating'}), 400
 
+        try:
+            card_id = int(card_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'card_id must be an integer'}), 400
+
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             
             # Verify card ownership
-            cursor.execute("""
-                SELECT d.user_id 
-                FROM Cards c 
-                JOIN Decks d ON c.deck_id = d.deck_id 
-                WHERE c.card_id = %s
-            """, (card_id,))
-            
-            card = cursor.fetchone()
+            card = get_card_owner(cursor, card_id)
             if not card:
                 return jsonify({'error': 'Card not found'}), 404
             
-            if card['user_id'] != session['user_id']:
+            deck_id, owner = card
+            if owner != session['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
             # Get current performance data
@@ -852,52 +2193,67 @@ def submit_review():
             
             performance = cursor.fetchone()
             
-            # Calculate new values using SM-2 algorithm
-            if performance:
-                current_interval = performance['interval']
-                current_ease = float(performance['ease_factor'])
-            else:
-                current_interval = 0
-                current_ease = 2.5
+            # Reschedule with the deck's (or user's) scheduler
+            scheduler = get_schedulers(cursor, session['user_id'], [deck_id])[deck_id]
+            current, elapsed_days = scheduling_state(performance, date.today())
+            new_state = scheduler.review(rating, current, elapsed_days)
             
-            # Update based on rating
-            new_interval, new_ease = calculate_sm2(rating, current_interval, current_ease)
+            # Spread the due date over the user's quieter days
+            new_interval = balance_intervals(cursor, session['user_id'], [new_state.interval])[0]
+            new_state = new_state._replace(interval=new_interval)
             next_review = date.today() + timedelta(days=new_interval)
             
             # Update or insert performance record
-            if performance:
-                cursor.execute("""
-                    UPDATE CardPerformance 
-                    SET next_review_date = %s, `interval` = %s, ease_factor = %s
-                    WHERE user_id = %s AND card_id = %s
-                """, (next_review, new_interval, new_ease, session['user_id'], card_id))
-            else:
-                cursor.execute("""
-                    INSERT INTO CardPerformance (user_id, card_id, next_review_date, `interval`, ease_factor)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (session['user_id'], card_id, next_review, new_interval, new_ease))
+            try:
+                if performance:
+                    cursor.execute("""
+                        UPDATE CardPerformance 
+                        SET next_review_date = %s, `interval` = %s, ease_factor = %s, stability = %s, difficulty = %s
+                        WHERE user_id = %s AND card_id = %s
+                    """, (next_review, *new_state, session['user_id'], card_id))
+                else:
+                    cursor.execute("""
+                        INSERT INTO CardPerformance
+                            (user_id, card_id, next_review_date, `interval`, ease_factor, stability, difficulty)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """, (session['user_id'], card_id, next_review, *new_state))
+            except Error as e:
+                if not is_missing_parent(e):
+                    raise
+                # Deleted through another worker since it was cached
+                conn.rollback()
+                forget_cards([card_id])
+                return jsonify({'error': 'Card not found'}), 404
             
             # Award points based on rating
-            points_map = {'forgot': 5, 'hard': 10, 'good': 15, 'easy': 20}
-            points = points_map[rating]
-            
-            cursor.execute(
-                "UPDATE Users SET points = points + %s WHERE user_id = %s",
-                (points, session['user_id'])
-            )
+            points = REVIEW_POINTS[rating]
+            add_points(cursor, session['user_id'], [(points, 'review', card_id)])
             
             # Log study activity
-            today = date.today()
-            cursor.execute("""
-                INSERT INTO StudyLog (user_id, study_date, cards_reviewed)
-                VALUES (%s, %s, 1)
-                ON DUPLICATE KEY UPDATE cards_reviewed = cards_reviewed + 1
-            """, (session['user_id'], today))
+            streak_changed = log_study_activity(cursor, session['user_id'], 1, new_cards=0 if performance else 1)
+            
+            due_changes = Counter({next_review: 1})
+            if performance:
+                due_changes[performance['next_review_date']] -= 1
+            version_bumped = adjust_user_stats(
+                cursor, session['user_id'],
+                reviewed=0 if performance else 1,
+                due_changes=due_changes
+            )
+            bump_deck_versions(cursor, [deck_id])
+            enqueue_events(
+                cursor, session['user_id'],
+                ('review_submitted', 'streak_changed') if streak_changed else ('review_submitted',)
+            )
             
             conn.commit()
+            event_queue.notify()
             
-            # Check for achievements
-            check_study_achievements(conn, cursor, session['user_id'])
+            due_queue_remove(session['user_id'], [deck_id], [card_id], version_bumped)
+            review_log.append([(
+                datetime.now(), session['user_id'], 'card', card_id, RATING_NAMES.index(rating),
+                current.interval, new_interval, new_state.ease_factor, parse_response_ms(data.get('response_ms'))
+            )])
             
             logger.info(f"Review submitted: Card {card_id}, Rating {rating}, User {session['user_id']}")
             
@@ -912,6 +2268,167 @@ def submit_review():
         logger.error(f"Submit review error: {e}")
         return jsonify({'error': 'Failed to submit review'}), 500
 
+@app.route('/submit-reviews', methods=['POST'])
+@login_required
+def submit_reviews():
+    """Submit a batch of card reviews in a single transaction"""
+    try:
+        data = request.get_json() or {}
+        reviews = data.get('reviews')
+
+        if not reviews or not isinstance(reviews, list):
+            return jsonify({'error': 'Invalid reviews data. Expected array of reviews.'}), 400
+
+        if len(reviews) > MAX_REVIEW_BATCH:
+            return jsonify({'error': f'At most {MAX_REVIEW_BATCH} reviews per request'}), 400
+
+        for idx, review in enumerate(reviews):
+            if not isinstance(review, dict) or not review.get('card_id') or not review.get('rating'):
+                return jsonify({'error': f'Review {idx + 1}: card_id and rating are required'}), 400
+            if review['rating'] not in REVIEW_POINTS:
+                return jsonify({'error': f'Review {idx + 1}: Invalid rating'}), 400
+
+        try:
+            card_ids = sorted({int(review['card_id']) for review in reviews})
+        except (TypeError, ValueError):
+            return jsonify({'error': 'card_id must be an integer'}), 400
+
+        user_id = session['user_id']
+        placeholders = ', '.join(['%s'] * len(card_ids))
+
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            
+            # Verify ownership of every card, querying only for uncached cards
+            owners = get_card_owners(cursor, card_ids)
+            
+            missing = [card_id for card_id in card_ids if card_id not in owners]
+            if missing:
+                return jsonify({'error': 'Card not found', 'card_ids': missing}), 404
+            
+            if any(owner != user_id for _, owner in owners.values()):
+                return jsonify({'error': 'Unauthorized'}), 403
+            
+            # Current performance data for all cards
+            cursor.execute(f"""
+                SELECT card_id, next_review_date, `interval`, ease_factor, stability, difficulty
+                FROM CardPerformance 
+                WHERE user_id = %s AND card_id IN ({placeholders})
+            """, (user_id, *card_ids))
+            
+            previous = cursor.fetchall()
+            today = date.today()
+            state = {row['card_id']: scheduling_state(row, today) for row in previous}
+            schedulers = get_schedulers(cursor, user_id, {deck_id for deck_id, _ in owners.values()})
+            
+            # Apply ratings in submission order so repeated cards build on the previous result
+            reviewed_at = datetime.now()
+            results = []
+            log_records = []
+            last_review = {}  # card_id -> index of its last review in results / log_records
+            total_points = 0
+            for review in reviews:
+                card_id = int(review['card_id'])
+                rating = review['rating']
+                current, elapsed_days = state.get(card_id, (NEW_ITEM_STATE, 0))
+                
+                new_state = schedulers[owners[card_id][0]].review(rating, current, elapsed_days)
+                new_interval = new_state.interval
+                state[card_id] = (new_state, 0)
+                log_records.append((
+                    reviewed_at, user_id, 'card', card_id, RATING_NAMES.index(rating),
+                    current.interval, new_interval, new_state.ease_factor, parse_response_ms(review.get('response_ms'))
+                ))
+                last_review[card_id] = len(results)
+                
+                points = REVIEW_POINTS[rating]
+                total_points += points
+                results.append({
+                    'card_id': card_id,
+                    'next_review_date': (today + timedelta(days=new_interval)).isoformat(),
+                    'interval': new_interval,
+                    'points_earned': points
+                })
+            
+            # Spread the final due dates over the user's quieter days
+            balanced = balance_intervals(cursor, user_id, [state[card_id][0].interval for card_id in card_ids], today)
+            for card_id, interval in zip(card_ids, balanced):
+                if interval != state[card_id][0].interval:
+                    state[card_id] = (state[card_id][0]._replace(interval=interval), 0)
+                    index = last_review[card_id]
+                    results[index]['interval'] = interval
+                    results[index]['next_review_date'] = (today + timedelta(days=interval)).isoformat()
+                    log_records[index] = log_records[index][:6] + (interval,) + log_records[index][7:]
+            
+            # Write final state of each card with a single multi-row upsert
+            rows = []
+            for card_id in card_ids:
+                new_state = state[card_id][0]
+                rows.append((user_id, card_id, today + timedelta(days=new_state.interval), *new_state))
+            values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(rows))
+            try:
+                cursor.execute(f"""
+                    INSERT INTO CardPerformance
+                        (user_id, card_id, next_review_date, `interval`, ease_factor, stability, difficulty)
+                    VALUES {values}
+                    ON DUPLICATE KEY UPDATE
+                        next_review_date = VALUES(next_review_date),
+                        `interval` = VALUES(`interval`),
+                        ease_factor = VALUES(ease_factor),
+                        stability = VALUES(stability),
+                        difficulty = VALUES(difficulty)
+                """, tuple(value for row in rows for value in row))
+            except Error as e:
+                if not is_missing_parent(e):
+                    raise
+                # Some were deleted through another worker since they were cached;
+                # re-read their owners to report which
+                conn.rollback()
+                forget_cards(card_ids)
+                owners = get_card_owners(cursor, card_ids)
+                missing = [card_id for card_id in card_ids if card_id not in owners]
+                return jsonify({'error': 'Card not found', 'card_ids': missing}), 404
+            
+            add_points(cursor, user_id, [(result['points_earned'], 'review', result['card_id']) for result in results])
+            
+            streak_changed = log_study_activity(
+                cursor, user_id, len(reviews), today, new_cards=len(card_ids) - len(previous)
+            )
+            
+            due_changes = Counter(row[2] for row in rows)
+            due_changes.subtract(row['next_review_date'] for row in previous)
+            version_bumped = adjust_user_stats(
+                cursor, user_id,
+                reviewed=len(card_ids) - len(previous),
+                due_changes=due_changes
+            )
+            bump_deck_versions(cursor, {deck_id for deck_id, _ in owners.values()})
+            enqueue_events(
+                cursor, user_id,
+                ('review_submitted', 'streak_changed') if streak_changed else ('review_submitted',)
+            )
+            
+            conn.commit()
+            event_queue.notify()
+            
+            due_queue_remove(
+                user_id, {deck_id for deck_id, _ in owners.values()}, list(owners), version_bumped
+            )
+            review_log.append(log_records)
+            
+            logger.info(f"Review batch submitted: {len(reviews)} reviews, {len(card_ids)} cards, User {user_id}")
+            
+            return jsonify({
+                'message': 'Reviews submitted successfully',
+                'reviews': results,
+                'total': len(results),
+                'points_earned': total_points
+            }), 200
+
+    except Error as e:
+        logger.error(f"Submit reviews error: {e}")
+        return jsonify({'error': 'Failed to submit reviews'}), 500
+
 def calculate_sm2(rating, current_interval, current_ease):
     """
     SM-2 Spaced Repetition Algorithm
@@ -945,10 +2462,202 @@ def calculate_sm2(rating, current_interval, current_ease):
     
     return new_interval, round(new_ease, 2)
 
+# Rating names indexed by rating code, and their SM-2 quality (0-5 scale)
+RATING_NAMES = ('forgot', 'hard', 'good', 'easy')
+RATING_QUALITY = np.array([0, 3, 4, 5])
+
+def rating_codes(ratings):
+    """Convert an array of rating names to integer rating codes (index into RATING_NAMES)"""
+    ratings = np.asarray(ratings)
+    if ratings.dtype.kind in 'iu':
+        return ratings
+    
+    codes = np.full(ratings.shape, -1, dtype=np.int8)
+    for code, name in enumerate(RATING_NAMES):
+        codes[ratings == name] = code
+    if (codes < 0).any():
+        raise ValueError(f"Invalid rating in {np.unique(ratings[codes < 0])}")
+    return codes
+
+def calculate_sm2_batch(ratings, current_intervals, current_eases):
+    """
+    Vectorized SM-2, element-wise identical to calculate_sm2.
+    ratings: rating names or rating codes (index into RATING_NAMES)
+    Returns: (new_intervals, new_ease_factors) as NumPy arrays
+    """
+    quality = RATING_QUALITY[rating_codes(ratings)]
+    intervals = np.asarray(current_intervals, dtype=np.int64)
+    eases = np.asarray(current_eases, dtype=np.float64)
+    
+    # Calculate new ease factor
+    new_eases = eases + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    new_eases = np.maximum(1.3, new_eases)
+    
+    # Calculate new interval (failed cards and first reviews restart at 1 day)
+    new_intervals = np.rint(intervals * new_eases).astype(np.int64)
+    new_intervals = np.where(intervals == 1, 6, new_intervals)
+    new_intervals = np.where((quality < 3) | (intervals == 0), 1, new_intervals)
+    
+    return new_intervals, np.round(new_eases, 2)
+
+# Assumed answer distribution used by the workload simulator
+DEFAULT_RATING_PROBABILITIES = {'forgot': 0.10, 'hard': 0.15, 'good': 0.55, 'easy': 0.20}
+
+def simulate_review_load(intervals, eases, due_in_days, days=30, rating_probabilities=None, seed=None):
+    """
+    Project the number of reviews due on each of the next `days` days.
+    Every card due on a day is assumed to be reviewed that day with a rating
+    drawn from rating_probabilities, then rescheduled with calculate_sm2_batch.
+    Overdue cards (due_in_days < 0) count towards today; new cards are
+    passed with interval 0, ease 2.5 and due_in_days 0.
+    Returns: NumPy array of review counts, one per day starting today
+    """
+    probabilities = rating_probabilities or DEFAULT_RATING_PROBABILITIES
+    weights = np.array([probabilities.get(name, 0.0) for name in RATING_NAMES], dtype=np.float64)
+    if weights.sum() <= 0:
+        raise ValueError("Rating probabilities must not all be zero")
+    weights /= weights.sum()
+    
+    intervals = np.asarray(intervals, dtype=np.int64).copy()
+    eases = np.asarray(eases, dtype=np.float64).copy()
+    due = np.maximum(np.asarray(due_in_days, dtype=np.int64), 0)
+    
+    rng = np.random.default_rng(seed)
+    load = np.zeros(days, dtype=np.int64)
+    
+    for day in range(days):
+        reviewed = np.flatnonzero(due == day)
+        load[day] = reviewed.size
+        if reviewed.size == 0:
+            continue
+        
+        ratings = rng.choice(len(RATING_NAMES), size=reviewed.size, p=weights)
+        new_intervals, new_eases = calculate_sm2_batch(ratings, intervals[reviewed], eases[reviewed])
+        intervals[reviewed] = new_intervals
+        eases[reviewed] = new_eases
+        due[reviewed] = day + new_intervals
+    
+    return load
+
 # ============================================================================
 # STUDY LOG ROUTES
 # ============================================================================
 
+def log_study_activity(cursor, user_id, cards_reviewed, study_date=None, new_cards=0):
+    """
+    Add to the day's StudyLog row and advance the user's streak in the same transaction.
+    new_cards: how many of the reviews were a card's first (counted against DAILY_NEW_CARD_LIMIT)
+    Returns: True if the streak row changed (first activity of the day)
+    """
+    study_date = study_date or date.today()
+    cursor.execute("""
+        INSERT INTO StudyLog (user_id, study_date, cards_reviewed, new_cards_reviewed)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            cards_reviewed = cards_reviewed + VALUES(cards_reviewed),
+            new_cards_reviewed = new_cards_reviewed + VALUES(new_cards_reviewed)
+    """, (user_id, study_date, cards_reviewed, new_cards))
+    
+    # Assignments are applied left to right: current_streak is computed from the
+    # previous last_study_date, longest_streak from the new current_streak
+    cursor.execute("""
+        INSERT INTO StudyStreaks (user_id, current_streak, longest_streak, last_study_date)
+        VALUES (%s, 1, 1, %s)
+        ON DUPLICATE KEY UPDATE
+            current_streak = CASE
+                WHEN last_study_date >= VALUES(last_study_date) THEN current_streak
+                WHEN last_study_date = VALUES(last_study_date) - INTERVAL 1 DAY THEN current_streak + 1
+                ELSE 1
+            END,
+            longest_streak = GREATEST(longest_streak, current_streak),
+            last_study_date = CASE
+                WHEN last_study_date IS NULL OR last_study_date < VALUES(last_study_date)
+                THEN VALUES(last_study_date)
+                ELSE last_study_date
+            END
+    """, (user_id, study_date))
+    
+    # Affected rows: 1 = inserted, 2 = updated, 0 = unchanged (already studied today)
+    changed = cursor.rowcount != 0
+    if cursor.rowcount == 1:
+        # Row was just created: the user predates streak tracking, derive it from history
+        backfill_study_streaks(cursor, user_id, user_id + 1)
+    
+    return changed
+
+def backfill_study_streaks(cursor, low_user_id, high_user_id):
+    """
+    Derive streak state from StudyLog for users in [low_user_id, high_user_id)
+    with a set-based gaps-and-islands query: consecutive dates share the same
+    (study_date - row_number) value, so each group is one run of study days.
+    Users without any StudyLog rows get an empty streak row.
+    """
+    cursor.execute("""
+        INSERT INTO StudyStreaks (user_id, current_streak, longest_streak, last_study_date)
+        WITH runs AS (
+            SELECT user_id, COUNT(*) as run_length, MAX(study_date) as run_end
+            FROM (
+                SELECT
+                    user_id,
+                    study_date,
+                    DATE_SUB(study_date, INTERVAL ROW_NUMBER() OVER (
+                        PARTITION BY user_id ORDER BY study_date
+                    ) DAY) as island
+                FROM StudyLog
+                WHERE user_id >= %s AND user_id < %s
+            ) days
+            GROUP BY user_id, island
+        ),
+        totals AS (
+            SELECT user_id, MAX(run_length) as longest, MAX(run_end) as last_date
+            FROM runs
+            GROUP BY user_id
+        )
+        SELECT runs.user_id, runs.run_length, totals.longest, totals.last_date
+        FROM runs
+        JOIN totals ON totals.user_id = runs.user_id AND totals.last_date = runs.run_end
+        ON DUPLICATE KEY UPDATE
+            current_streak = VALUES(current_streak),
+            longest_streak = VALUES(longest_streak),
+            last_study_date = VALUES(last_study_date)
+    """, (low_user_id, high_user_id))
+    
+    cursor.execute("""
+        INSERT IGNORE INTO StudyStreaks (user_id)
+        SELECT user_id FROM Users WHERE user_id >= %s AND user_id < %s
+    """, (low_user_id, high_user_id))
+
+def get_streak(cursor, user_id):
+    """
+    Current and longest streak from StudyStreaks.
+    The stored current_streak only counts if the user studied today or yesterday.
+    """
+    cursor.execute("""
+        SELECT current_streak, longest_streak, last_study_date
+        FROM StudyStreaks
+        WHERE user_id = %s
+    """, (user_id,))
+    streak = cursor.fetchone()
+    
+    if streak is None:
+        backfill_study_streaks(cursor, user_id, user_id + 1)
+        cursor.execute("""
+            SELECT current_streak, longest_streak, last_study_date
+            FROM StudyStreaks
+            WHERE user_id = %s
+        """, (user_id,))
+        streak = cursor.fetchone() or {'current_streak': 0, 'longest_streak': 0, 'last_study_date': None}
+    
+    return effective_streak(streak), streak
+
+def effective_streak(streak, today=None):
+    """The stored run length if it is still alive, otherwise 0"""
+    today = today or date.today()
+    last_study_date = streak['last_study_date']
+    if last_study_date is None or last_study_date < today - timedelta(days=1):
+        return 0
+    return streak['current_streak']
+
 @app.route('/studylog', methods=['GET'])
 @login_required
 def get_study_log():
@@ -983,14 +2692,7 @@ def add_study_log():
         today = date.today()
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
-            cursor.execute(
-                """
-                INSERT INTO StudyLog (user_id, study_date, cards_reviewed)
-                VALUES (%s, %s, %s)
-                ON DUPLICATE KEY UPDATE cards_reviewed = cards_reviewed + VALUES(cards_reviewed)
-                """,
-                (session['user_id'], today, count)
-            )
+            log_study_activity(cursor, session['user_id'], count, today)
             conn.commit()
             return jsonify({'message': 'Study log updated', 'cards_reviewed_added': count}), 200
     except Error as e:
@@ -998,100 +2700,430 @@ def add_study_log():
         return jsonify({'error': 'Failed to update study log'}), 500
 
 # ============================================================================
-# STATISTICS
+# SCHEDULERS
 # ============================================================================
 
-@app.route('/stats', methods=['GET'])
+# A scheduler turns a rating and an item's memory state into its next state.
+# Cards and MCQs go through the same interface; the scheduler is chosen per
+# deck (Decks.scheduler), then per user (Users.scheduler), then
+# DEFAULT_SCHEDULER. Both models' state is stored on every performance row,
+# so switching scheduler does not lose history.
+DEFAULT_SCHEDULER = os.environ.get('DEFAULT_SCHEDULER', 'sm2')
+SCHEDULER_CACHE_TTL = int(os.environ.get('SCHEDULER_CACHE_TTL', 60))
+
+# interval in days; stability / difficulty are None until FSRS first sees the item
+MemoryState = namedtuple('MemoryState', 'interval ease_factor stability difficulty')
+NEW_ITEM_STATE = MemoryState(0, 2.5, None, None)
+
+# MCQ answers are graded as these ratings
+MCQ_RATINGS = {True: 'good', False: 'forgot'}
+
+# FSRS-4.5 memory model: 17 weights, retrievability R(t, S) = (1 + F * t / S) ^ DECAY
+FSRS_DEFAULT_WEIGHTS = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755
+)
+# (lowest, highest) value for each weight while fitting
+FSRS_WEIGHT_BOUNDS = (
+    (0.1, 100.0), (0.1, 100.0), (0.1, 100.0), (0.1, 100.0), (1.0, 10.0), (0.1, 5.0),
+    (0.1, 5.0), (0.0, 0.75), (0.0, 4.0), (0.0, 0.8), (0.01, 3.0), (0.1, 5.0),
+    (0.01, 0.2), (0.01, 0.9), (0.01, 2.0), (0.0, 1.0), (1.0, 6.0)
+)
+FSRS_DECAY = -0.5
+FSRS_FACTOR = 0.9 ** (1 / FSRS_DECAY) - 1
+FSRS_DESIRED_RETENTION = float(os.environ.get('FSRS_DESIRED_RETENTION', 0.9))
+FSRS_MAX_INTERVAL = int(os.environ.get('FSRS_MAX_INTERVAL', 36500))
+
+# The FSRS functions below work on scalars and on NumPy arrays alike.
+# w is a weight vector, or (for batched evaluation) an array whose last axis
+# holds the 17 weights and whose leading axes broadcast against the items.
+# Grades are rating codes + 1 (1 = forgot ... 4 = easy).
+
+def fsrs_retrievability(elapsed_days, stability):
+    """Probability of recall after elapsed_days"""
+    return (1 + FSRS_FACTOR * elapsed_days / stability) ** FSRS_DECAY
+
+def fsrs_initial_state(w, grade):
+    """(stability, difficulty) after an item's first review"""
+    stability = sum(np.where(grade == g, w[..., g - 1], 0.0) for g in range(1, 5))
+    difficulty = np.clip(w[..., 4] - (grade - 3) * w[..., 5], 1, 10)
+    return stability, difficulty
+
+def fsrs_next_state(w, stability, difficulty, elapsed_days, grade):
+    """(stability, difficulty) after reviewing an item with this grade"""
+    retrievability = fsrs_retrievability(elapsed_days, stability)
+    
+    # Difficulty moves with the grade and reverts towards the initial "good" difficulty
+    next_difficulty = difficulty - w[..., 6] * (grade - 3)
+    next_difficulty = np.clip(w[..., 7] * w[..., 4] + (1 - w[..., 7]) * next_difficulty, 1, 10)
+    
+    recall_stability = stability * (
+        1 + np.exp(w[..., 8]) * (11 - difficulty) * stability ** -w[..., 9]
+        * (np.exp((1 - retrievability) * w[..., 10]) - 1)
+        * np.where(grade == 2, w[..., 15], 1.0) * np.where(grade == 4, w[..., 16], 1.0)
+    )
+    forget_stability = np.minimum(
+        w[..., 11] * difficulty ** -w[..., 12] * ((stability + 1) ** w[..., 13] - 1)
+        * np.exp((1 - retrievability) * w[..., 14]),
+        stability
+    )
+    next_stability = np.where(grade == 1, forget_stability, recall_stability)
+    return np.clip(next_stability, 0.01, FSRS_MAX_INTERVAL), next_difficulty
+
+def fsrs_interval(stability, desired_retention=FSRS_DESIRED_RETENTION):
+    """Days until recall probability drops to desired_retention"""
+    interval = stability / FSRS_FACTOR * (desired_retention ** (1 / FSRS_DECAY) - 1)
+    return int(min(max(round(float(interval)), 1), FSRS_MAX_INTERVAL))
+
+class Scheduler(ABC):
+    """Computes an item's next MemoryState from a rating ('forgot' ... 'easy')"""
+    name = None
+    
+    @abstractmethod
+    def review(self, rating, state, elapsed_days):
+        """Next MemoryState after rating an item last reviewed elapsed_days ago"""
+
+class SM2Scheduler(Scheduler):
+    name = 'sm2'
+    
+    def review(self, rating, state, elapsed_days):
+        interval, ease_factor = calculate_sm2(rating, state.interval, state.ease_factor)
+        return state._replace(interval=interval, ease_factor=ease_factor)
+
+class FSRSScheduler(Scheduler):
+    name = 'fsrs'
+    
+    def __init__(self, weights=FSRS_DEFAULT_WEIGHTS, desired_retention=FSRS_DESIRED_RETENTION):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.desired_retention = desired_retention
+    
+    def review(self, rating, state, elapsed_days):
+        grade = RATING_NAMES.index(rating) + 1
+        if state.stability is not None:
+            stability, difficulty = fsrs_next_state(
+                self.weights, state.stability, state.difficulty, elapsed_days, grade
+            )
+        elif state.interval:
+            # Scheduled by SM-2 so far: its interval is roughly where recall hits 90%
+            stability, difficulty = fsrs_next_state(
+                self.weights, float(state.interval), self.weights[4], elapsed_days, grade
+            )
+        else:
+            stability, difficulty = fsrs_initial_state(self.weights, grade)
+        
+        return state._replace(
+            interval=fsrs_interval(stability, self.desired_retention),
+            stability=round(float(stability), 4),
+            difficulty=round(float(difficulty), 4)
+        )
+
+SCHEDULERS = {'sm2': SM2Scheduler, 'fsrs': FSRSScheduler}
+
+# (user_id, deck_id) -> Scheduler
+scheduler_cache = LRUCache(int(os.environ.get('SCHEDULER_CACHE_SIZE', 10000)), ttl=SCHEDULER_CACHE_TTL)
+
+def make_scheduler(name, weights=None):
+    """Scheduler instance for a stored name (unknown or NULL -> DEFAULT_SCHEDULER)"""
+    name = name if name in SCHEDULERS else DEFAULT_SCHEDULER
+    if name == 'fsrs' and weights:
+        return FSRSScheduler(json.loads(weights))
+    return SCHEDULERS[name]()
+
+def get_schedulers(cursor, user_id, deck_ids):
+    """{deck_id: Scheduler} for the user's reviews in these decks, one query for any misses"""
+    schedulers = {}
+    missing = []
+    for deck_id in deck_ids:
+        scheduler = scheduler_cache.get((user_id, deck_id))
+        if scheduler is None:
+            missing.append(deck_id)
+        else:
+            schedulers[deck_id] = scheduler
+    
+    if missing:
+        placeholders = ', '.join(['%s'] * len(missing))
+        cursor.execute(f"""
+            SELECT d.deck_id, COALESCE(d.scheduler, u.scheduler) as scheduler, sp.weights
+            FROM Decks d
+            JOIN Users u ON u.user_id = %s
+            LEFT JOIN SchedulerParameters sp ON sp.user_id = u.user_id
+            WHERE d.deck_id IN ({placeholders})
+        """, (user_id, *missing))
+        for row in cursor.fetchall():
+            scheduler = make_scheduler(row['scheduler'], row['weights'])
+            scheduler_cache.set((user_id, row['deck_id']), scheduler)
+            schedulers[row['deck_id']] = scheduler
+    
+    return schedulers
+
+def scheduling_state(performance, today):
+    """
+    (MemoryState, days since the last review) from a CardPerformance or
+    MCQ_Performance row; a missing row is a new item.
+    """
+    if not performance or performance['next_review_date'] is None:
+        return NEW_ITEM_STATE, 0
+    
+    if performance.get('last_attempt_date'):
+        last_review = performance['last_attempt_date'].date()
+    else:
+        last_review = performance['next_review_date'] - timedelta(days=performance['interval'])
+    
+    interval = performance['interval']
+    if interval is None:
+        # MCQ answered before it had scheduler state
+        interval = max((performance['next_review_date'] - last_review).days, 0)
+    
+    state = MemoryState(
+        interval,
+        float(performance['ease_factor']) if performance['ease_factor'] is not None else 2.5,
+        performance.get('stability'),
+        performance.get('difficulty')
+    )
+    return state, max((today - last_review).days, 0)
+
+def validate_scheduler_name(data):
+    """Scheduler name from a request body (None = inherit); raises ValueError"""
+    name = data.get('scheduler')
+    if name is not None and name not in SCHEDULERS:
+        raise ValueError(f"scheduler must be one of {', '.join(SCHEDULERS)} or null")
+    return name
+
+@app.route('/scheduler', methods=['GET'])
 @login_required
-def get_stats():
-    """Get user statistics"""
+def get_scheduler_settings():
+    """The user's scheduler and their fitted FSRS parameters, if any"""
     try:
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
-            
-            # Total decks
-            cursor.execute(
-                "SELECT COUNT(*) as total FROM Decks WHERE user_id = %s",
-                (session['user_id'],)
-            )
-            total_decks = cursor.fetchone()['total']
-            
-            # Total cards
             cursor.execute("""
-                SELECT COUNT(*) as total 
-                FROM Cards c 
-                JOIN Decks d ON c.deck_id = d.deck_id 
-                WHERE d.user_id = %s
+                SELECT u.scheduler, sp.review_count, sp.log_loss, sp.baseline_log_loss, sp.fitted_at
+                FROM Users u
+                LEFT JOIN SchedulerParameters sp ON sp.user_id = u.user_id
+                WHERE u.user_id = %s
             """, (session['user_id'],))
-            total_cards = cursor.fetchone()['total']
+            settings = cursor.fetchone()
             
-            # Cards due today
-            cursor.execute("""
-                SELECT COUNT(*) as total 
-                FROM CardPerformance cp 
-                WHERE cp.user_id = %s AND cp.next_review_date <= CURDATE()
-            """, (session['user_id'],))
-            cards_due = cursor.fetchone()['total']
+            if not settings:
+                return jsonify({'error': 'User not found'}), 404
             
-            # Cards due in next 7 days
-            cursor.execute("""
-                SELECT COUNT(*) as total 
-                FROM CardPerformance cp 
-                WHERE cp.user_id = %s 
-                AND cp.next_review_date > CURDATE() 
-                AND cp.next_review_date <= DATE_ADD(CURDATE(), INTERVAL 7 DAY)
-            """, (session['user_id'],))
-            cards_upcoming = cursor.fetchone()['total']
-            
-            # New cards (never reviewed)
-            cursor.execute("""
-                SELECT COUNT(*) as total 
-                FROM Cards c 
-                JOIN Decks d ON c.deck_id = d.deck_id 
-                LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = %s
-                WHERE d.user_id = %s AND cp.card_id IS NULL
-            """, (session['user_id'], session['user_id']))
-            new_cards = cursor.fetchone()['total']
+            return jsonify({
+                'scheduler': settings['scheduler'] or DEFAULT_SCHEDULER,
+                'available': list(SCHEDULERS),
+                'fitted_parameters': {
+                    'review_count': settings['review_count'],
+                    'log_loss': settings['log_loss'],
+                    'baseline_log_loss': settings['baseline_log_loss'],
+                    'fitted_at': settings['fitted_at'].isoformat()
+                } if settings['fitted_at'] else None
+            }), 200
+
+    except Error as e:
+        logger.error(f"Get scheduler error: {e}")
+        return jsonify({'error': 'Failed to fetch scheduler settings'}), 500
+
+@app.route('/scheduler', methods=['PUT'])
+@login_required
+def set_user_scheduler():
+    """Choose the scheduler for the user's decks that do not set their own"""
+    try:
+        scheduler = validate_scheduler_name(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            cursor.execute("UPDATE Users SET scheduler = %s WHERE user_id = %s", (scheduler, session['user_id']))
+            conn.commit()
+        
+        # Keyed by (user, deck), so drop everything; changes are rare
+        scheduler_cache.clear()
+        return jsonify({'message': 'Scheduler updated', 'scheduler': scheduler or DEFAULT_SCHEDULER}), 200
+
+    except Error as e:
+        logger.error(f"Set scheduler error: {e}")
+        return jsonify({'error': 'Failed to update scheduler'}), 500
+
+@app.route('/decks/<int:deck_id>/scheduler', methods=['PUT'])
+@login_required
+def set_deck_scheduler(deck_id):
+    """Choose the scheduler for one deck (null = use the reviewer's own)"""
+    try:
+        scheduler = validate_scheduler_name(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
             
-            # Current streak
-            cursor.execute("""
-                SELECT study_date 
-                FROM StudyLog 
-                WHERE user_id = %s 
-                ORDER BY study_date DESC
-            """, (session['user_id'],))
+            owner = get_deck_owner(cursor, deck_id)
             
-            study_dates = [row['study_date'] for row in cursor.fetchall()]
-            current_streak = calculate_streak(study_dates)
+            if owner is None:
+                return jsonify({'error': 'Deck not found'}), 404
             
-            # Total points
-            cursor.execute(
-                "SELECT points FROM Users WHERE user_id = %s",
-                (session['user_id'],)
-            )
-            total_points = cursor.fetchone()['points']
+            if owner != session['user_id']:
+                return jsonify({'error': 'Unauthorized'}), 403
             
-            # Cards reviewed today
-            today = date.today()
-            cursor.execute("""
-                SELECT COALESCE(cards_reviewed, 0) as cards_reviewed
-                FROM StudyLog 
-                WHERE user_id = %s AND study_date = %s
-            """, (session['user_id'], today))
+            cursor.execute("UPDATE Decks SET scheduler = %s WHERE deck_id = %s", (scheduler, deck_id))
+            conn.commit()
+        
+        scheduler_cache.clear()
+        return jsonify({'message': 'Deck scheduler updated', 'scheduler': scheduler}), 200
+
+    except Error as e:
+        logger.error(f"Set deck scheduler error: {e}")
+        return jsonify({'error': 'Failed to update deck scheduler'}), 500
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def adjust_user_stats(cursor, user_id, decks=0, cards=0, reviewed=0, due_changes=None, mcq_due_changes=None):
+    """
+    Apply deltas to the user's statistics rollup inside the caller's transaction.
+    due_changes / mcq_due_changes map due dates to card / MCQ count deltas
+    for UserDueHistogram.
+    Users whose rollup has not been built yet are skipped; it is built in
+    full on their next /stats request.
+    Returns: True if the rollup was updated
+    """
+    cursor.execute("""
+        UPDATE UserStats
+        SET total_decks = total_decks + %s,
+            total_cards = total_cards + %s,
+            reviewed_cards = reviewed_cards + %s,
+            version = version + 1
+        WHERE user_id = %s
+    """, (decks, cards, reviewed, user_id))
+    
+    if cursor.rowcount == 0:
+        return False
+    
+    changes = {}
+    for due_date, delta in (due_changes or {}).items():
+        changes[(user_id, due_date)] = (delta, 0)
+    for due_date, delta in (mcq_due_changes or {}).items():
+        changes[(user_id, due_date)] = (changes.get((user_id, due_date), (0, 0))[0], delta)
+    adjust_due_histogram(cursor, changes)
+    
+    return True
+
+def adjust_due_histogram(cursor, changes):
+    """
+    Apply {(user_id, due_date): (card delta, MCQ delta)} to UserDueHistogram
+    with one multi-row upsert. Callers check that the rollups exist.
+    """
+    rows = [
+        (user_id, due_date, cards, mcqs)
+        for (user_id, due_date), (cards, mcqs) in changes.items()
+        if due_date is not None and (cards or mcqs)
+    ]
+    if not rows:
+        return
+    
+    values = ', '.join(['(%s, %s, %s, %s)'] * len(rows))
+    cursor.execute(f"""
+        INSERT INTO UserDueHistogram (user_id, due_date, card_count, mcq_count)
+        VALUES {values}
+        ON DUPLICATE KEY UPDATE
+            card_count = card_count + VALUES(card_count),
+            mcq_count = mcq_count + VALUES(mcq_count)
+    """, tuple(value for row in rows for value in row))
+
+def rebuild_user_stats(cursor, user_id):
+    """Recompute the user's statistics rollup from the source tables"""
+    cursor.execute("""
+        INSERT INTO UserStats (user_id, total_decks, total_cards, reviewed_cards)
+        SELECT
+            u.user_id,
+            (SELECT COUNT(*) FROM Decks d WHERE d.user_id = u.user_id),
+            (SELECT COUNT(*) FROM Cards c JOIN Decks d ON c.deck_id = d.deck_id
+             WHERE d.user_id = u.user_id),
+            (SELECT COUNT(*) FROM CardPerformance cp
+             JOIN Cards c ON cp.card_id = c.card_id
+             JOIN Decks d ON c.deck_id = d.deck_id
+             WHERE cp.user_id = u.user_id AND d.user_id = u.user_id)
+        FROM Users u
+        WHERE u.user_id = %s
+        ON DUPLICATE KEY UPDATE
+            total_decks = VALUES(total_decks),
+            total_cards = VALUES(total_cards),
+            reviewed_cards = VALUES(reviewed_cards),
+            version = version + 1
+    """, (user_id,))
+    
+    cursor.execute("DELETE FROM UserDueHistogram WHERE user_id = %s", (user_id,))
+    cursor.execute("""
+        INSERT INTO UserDueHistogram (user_id, due_date, card_count)
+        SELECT user_id, next_review_date, COUNT(*)
+        FROM CardPerformance
+        WHERE user_id = %s
+        GROUP BY user_id, next_review_date
+    """, (user_id,))
+    cursor.execute("""
+        INSERT INTO UserDueHistogram (user_id, due_date, card_count, mcq_count)
+        SELECT user_id, next_review_date, 0, COUNT(*)
+        FROM MCQ_Performance
+        WHERE user_id = %s AND next_review_date IS NOT NULL
+        GROUP BY user_id, next_review_date
+        ON DUPLICATE KEY UPDATE mcq_count = VALUES(mcq_count)
+    """, (user_id,))
+
+def fetch_user_stats(cursor, user_id):
+    """Read the statistics rollup, combined with points and today's StudyLog row"""
+    today = date.today()
+    cursor.execute(f"""
+        SELECT 
+            s.total_decks,
+            s.total_cards,
+            s.total_cards - s.reviewed_cards as new_cards,
+            {CURRENT_POINTS_SQL} as total_points,
+            COALESCE(l.cards_reviewed, 0) as cards_reviewed_today,
+            st.current_streak,
+            st.longest_streak,
+            st.last_study_date,
+            (SELECT COALESCE(SUM(h.card_count), 0) FROM UserDueHistogram h
+             WHERE h.user_id = s.user_id AND h.due_date <= %s) as cards_due,
+            (SELECT COALESCE(SUM(h.card_count), 0) FROM UserDueHistogram h
+             WHERE h.user_id = s.user_id AND h.due_date > %s AND h.due_date <= %s) as cards_upcoming
+        FROM UserStats s
+        JOIN Users u ON u.user_id = s.user_id
+        LEFT JOIN StudyLog l ON l.user_id = s.user_id AND l.study_date = %s
+        LEFT JOIN StudyStreaks st ON st.user_id = s.user_id
+        WHERE s.user_id = %s
+    """, (today, today, today + timedelta(days=7), today, user_id))
+    return cursor.fetchone()
+
+@app.route('/stats', methods=['GET'])
+@login_required
+def get_stats():
+    """Get user statistics"""
+    try:
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
             
-            result = cursor.fetchone()
-            cards_reviewed_today = result['cards_reviewed'] if result else 0
+            stats = fetch_user_stats(cursor, session['user_id'])
+            if stats is None or stats['current_streak'] is None:
+                # First request since the rollup or streak tracking was introduced
+                if stats is None:
+                    rebuild_user_stats(cursor, session['user_id'])
+                backfill_study_streaks(cursor, session['user_id'], session['user_id'] + 1)
+                conn.commit()
+                stats = fetch_user_stats(cursor, session['user_id'])
             
             return jsonify({
                 'stats': {
-                    'total_decks': total_decks,
-                    'total_cards': total_cards,
-                    'cards_due': cards_due,
-                    'cards_upcoming': cards_upcoming,
-                    'new_cards': new_cards,
-                    'current_streak': current_streak,
-                    'total_points': total_points,
-                    'cards_reviewed_today': cards_reviewed_today
+                    'total_decks': int(stats['total_decks']),
+                    'total_cards': int(stats['total_cards']),
+                    'cards_due': int(stats['cards_due']),
+                    'cards_upcoming': int(stats['cards_upcoming']),
+                    'new_cards': int(stats['new_cards']),
+                    'current_streak': effective_streak(stats),
+                    'longest_streak': stats['longest_streak'],
+                    'total_points': stats['total_points'],
+                    'cards_reviewed_today': stats['cards_reviewed_today']
                 }
             }), 200
 
@@ -1099,8 +3131,169 @@ def get_stats():
         logger.error(f"Get stats error: {e}")
         return jsonify({'error': 'Failed to fetch statistics'}), 500
 
+FORECAST_MAX_DAYS = 365
+FORECAST_CACHE_TTL = int(os.environ.get('FORECAST_CACHE_TTL', 300))
+
+# (user_id, today, days) -> due counts, for users whose histogram is not built yet
+forecast_cache = LRUCache(int(os.environ.get('FORECAST_CACHE_SIZE', 1000)), ttl=FORECAST_CACHE_TTL)
+
+def fetch_due_counts(cursor, user_id, until):
+    """
+    [(due_date, cards, mcqs)] for everything due on or before until, read from
+    UserDueHistogram. Returns None if the user's rollup has not been built.
+    """
+    cursor.execute("""
+        SELECT h.due_date, h.card_count, h.mcq_count
+        FROM UserStats s
+        LEFT JOIN UserDueHistogram h ON h.user_id = s.user_id AND h.due_date <= %s
+        WHERE s.user_id = %s
+    """, (until, user_id))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+    return [(row['due_date'], row['card_count'], row['mcq_count']) for row in rows if row['due_date']]
+
+def scan_due_counts(cursor, user_id, until):
+    """Same as fetch_due_counts, from one grouped query over the performance tables"""
+    cursor.execute("""
+        SELECT due_date, SUM(cards) as cards, SUM(mcqs) as mcqs FROM (
+            SELECT next_review_date as due_date, COUNT(*) as cards, 0 as mcqs
+            FROM CardPerformance
+            WHERE user_id = %s AND next_review_date <= %s
+            GROUP BY next_review_date
+            UNION ALL
+            SELECT next_review_date, 0, COUNT(*)
+            FROM MCQ_Performance
+            WHERE user_id = %s AND next_review_date <= %s
+            GROUP BY next_review_date
+        ) due
+        GROUP BY due_date
+    """, (user_id, until, user_id, until))
+    return [(row['due_date'], int(row['cards']), int(row['mcqs'])) for row in cursor.fetchall()]
+
+@app.route('/forecast', methods=['GET'])
+@login_required
+def get_forecast():
+    """Cards and MCQs due on each of the next N days (default 30, at most a year)"""
+    days = min(max(request.args.get('days', default=30, type=int), 1), FORECAST_MAX_DAYS)
+    today = date.today()
+    until = today + timedelta(days=days - 1)
+    
+    try:
+        key = (session['user_id'], today, days)
+        counts = forecast_cache.get(key)
+        if counts is None:
+            with get_db_connection() as conn:
+                cursor = get_db_cursor(conn)
+                counts = fetch_due_counts(cursor, session['user_id'], until)
+                if counts is None:
+                    counts = scan_due_counts(cursor, session['user_id'], until)
+                    forecast_cache.set(key, counts)
+        
+        overdue = {'cards': 0, 'mcqs': 0}
+        forecast = [{'date': (today + timedelta(days=offset)).isoformat(), 'cards': 0, 'mcqs': 0}
+                    for offset in range(days)]
+        for due_date, cards, mcqs in counts:
+            entry = overdue if due_date < today else forecast[(due_date - today).days]
+            entry['cards'] += cards
+            entry['mcqs'] += mcqs
+        
+        return jsonify({
+            'days': days,
+            'overdue': overdue,
+            'forecast': forecast,
+            'total': {
+                'cards': overdue['cards'] + sum(entry['cards'] for entry in forecast),
+                'mcqs': overdue['mcqs'] + sum(entry['mcqs'] for entry in forecast)
+            }
+        }), 200
+
+    except Error as e:
+        logger.error(f"Get forecast error: {e}")
+        return jsonify({'error': 'Failed to fetch forecast'}), 500
+
+@app.route('/stats/workload', methods=['GET'])
+@login_required
+def get_workload_projection():
+    """Simulate the user's daily review load over the next N days"""
+    try:
+        deck_id = request.args.get('deck_id', type=int)
+        days = min(max(request.args.get('days', default=30, type=int), 1), 365)
+        include_new = request.args.get('include_new', default='true').lower() != 'false'
+        
+        # Optional rating distribution override, e.g. ?good=0.6&forgot=0.05
+        rating_probabilities = dict(DEFAULT_RATING_PROBABILITIES)
+        for name in RATING_NAMES:
+            value = request.args.get(name, type=float)
+            if value is not None:
+                if value < 0:
+                    return jsonify({'error': f'Probability for {name} must not be negative'}), 400
+                rating_probabilities[name] = value
+        if sum(rating_probabilities.values()) <= 0:
+            return jsonify({'error': 'Rating probabilities must not all be zero'}), 400
+
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            
+            if deck_id:
+                # Verify deck ownership
+                owner = get_deck_owner(cursor, deck_id)
+                
+                if owner is None:
+                    return jsonify({'error': 'Deck not found'}), 404
+                
+                if owner != session['user_id']:
+                    return jsonify({'error': 'Unauthorized'}), 403
+            
+            deck_filter = "AND c.deck_id = %s" if deck_id else ""
+            deck_params = (deck_id,) if deck_id else ()
+            
+            cursor.execute(f"""
+                SELECT cp.interval, cp.ease_factor, DATEDIFF(cp.next_review_date, CURDATE()) as due_in
+                FROM CardPerformance cp
+                JOIN Cards c ON cp.card_id = c.card_id
+                WHERE cp.user_id = %s {deck_filter}
+            """, (session['user_id'], *deck_params))
+            rows = cursor.fetchall()
+            
+            new_cards = 0
+            if include_new:
+                cursor.execute(f"""
+                    SELECT COUNT(*) as total 
+                    FROM Cards c 
+                    JOIN Decks d ON c.deck_id = d.deck_id 
+                    LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = %s
+                    WHERE d.user_id = %s AND cp.card_id IS NULL {deck_filter}
+                """, (session['user_id'], session['user_id'], *deck_params))
+                new_cards = cursor.fetchone()['total']
+        
+        intervals = np.array([row['interval'] for row in rows] + [0] * new_cards, dtype=np.int64)
+        eases = np.array([float(row['ease_factor']) for row in rows] + [2.5] * new_cards)
+        due_in = np.array([row['due_in'] for row in rows] + [0] * new_cards, dtype=np.int64)
+        
+        load = simulate_review_load(intervals, eases, due_in, days, rating_probabilities, seed=session['user_id'])
+        
+        today = date.today()
+        return jsonify({
+            'days': days,
+            'rating_probabilities': rating_probabilities,
+            'projection': [
+                {'date': (today + timedelta(days=offset)).isoformat(), 'reviews': int(count)}
+                for offset, count in enumerate(load)
+            ],
+            'total_reviews': int(load.sum())
+        }), 200
+
+    except Error as e:
+        logger.error(f"Workload projection error: {e}")
+        return jsonify({'error': 'Failed to project workload'}), 500
+
 def calculate_streak(study_dates):
-    """Calculate current study streak from list of study dates"""
+    """
+    Calculate current study streak from list of study dates (newest first).
+    Reference implementation of the streak rules maintained by log_study_activity;
+    used by backfill_streaks.py --verify.
+    """
     if not study_dates:
         return 0
     
@@ -1132,6 +3325,16 @@ def get_achievements():
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             
+            # Awards bump the user's version; the catalog is covered by its ids
+            version = get_user_version(cursor, session['user_id'])
+            etag = None
+            if version is not None:
+                catalog = get_achievement_catalog(cursor)
+                etag = make_etag('achievements', session['user_id'], version, sorted(catalog.items()))
+            cached = not_modified(etag)
+            if cached:
+                return cached
+            
             # Get all achievements with user's earned status
             cursor.execute("""
                 SELECT 
@@ -1149,11 +3352,11 @@ def get_achievements():
             
             achievements = cursor.fetchall()
             
-            return jsonify({
+            return etag_response({
                 'achievements': achievements,
                 'total': len(achievements),
                 'earned': sum(1 for a in achievements if a['earned'])
-            }), 200
+            }, etag), 200
 
     except Error as e:
         logger.error(f"Get achievements error: {e}")
@@ -1167,12 +3370,11 @@ def check_achievements():
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             
-            new_achievements = []
+            # Evaluate every rule regardless of event
+            dispatch_achievement_events(conn, cursor, session['user_id'], ACHIEVEMENT_EVENTS)
             
-            # Check all achievement types
-            new_achievements.extend(check_deck_achievements(conn, cursor, session['user_id']))
-            new_achievements.extend(check_card_achievements(conn, cursor, session['user_id']))
-            new_achievements.extend(check_study_achievements(conn, cursor, session['user_id']))
+            # Report these along with any awarded in the background
+            new_achievements = pop_achievement_notifications(conn, cursor, session['user_id'])
             
             return jsonify({
                 'message': 'Achievements checked',
@@ -1183,139 +3385,678 @@ def check_achievements():
         logger.error(f"Check achievements error: {e}")
         return jsonify({'error': 'Failed to check achievements'}), 500
 
-def check_deck_achievements(conn, cursor, user_id):
-    """Check and award deck-related achievements"""
-    new_achievements = []
-    
+@app.route('/achievements/notifications', methods=['GET'])
+@login_required
+def get_achievement_notifications():
+    """Achievements earned since the last call (awarded in the background)"""
     try:
-        # Count user's decks
-        cursor.execute("SELECT COUNT(*) as count FROM Decks WHERE user_id = %s", (user_id,))
-        deck_count = cursor.fetchone()['count']
-        
-        # First Steps - Create first deck
-        if deck_count >= 1:
-            new_achievements.extend(award_achievement(conn, cursor, user_id, 'First Steps'))
-        
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            new_achievements = pop_achievement_notifications(conn, cursor, session['user_id'])
+            
+            return jsonify({
+                'new_achievements': new_achievements,
+                'total': len(new_achievements)
+            }), 200
+
     except Error as e:
-        logger.error(f"Check deck achievements error: {e}")
+        logger.error(f"Achievement notifications error: {e}")
+        return jsonify({'error': 'Failed to fetch achievement notifications'}), 500
+
+def pop_achievement_notifications(conn, cursor, user_id):
+    """Earned achievements the user has not been shown yet; marks them as seen"""
+    cursor.execute("""
+        SELECT a.achievement_id, a.name, a.description, a.icon_url, ua.earned_at
+        FROM UserAchievements ua
+        JOIN Achievements a ON a.achievement_id = ua.achievement_id
+        WHERE ua.user_id = %s AND ua.seen_at IS NULL
+        ORDER BY ua.earned_at, a.achievement_id
+    """, (user_id,))
+    unseen = cursor.fetchall()
     
-    return new_achievements
+    if unseen:
+        placeholders = ', '.join(['%s'] * len(unseen))
+        cursor.execute(f"""
+            UPDATE UserAchievements SET seen_at = NOW()
+            WHERE user_id = %s AND achievement_id IN ({placeholders})
+        """, (user_id, *(row['achievement_id'] for row in unseen)))
+        conn.commit()
+    
+    return unseen
+
+# Domain events achievement rules can subscribe to
+ACHIEVEMENT_EVENTS = ('deck_created', 'cards_added', 'review_submitted', 'streak_changed')
+
+# Bonus points for earning an achievement
+ACHIEVEMENT_POINTS = 100
 
-def check_card_achievements(conn, cursor, user_id):
-    """Check and award card-related achievements"""
-    new_achievements = []
+# Achievement name -> (events that can unlock it, condition on the user's counters)
+# Counters come from UserStats and StudyStreaks, see load_achievement_counters
+ACHIEVEMENT_RULES = {
+    'First Steps': (('deck_created',), lambda c: c['total_decks'] >= 1),
+    'Card Collector': (('cards_added',), lambda c: c['total_cards'] >= 50),
+    'Knowledge Builder': (('cards_added',), lambda c: c['total_cards'] >= 250),
+    'Dedicated Learner': (('review_submitted',), lambda c: c['last_study_date'] is not None),
+    '7-Day Streak': (('streak_changed',), lambda c: c['current_streak'] >= 7),
+    '30-Day Streak': (('streak_changed',), lambda c: c['current_streak'] >= 30),
+}
+
+ACHIEVEMENT_CATALOG_TTL = int(os.environ.get('ACHIEVEMENT_CATALOG_TTL', 600))
+
+# Achievement name -> achievement_id; a single entry keyed by None
+achievement_catalog_cache = LRUCache(1, ttl=ACHIEVEMENT_CATALOG_TTL)
+
+# user_id -> set of earned achievement ids
+earned_achievements_cache = LRUCache(int(os.environ.get('EARNED_ACHIEVEMENTS_CACHE_SIZE', 10000)))
+
+def get_achievement_catalog(cursor):
+    """Achievement ids by name, loaded once per ACHIEVEMENT_CATALOG_TTL"""
+    catalog = achievement_catalog_cache.get(None)
+    if catalog is None:
+        cursor.execute("SELECT achievement_id, name FROM Achievements")
+        catalog = {row['name']: row['achievement_id'] for row in cursor.fetchall()}
+        achievement_catalog_cache.set(None, catalog)
+    return catalog
+
+def get_earned_achievements(cursor, user_id):
+    """Ids of the achievements the user has earned"""
+    earned = earned_achievements_cache.get(user_id)
+    if earned is None:
+        cursor.execute("SELECT achievement_id FROM UserAchievements WHERE user_id = %s", (user_id,))
+        earned = frozenset(row['achievement_id'] for row in cursor.fetchall())
+        earned_achievements_cache.set(user_id, earned)
+    return earned
+
+def load_achievement_counters(cursor, user_id):
+    """The maintained counters achievement rules are evaluated against"""
+    cursor.execute("""
+        SELECT total_decks, total_cards FROM UserStats WHERE user_id = %s
+    """, (user_id,))
+    counters = cursor.fetchone()
     
-    try:
-        # Count user's total cards
+    if counters is None:
+        # Rollup not built yet for this user
+        rebuild_user_stats(cursor, user_id)
         cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM Cards c 
-            JOIN Decks d ON c.deck_id = d.deck_id 
-            WHERE d.user_id = %s
+            SELECT total_decks, total_cards FROM UserStats WHERE user_id = %s
         """, (user_id,))
-        card_count = cursor.fetchone()['count']
-        
-        # Card Collector - 50 cards
-        if card_count >= 50:
-            new_achievements.extend(award_achievement(conn, cursor, user_id, 'Card Collector'))
-        
-        # Knowledge Builder - 250 cards
-        if card_count >= 250:
-            new_achievements.extend(award_achievement(conn, cursor, user_id, 'Knowledge Builder'))
+        counters = cursor.fetchone()
+    
+    current_streak, streak = get_streak(cursor, user_id)
+    return dict(counters, current_streak=current_streak, last_study_date=streak['last_study_date'])
+
+def dispatch_achievement_events(conn, cursor, user_id, events):
+    """
+    Evaluate the achievement rules subscribed to the given events and award
+    any that are now satisfied. Rules for achievements the user already has
+    are skipped without touching the database, so once a user has earned
+    everything an event can unlock, the event costs nothing.
+    Returns: list of newly earned achievements
+    """
+    catalog = get_achievement_catalog(cursor)
+    earned = get_earned_achievements(cursor, user_id)
+    
+    pending = [
+        (name, condition)
+        for name, (subscribed, condition) in ACHIEVEMENT_RULES.items()
+        if name in catalog and catalog[name] not in earned
+        and any(event in subscribed for event in events)
+    ]
+    if not pending:
+        return []
+    
+    counters = load_achievement_counters(cursor, user_id)
+    unlocked = [name for name, condition in pending if condition(counters)]
+    if not unlocked:
+        return []
+    
+    return award_achievements(conn, cursor, user_id, unlocked)
+
+def award_achievements(conn, cursor, user_id, achievement_names):
+    """
+    Award several achievements with one insert and one points update.
+    Returns: the achievements that were newly earned (others may already have
+    been awarded through another worker)
+    """
+    catalog = get_achievement_catalog(cursor)
+    requested = {catalog[name]: name for name in achievement_names}
+    
+    # Lock the user's rows (and the gaps for missing ones) so a concurrent
+    # worker cannot award the same achievements between this read and the insert
+    placeholders = ', '.join(['%s'] * len(requested))
+    cursor.execute(f"""
+        SELECT achievement_id FROM UserAchievements
+        WHERE user_id = %s AND achievement_id IN ({placeholders})
+        FOR UPDATE
+    """, (user_id, *requested))
+    already_earned = {row['achievement_id'] for row in cursor.fetchall()}
+    new_ids = [achievement_id for achievement_id in requested if achievement_id not in already_earned]
+    
+    if new_ids:
+        values = ', '.join(['(%s, %s)'] * len(new_ids))
+        cursor.execute(f"""
+            INSERT IGNORE INTO UserAchievements (user_id, achievement_id) 
+            VALUES {values}
+        """, tuple(value for achievement_id in new_ids for value in (user_id, achievement_id)))
         
-    except Error as e:
-        logger.error(f"Check card achievements error: {e}")
+        # Bonus points for earning achievements
+        add_points(cursor, user_id, [(ACHIEVEMENT_POINTS, 'achievement', achievement_id) for achievement_id in new_ids])
+        # Invalidates the user's cached /achievements response
+        cursor.execute("UPDATE UserStats SET version = version + 1 WHERE user_id = %s", (user_id,))
+    conn.commit()
+    
+    if already_earned:
+        # Awarded through another worker since the earned set was cached; reload it
+        earned_achievements_cache.pop(user_id)
+        get_earned_achievements(cursor, user_id)
+    else:
+        earned = get_earned_achievements(cursor, user_id) | set(new_ids)
+        earned_achievements_cache.set(user_id, frozenset(earned))
     
-    return new_achievements
+    if not new_ids:
+        return []
+    
+    logger.info(f"Achievements awarded: {', '.join(requested[achievement_id] for achievement_id in new_ids)} to user {user_id}")
+    return [
+        {'name': requested[achievement_id], 'achievement_id': achievement_id}
+        for achievement_id in new_ids
+    ]
+
+# ============================================================================
+# BACKGROUND EVENT QUEUE
+# ============================================================================
+
+# Handlers record domain events in the EventOutbox table in the same
+# transaction as the change that caused them; achievements (and their bonus
+# points) are then evaluated here, off the request path
+EVENT_QUEUE_CONFIG = {
+    'workers': int(os.environ.get('EVENT_WORKERS', 2)),
+    'batch_size': int(os.environ.get('EVENT_BATCH_SIZE', 100)),
+    'poll_interval': float(os.environ.get('EVENT_POLL_INTERVAL', 5)),
+    'lease_seconds': int(os.environ.get('EVENT_LEASE_SECONDS', 60)),
+    'max_attempts': int(os.environ.get('EVENT_MAX_ATTEMPTS', 5))
+}
+
+class EventQueue:
+    """
+    Processes events from the EventOutbox table on a pool of worker threads.
+    A dispatcher thread claims pending events in batches (a claim is a lease,
+    so several app processes can share the table), groups them by user and
+    hands each user's events to the handler. Processed events are deleted;
+    events left behind by a crash or a failed handler are claimed again once
+    their lease expires, up to max_attempts times.
+    """
 
-def check_study_achievements(conn, cursor, user_id):
-    """Check and award study-related achievements"""
-    new_achievements = []
-    
-    try:
-        # Check if user has any study sessions
-        cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM StudyLog 
-            WHERE user_id = %s
-        """, (user_id,))
-        
-        if cursor.fetchone()['count'] > 0:
-            new_achievements.extend(award_achievement(conn, cursor, user_id, 'Dedicated Learner'))
-        
-        # Get study dates for streak calculation
-        cursor.execute("""
-            SELECT study_date 
-            FROM StudyLog 
-            WHERE user_id = %s 
-            ORDER BY study_date DESC
-        """, (user_id,))
+    def __init__(self, handler, workers=2, batch_size=100, poll_interval=5.0, lease_seconds=60, max_attempts=5):
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._executor = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+        self._in_flight = 0
+        self._claimed = 0
+        self._processed = 0
+        self._failed = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._last_lag = None
+
+    def start(self):
+        """Start the dispatcher and workers (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='event-worker')
+        threading.Thread(target=self._dispatch_loop, name='event-dispatcher', daemon=True).start()
+        logger.info(f"Event queue started with {self.workers} worker(s)")
+
+    def notify(self):
+        """Wake the dispatcher after committing new events"""
+        self._wakeup.set()
+
+    def _dispatch_loop(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                while self._dispatch_batch() == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Event dispatch error: {e}")
+
+    def _dispatch_batch(self):
+        """Claim up to batch_size events and submit them; returns the number claimed"""
+        with self._lock:
+            # Leave events in the table while the workers are saturated
+            if self._in_flight >= self.workers * 2:
+                return 0
         
-        study_dates = [row['study_date'] for row in cursor.fetchall()]
-        current_streak = calculate_streak(study_dates)
+        token = uuid.uuid4().hex
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            cursor.execute("""
+                UPDATE EventOutbox
+                SET claim_token = %s,
+                    claimed_until = NOW(3) + INTERVAL %s SECOND,
+                    attempts = attempts + 1
+                WHERE (claimed_until IS NULL OR claimed_until < NOW(3))
+                  AND attempts < %s
+                ORDER BY event_id
+                LIMIT %s
+            """, (token, self.lease_seconds, self.max_attempts, self.batch_size))
+            conn.commit()
+            if cursor.rowcount == 0:
+                return 0
+            
+            cursor.execute("""
+                SELECT event_id, user_id, event_type,
+                       TIMESTAMPDIFF(MICROSECOND, created_at, NOW(3)) / 1000 as lag_ms
+                FROM EventOutbox
+                WHERE claim_token = %s
+            """, (token,))
+            claimed = cursor.fetchall()
         
-        # 7-Day Streak
-        if current_streak >= 7:
-            new_achievements.extend(award_achievement(conn, cursor, user_id, '7-Day Streak'))
+        by_user = {}
+        for event in claimed:
+            group = by_user.setdefault(event['user_id'], {'event_ids': [], 'events': set(), 'lag_ms': 0.0})
+            group['event_ids'].append(event['event_id'])
+            group['events'].add(event['event_type'])
+            group['lag_ms'] = max(group['lag_ms'], float(event['lag_ms']))
         
-        # 30-Day Streak
-        if current_streak >= 30:
-            new_achievements.extend(award_achievement(conn, cursor, user_id, '30-Day Streak'))
+        claimed_at = time.monotonic()
+        with self._lock:
+            self._claimed += len(claimed)
+            self._in_flight += len(by_user)
+        for user_id, group in by_user.items():
+            self._executor.submit(
+                self._run, user_id, group['event_ids'], group['events'], group['lag_ms'], claimed_at
+            )
+        return len(claimed)
+
+    def _run(self, user_id, event_ids, events, lag_ms, claimed_at):
+        try:
+            self.handler(user_id, event_ids, events)
+            lag_ms += (time.monotonic() - claimed_at) * 1000
+            with self._lock:
+                self._processed += len(event_ids)
+                self._lag_total += lag_ms * len(event_ids)
+                self._lag_max = max(self._lag_max, lag_ms)
+                self._last_lag = lag_ms
+        except Exception as e:
+            logger.error(f"Event processing error for user {user_id}: {e}")
+            with self._lock:
+                self._failed += len(event_ids)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            # More events may have been left behind while saturated
+            self.notify()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'running': self._started,
+                'workers': self.workers,
+                'in_flight': self._in_flight,
+                'claimed': self._claimed,
+                'processed': self._processed,
+                'failed': self._failed,
+                'lag_ms_avg': round(self._lag_total / self._processed, 2) if self._processed else None,
+                'lag_ms_max': round(self._lag_max, 2),
+                'lag_ms_last': round(self._last_lag, 2) if self._last_lag is not None else None
+            }
+
+def enqueue_events(cursor, user_id, events):
+    """Record domain events in the outbox as part of the caller's transaction"""
+    values = ', '.join(['(%s, %s)'] * len(events))
+    cursor.execute(f"""
+        INSERT INTO EventOutbox (user_id, event_type) VALUES {values}
+    """, tuple(value for event in events for value in (user_id, event)))
+
+def process_user_events(user_id, event_ids, events):
+    """Evaluate achievements for one user's events, then remove the events"""
+    with get_db_connection() as conn:
+        cursor = get_db_cursor(conn)
+        dispatch_achievement_events(conn, cursor, user_id, events)
         
-    except Error as e:
-        logger.error(f"Check study achievements error: {e}")
-    
-    return new_achievements
+        placeholders = ', '.join(['%s'] * len(event_ids))
+        cursor.execute(f"DELETE FROM EventOutbox WHERE event_id IN ({placeholders})", tuple(event_ids))
+        conn.commit()
+
+event_queue = EventQueue(process_user_events, **EVENT_QUEUE_CONFIG)
 
-def award_achievement(conn, cursor, user_id, achievement_name):
-    """Award an achievement to a user if not already earned"""
+@app.before_request
+def start_event_queue():
+    """Start the background workers with the first request (picks up events left by a restart)"""
+    event_queue.start()
+
+# ============================================================================
+# POINTS LEDGER
+# ============================================================================
+
+# Points are appended to PointsLedger with the change that earned them, so
+# the hot write paths never lock the user's Users row. A background
+# aggregator folds unfolded entries into Users.points; reads add the
+# unfolded tail to the folded balance. Folded entries are kept as history.
+POINTS_FOLD_INTERVAL = float(os.environ.get('POINTS_FOLD_INTERVAL', 10))
+POINTS_FOLD_BATCH = int(os.environ.get('POINTS_FOLD_BATCH', 5000))
+
+# Points for a correct MCQ answer
+MCQ_CORRECT_POINTS = 5
+
+# A user's current points; use with Users aliased as u
+CURRENT_POINTS_SQL = (
+    "CAST(u.points + COALESCE((SELECT SUM(pl.points) FROM PointsLedger pl "
+    "WHERE pl.user_id = u.user_id AND NOT pl.folded), 0) AS SIGNED)"
+)
+
+def add_points(cursor, user_id, entries):
+    """Append (points, reason, reference_id) entries inside the caller's transaction"""
+    entries = [entry for entry in entries if entry[0]]
+    if not entries:
+        return
+    values = ', '.join(['(%s, %s, %s, %s)'] * len(entries))
+    cursor.execute(f"""
+        INSERT INTO PointsLedger (user_id, points, reason, reference_id) VALUES {values}
+    """, tuple(value for points, reason, reference_id in entries for value in (user_id, points, reason, reference_id)))
+
+def fold_points_ledger(conn, cursor, batch_size=POINTS_FOLD_BATCH):
+    """
+    Fold up to batch_size unfolded entries into Users.points in one
+    transaction; returns the number folded. A named lock keeps processes
+    from folding the same entries twice.
+    """
+    cursor.execute("SELECT GET_LOCK('autorevise_points_fold', 0) as acquired")
+    if not cursor.fetchone()['acquired']:
+        return 0
     try:
-        # Get achievement ID
-        cursor.execute(
-            "SELECT achievement_id FROM Achievements WHERE name = %s",
-            (achievement_name,)
-        )
-        achievement = cursor.fetchone()
-        
-        if not achievement:
-            return []
-        
-        achievement_id = achievement['achievement_id']
-        
-        # Check if already earned
         cursor.execute("""
-            SELECT * FROM UserAchievements 
-            WHERE user_id = %s AND achievement_id = %s
-        """, (user_id, achievement_id))
-        
-        if cursor.fetchone():
-            return []  # Already earned
+            SELECT entry_id, user_id, points FROM PointsLedger
+            WHERE NOT folded
+            ORDER BY entry_id
+            LIMIT %s
+        """, (batch_size,))
+        entries = cursor.fetchall()
+        if not entries:
+            conn.commit()
+            return 0
         
-        # Award achievement
-        cursor.execute("""
-            INSERT INTO UserAchievements (user_id, achievement_id) 
-            VALUES (%s, %s)
-        """, (user_id, achievement_id))
+        totals = Counter()
+        for entry in entries:
+            totals[entry['user_id']] += entry['points']
         
-        # Bonus points for earning achievement
+        cursor.executemany(
+            "UPDATE Users SET points = points + %s WHERE user_id = %s",
+            [(points, user_id) for user_id, points in sorted(totals.items())]
+        )
+        placeholders = ', '.join(['%s'] * len(entries))
         cursor.execute(
-            "UPDATE Users SET points = points + 100 WHERE user_id = %s",
-            (user_id,)
+            f"UPDATE PointsLedger SET folded = TRUE WHERE entry_id IN ({placeholders})",
+            tuple(entry['entry_id'] for entry in entries)
         )
-        
         conn.commit()
-        
-        logger.info(f"Achievement awarded: {achievement_name} to user {user_id}")
-        return [{'name': achievement_name, 'achievement_id': achievement_id}]
-        
+        return len(entries)
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK('autorevise_points_fold')")
+        cursor.fetchall()
+
+class PointsAggregator:
+    """Background thread folding the points ledger every interval seconds"""
+
+    def __init__(self, interval=POINTS_FOLD_INTERVAL, batch_size=POINTS_FOLD_BATCH):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._started = False
+        self._folded = 0
+        self._runs = 0
+        self._last_run = None
+
+    def start(self):
+        """Start the aggregator thread (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._loop, name='points-aggregator', daemon=True).start()
+        logger.info(f"Points aggregator started (every {self.interval}s)")
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.fold()
+            except Exception as e:
+                logger.error(f"Points fold error: {e}")
+
+    def fold(self):
+        """Fold until the ledger has no unfolded entries; returns the number folded"""
+        folded = 0
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            while True:
+                count = fold_points_ledger(conn, cursor, self.batch_size)
+                folded += count
+                if count < self.batch_size:
+                    break
+        with self._lock:
+            self._folded += folded
+            self._runs += 1
+            self._last_run = datetime.now().isoformat()
+        return folded
+
+    def stats(self):
+        with self._lock:
+            return {
+                'running': self._started,
+                'interval_s': self.interval,
+                'runs': self._runs,
+                'folded': self._folded,
+                'last_run': self._last_run
+            }
+
+points_aggregator = PointsAggregator()
+
+@app.before_request
+def start_points_aggregator():
+    points_aggregator.start()
+
+@app.route('/points/history', methods=['GET'])
+@login_required
+def get_points_history():
+    """The user's points ledger, newest first (?limit=&cursor= to page)"""
+    try:
+        limit, after = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            entries, next_cursor = keyset_page(cursor, """
+                SELECT entry_id, points, reason, reference_id, created_at
+                FROM PointsLedger
+                WHERE user_id = %s
+            """, (session['user_id'],), 'created_at', 'entry_id', 'entry_id', limit, after)
+            
+            return jsonify({'entries': entries, 'next_cursor': next_cursor}), 200
+    
     except Error as e:
-        logger.error(f"Award achievement error: {e}")
-        return []
+        logger.error(f"Get points history error: {e}")
+        return jsonify({'error': 'Failed to fetch points history'}), 500
+
+# ============================================================================
+# REVIEW LOG
+# ============================================================================
+
+# Every card review and MCQ answer is appended to ReviewLog (range-partitioned
+# by month, see schema_review_log.sql). Records are buffered in memory after
+# the review commits and inserted in batches by a background thread; cold
+# partitions are exported and dropped by archive_review_log.py.
+REVIEW_LOG_BATCH_SIZE = int(os.environ.get('REVIEW_LOG_BATCH_SIZE', 500))
+REVIEW_LOG_FLUSH_INTERVAL = float(os.environ.get('REVIEW_LOG_FLUSH_INTERVAL', 2))
+REVIEW_LOG_MAX_BUFFER = int(os.environ.get('REVIEW_LOG_MAX_BUFFER', 100000))
+
+# Longest response time recorded; longer values are treated as the card being left open
+MAX_RESPONSE_MS = 3600 * 1000
+
+REVIEW_LOG_COLUMNS = (
+    'reviewed_at', 'user_id', 'item_type', 'item_id', 'rating',
+    'prev_interval', 'new_interval', 'ease_factor', 'response_ms'
+)
+
+def parse_response_ms(value):
+    """Client-measured time to answer in milliseconds, or None if missing or invalid"""
+    try:
+        response_ms = int(value)
+    except (TypeError, ValueError):
+        return None
+    return min(response_ms, MAX_RESPONSE_MS) if response_ms >= 0 else None
+
+class ReviewLogWriter:
+    """
+    Buffers review records and inserts them in batches from a background
+    thread. If the database is unavailable the buffer is kept (up to
+    max_buffer records, oldest dropped first) and retried on the next flush.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=2.0, max_buffer=100000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._started = False
+        self._written = 0
+        self._dropped = 0
+        self._failed_flushes = 0
+
+    def start(self):
+        """Start the flusher thread (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._loop, name='review-log-writer', daemon=True).start()
+        atexit.register(self.flush)
+
+    def append(self, records):
+        """Queue (reviewed_at, user_id, item_type, item_id, rating, prev_interval, new_interval, ease, response_ms) tuples"""
+        with self._lock:
+            self._buffer.extend(records)
+            overflow = len(self._buffer) - self.max_buffer
+            for _ in range(max(overflow, 0)):
+                self._buffer.popleft()
+            self._dropped += max(overflow, 0)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Review log flush error: {e}")
+
+    def flush(self):
+        """Insert everything buffered, batch_size records per statement"""
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return
+                try:
+                    with get_db_connection() as conn:
+                        cursor = get_db_cursor(conn)
+                        cursor.executemany(f"""
+                            INSERT INTO ReviewLog ({', '.join(REVIEW_LOG_COLUMNS)})
+                            VALUES ({', '.join(['%s'] * len(REVIEW_LOG_COLUMNS))})
+                        """, batch)
+                        conn.commit()
+                except Exception:
+                    # Keep the records for the next attempt
+                    with self._lock:
+                        self._buffer.extendleft(reversed(batch))
+                        self._failed_flushes += 1
+                    raise
+                with self._lock:
+                    self._written += len(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'buffered': len(self._buffer),
+                'written': self._written,
+                'dropped': self._dropped,
+                'failed_flushes': self._failed_flushes
+            }
+
+review_log = ReviewLogWriter(REVIEW_LOG_BATCH_SIZE, REVIEW_LOG_FLUSH_INTERVAL, REVIEW_LOG_MAX_BUFFER)
+
+@app.before_request
+def start_review_log():
+    review_log.start()
 
 # ============================================================================
 # MCQ ROUTES
 # ============================================================================
 
+# The category catalog is the same for every user, so it is cached
+# process-wide. Other processes (app workers, schema scripts) invalidate it
+# by touching the stamp file; a cached catalog is only used while the stamp
+# is unchanged and at most MCQ_CATEGORY_CACHE_TTL seconds old
+MCQ_CATEGORY_CACHE_TTL = int(os.environ.get('MCQ_CATEGORY_CACHE_TTL', 300))
+MCQ_CATEGORY_STAMP_FILE = os.environ.get(
+    'MCQ_CATEGORY_STAMP_FILE',
+    os.path.join(tempfile.gettempdir(), 'autorevise-mcq-categories.stamp')
+)
+mcq_category_cache = LRUCache(1, ttl=MCQ_CATEGORY_CACHE_TTL)
+
+def invalidate_mcq_categories():
+    """Drop the cached category catalog in this and every other process"""
+    mcq_category_cache.clear()
+    touch_stamp(MCQ_CATEGORY_STAMP_FILE)
+
+def get_category_catalog(cursor):
+    """
+    All MCQ categories with their question counts (cached).
+    Returns: (categories, etag)
+    """
+    stamp = read_stamp(MCQ_CATEGORY_STAMP_FILE)
+    catalog = mcq_category_cache.get(stamp)
+    if catalog is None:
+        cursor.execute("""
+            SELECT c.category_id, c.category_name, c.description, c.icon, c.created_at,
+                   COALESCE(q.question_count, 0) as question_count
+            FROM MCQ_Categories c
+            LEFT JOIN (
+                SELECT category_id, COUNT(*) as question_count
+                FROM MCQ_Questions
+                WHERE category_id IS NOT NULL
+                GROUP BY category_id
+            ) q ON q.category_id = c.category_id
+            ORDER BY c.category_name
+        """)
+        categories = cursor.fetchall()
+        catalog = (categories, make_etag('categories', categories))
+        mcq_category_cache.set(stamp, catalog)
+    return catalog
+
 @app.route('/mcq/categories', methods=['GET'])
 @login_required
 def get_mcq_categories():
@@ -1323,27 +4064,12 @@ def get_mcq_categories():
     try:
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
+            categories, etag = get_category_catalog(cursor)
+            cached = not_modified(etag)
+            if cached:
+                return cached
             
-            cursor.execute("""
-                SELECT category_id, category_name, description, icon, created_at
-                FROM MCQ_Categories
-                ORDER BY category_name
-            """)
-            
-            categories = cursor.fetchall()
-            
-            # Get question count per category
-            for category in categories:
-                cursor.execute("""
-                    SELECT COUNT(*) as count
-                    FROM MCQ_Questions
-                    WHERE category_id = %s
-                """, (category['category_id'],))
-                
-                count_result = cursor.fetchone()
-                category['question_count'] = count_result['count'] if count_result else 0
-            
-            return jsonify({'categories': categories}), 200
+            return etag_response({'categories': categories}, etag), 200
     
     except Error as e:
         logger.error(f"Get categories error: {e}")
@@ -1353,7 +4079,12 @@ def get_mcq_categories():
 @app.route('/mcq/category/<int:category_id>', methods=['GET'])
 @login_required
 def get_mcqs_by_category(category_id):
-    """Get all MCQs for a specific category"""
+    """Get the MCQs in a category, newest first (?limit=&cursor= to page)"""
+    try:
+        limit, after = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     try:
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
@@ -1378,15 +4109,16 @@ def get_mcqs_by_category(category_id):
                 FROM MCQ_Questions m
                 LEFT JOIN Decks d ON m.deck_id = d.deck_id
                 WHERE m.category_id = %s
-                ORDER BY m.created_at DESC
             """
-            cursor.execute(query, (category_id,))
-            mcqs = cursor.fetchall()
+            mcqs, next_cursor = keyset_page(
+                cursor, query, (category_id,), 'm.created_at', 'm.mcq_id', 'mcq_id', limit, after
+            )
             
             return jsonify({
                 'category': category,
                 'mcqs': mcqs,
-                'total': len(mcqs)
+                'total': len(mcqs),
+                'next_cursor': next_cursor
             }), 200
     
     except Error as e:
@@ -1394,10 +4126,121 @@ def get_mcqs_by_category(category_id):
         return jsonify({'error': 'Failed to fetch MCQs'}), 500
 
 
+# MCQ imports run as background jobs tracked in MCQ_Upload_Log
+MCQ_IMPORT_CHUNK_SIZE = int(os.environ.get('MCQ_IMPORT_CHUNK_SIZE', 500))
+MCQ_UPLOAD_DIR = os.environ.get('MCQ_UPLOAD_DIR', tempfile.gettempdir())
+mcq_import_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('MCQ_IMPORT_WORKERS', 1)),
+    thread_name_prefix='mcq-import'
+)
+
+# Jobs refresh heartbeat_at as they progress (queued jobs through the job
+# running ahead of them); a queued or running job without a heartbeat for
+# this long was lost with its process and is marked failed
+MCQ_IMPORT_STALE_SECONDS = int(os.environ.get('MCQ_IMPORT_STALE_SECONDS', 900))
+
+# Jobs queued by this process that have not started yet
+queued_mcq_imports = set()
+queued_mcq_imports_lock = threading.Lock()
+mcq_import_recovery_done = False
+
+def mcq_upload_path(job_id):
+    """Where a queued job's CSV is kept until the job finishes"""
+    return os.path.join(MCQ_UPLOAD_DIR, f'mcq-upload-{job_id}.csv')
+
+def fail_stale_mcq_imports(conn, cursor, job_id=None):
+    """Mark queued/running jobs (all, or just job_id) without a recent heartbeat as failed"""
+    job_filter = "AND upload_id = %s" if job_id else ""
+    cursor.execute(f"""
+        SELECT upload_id FROM MCQ_Upload_Log
+        WHERE status IN ('queued', 'running')
+        AND COALESCE(heartbeat_at, upload_date) < NOW() - INTERVAL %s SECOND {job_filter}
+    """, (MCQ_IMPORT_STALE_SECONDS, *((job_id,) if job_id else ())))
+    stale = [row['upload_id'] for row in cursor.fetchall()]
+    if not stale:
+        return 0
+    
+    placeholders = ', '.join(['%s'] * len(stale))
+    cursor.execute(f"""
+        UPDATE MCQ_Upload_Log
+        SET status = 'failed', message = 'Import interrupted (server restarted)', finished_at = NOW()
+        WHERE upload_id IN ({placeholders}) AND status IN ('queued', 'running')
+    """, tuple(stale))
+    conn.commit()
+    
+    for stale_id in stale:
+        if os.path.exists(mcq_upload_path(stale_id)):
+            os.remove(mcq_upload_path(stale_id))
+    logger.warning(f"Marked {len(stale)} interrupted MCQ upload job(s) as failed: {stale}")
+    return len(stale)
+
+@app.before_request
+def recover_mcq_imports():
+    """Once per process: fail jobs left queued or running by a previous process"""
+    global mcq_import_recovery_done
+    if mcq_import_recovery_done:
+        return
+    mcq_import_recovery_done = True
+    try:
+        with get_db_connection() as conn:
+            fail_stale_mcq_imports(conn, get_db_cursor(conn))
+    except Error as e:
+        logger.error(f"MCQ upload job recovery failed: {e}")
+
+MCQ_REQUIRED_COLUMNS = ['question_text', 'option_a', 'option_b', 'option_c', 'option_d',
+                        'correct_option', 'deck_id']
+
+def validate_mcq_row(row, default_category_id=None):
+    """
+    Validate one CSV row of an MCQ upload.
+    Returns: (deck_id, category_id, question_text, option_a, option_b, option_c,
+              option_d, correct_option, explanation, difficulty)
+    Raises: ValueError describing the first problem found
+    """
+    question_text = (row.get('question_text') or '').strip()
+    option_a = (row.get('option_a') or '').strip()
+    option_b = (row.get('option_b') or '').strip()
+    option_c = (row.get('option_c') or '').strip()
+    option_d = (row.get('option_d') or '').strip()
+    correct_option = (row.get('correct_option') or '').strip().upper()
+    deck_id = (row.get('deck_id') or '').strip()
+    
+    # Optional fields
+    explanation = (row.get('explanation') or '').strip() or None
+    difficulty = (row.get('difficulty') or 'medium').strip().lower()
+    
+    # Category can come from CSV or form data
+    row_category_id = (row.get('category_id') or '').strip()
+    if row_category_id and row_category_id.isdigit():
+        category_id = int(row_category_id)
+    else:
+        category_id = default_category_id
+    
+    if not question_text:
+        raise ValueError("Question text cannot be empty")
+    
+    if not all([option_a, option_b, option_c, option_d]):
+        raise ValueError("All four options must be provided")
+    
+    if correct_option not in ['A', 'B', 'C', 'D']:
+        raise ValueError(f"Correct option must be A, B, C, or D, got: {correct_option}")
+    
+    if difficulty not in ['easy', 'medium', 'hard']:
+        raise ValueError(f"Difficulty must be easy, medium, or hard, got: {difficulty}")
+    
+    if not deck_id or not deck_id.isdigit():
+        raise ValueError(f"Invalid deck_id: {deck_id}")
+    
+    return (int(deck_id), category_id, question_text, option_a, option_b, option_c, option_d,
+            correct_option, explanation, difficulty)
+
 @app.route('/mcq/upload', methods=['POST'])
 @admin_required
 def upload_mcq_csv():
-    """Admin-only: Upload MCQs from CSV file"""
+    """
+    Admin-only: Upload MCQs from CSV file.
+    The file is validated and queued; poll /mcq/upload/<job_id> for progress.
+    """
     try:
         # Check if file is present
         if 'file' not in request.files:
@@ -1418,124 +4261,65 @@ def upload_mcq_csv():
         else:
             category_id = None
         
-        # Read CSV file
-        stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
-        csv_reader = csv.DictReader(stream)
-        
-        # Validate required columns
-        required_columns = ['question_text', 'option_a', 'option_b', 'option_c', 'option_d', 
-                          'correct_option', 'deck_id']
-        
-        if not all(col in csv_reader.fieldnames for col in required_columns):
-            return jsonify({
-                'error': 'CSV missing required columns',
-                'required': required_columns,
-                'found': csv_reader.fieldnames
-            }), 400
-        
-        successful_imports = 0
-        failed_imports = 0
-        errors = []
+        # Keep a copy for the job; the request's stream is gone once we respond
+        fd, path = tempfile.mkstemp(prefix='mcq-upload-', suffix='.csv', dir=MCQ_UPLOAD_DIR)
+        with os.fdopen(fd, 'wb') as saved:
+            file.save(saved)
         
-        with get_db_connection() as conn:
-            cursor = get_db_cursor(conn)
+        try:
+            # Validate required columns
+            with open(path, newline='', encoding='utf-8-sig') as saved:
+                fieldnames = csv.DictReader(saved).fieldnames or []
             
-            # If category_id provided, verify it exists
-            if category_id:
-                cursor.execute("SELECT category_id FROM MCQ_Categories WHERE category_id = %s", (category_id,))
-                if not cursor.fetchone():
-                    return jsonify({'error': f'Category {category_id} does not exist'}), 400
+            if not all(col in fieldnames for col in MCQ_REQUIRED_COLUMNS):
+                os.remove(path)
+                return jsonify({
+                    'error': 'CSV missing required columns',
+                    'required': MCQ_REQUIRED_COLUMNS,
+                    'found': fieldnames
+                }), 400
             
-            for row_num, row in enumerate(csv_reader, start=2):  # start=2 because row 1 is header
-                try:
-                    # Validate required fields
-                    question_text = row.get('question_text', '').strip()
-                    option_a = row.get('option_a', '').strip()
-                    option_b = row.get('option_b', '').strip()
-                    option_c = row.get('option_c', '').strip()
-                    option_d = row.get('option_d', '').strip()
-                    correct_option = row.get('correct_option', '').strip().upper()
-                    deck_id = row.get('deck_id', '').strip()
-                    
-                    # Optional fields
-                    explanation = row.get('explanation', '').strip() or None
-                    difficulty = row.get('difficulty', 'medium').strip().lower()
-                    
-                    # Category can come from CSV or form data
-                    row_category_id = row.get('category_id', '').strip()
-                    if row_category_id and row_category_id.isdigit():
-                        final_category_id = int(row_category_id)
-                    else:
-                        final_category_id = category_id  # Use form data category
-                    
-                    # Validation
-                    if not question_text:
-                        raise ValueError("Question text cannot be empty")
-                    
-                    if not all([option_a, option_b, option_c, option_d]):
-                        raise ValueError("All four options must be provided")
-                    
-                    if correct_option not in ['A', 'B', 'C', 'D']:
-                        raise ValueError(f"Correct option must be A, B, C, or D, got: {correct_option}")
-                    
-                    if difficulty not in ['easy', 'medium', 'hard']:
-                        raise ValueError(f"Difficulty must be easy, medium, or hard, got: {difficulty}")
-                    
-                    if not deck_id or not deck_id.isdigit():
-                        raise ValueError(f"Invalid deck_id: {deck_id}")
-                    
-                    deck_id = int(deck_id)
-                    
-                    # Check if deck exists
-                    cursor.execute("SELECT deck_id FROM Decks WHERE deck_id = %s", (deck_id,))
+            with get_db_connection() as conn:
+                cursor = get_db_cursor(conn)
+                
+                # If category_id provided, verify it exists
+                if category_id:
+                    cursor.execute("SELECT category_id FROM MCQ_Categories WHERE category_id = %s", (category_id,))
                     if not cursor.fetchone():
-                        raise ValueError(f"Deck {deck_id} does not exist")
-                    
-                    # Insert MCQ with category
-                    insert_query = """
-                        INSERT INTO MCQ_Questions 
-                        (deck_id, category_id, question_text, option_a, option_b, option_c, option_d, 
-                         correct_option, explanation, difficulty, created_by)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    cursor.execute(insert_query, (
-                        deck_id, final_category_id, question_text, option_a, option_b, option_c, option_d,
-                        correct_option, explanation, difficulty, session['user_id']
-                    ))
-                    
-                    successful_imports += 1
-                    
-                except Exception as row_error:
-                    failed_imports += 1
-                    errors.append({
-                        'row': row_num,
-                        'error': str(row_error),
-                        'data': row
-                    })
-                    logger.error(f"Error importing row {row_num}: {row_error}")
-            
-            # Log the upload with category
-            log_query = """
-                INSERT INTO MCQ_Upload_Log 
-                (admin_id, filename, category_id, total_questions, successful_imports, failed_imports)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            total_questions = successful_imports + failed_imports
-            cursor.execute(log_query, (
-                session['user_id'], file.filename, category_id, total_questions, 
-                successful_imports, failed_imports
-            ))
+                        os.remove(path)
+                        return jsonify({'error': f'Category {category_id} does not exist'}), 400
+                
+                cursor.execute("""
+                    INSERT INTO MCQ_Upload_Log 
+                    (admin_id, filename, category_id, total_questions, successful_imports, failed_imports,
+                     status, heartbeat_at)
+                    VALUES (%s, %s, %s, 0, 0, 0, 'queued', NOW())
+                """, (session['user_id'], file.filename, category_id))
+                job_id = cursor.lastrowid
+                conn.commit()
             
-            conn.commit()
+            # Named after the job so recovery can remove it if the job is lost
+            os.replace(path, mcq_upload_path(job_id))
+            path = mcq_upload_path(job_id)
+        except Exception:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        
+        with queued_mcq_imports_lock:
+            queued_mcq_imports.add(job_id)
+        mcq_import_executor.submit(run_mcq_import, job_id, path, session['user_id'], category_id)
+        logger.info(f"MCQ upload queued: job {job_id}, file {file.filename}, admin {session['user_id']}")
         
         return jsonify({
-            'message': 'MCQ upload completed',
-            'total_processed': successful_imports + failed_imports,
-            'successful': successful_imports,
-            'failed': failed_imports,
-            'errors': errors[:10]  # Return first 10 errors
-        }), 200 if failed_imports == 0 else 207  # 207 Multi-Status if there were partial failures
+            'message': 'MCQ upload queued',
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/mcq/upload/{job_id}'
+        }), 202
     
+    except UnicodeDecodeError as e:
+        return jsonify({'error': 'File must be UTF-8 encoded CSV', 'details': str(e)}), 400
     except Error as e:
         logger.error(f"MCQ upload error: {e}")
         return jsonify({'error': 'Failed to upload MCQs', 'details': str(e)}), 500
@@ -1543,23 +4327,227 @@ def upload_mcq_csv():
         logger.error(f"Unexpected MCQ upload error: {e}")
         return jsonify({'error': 'Unexpected error during upload', 'details': str(e)}), 500
 
+@app.route('/mcq/upload/<int:job_id>', methods=['GET'])
+@admin_required
+def get_mcq_upload_status(job_id):
+    """Admin-only: Progress and error report of an MCQ upload job"""
+    try:
+        error_offset = max(int(request.args.get('error_offset', 0)), 0)
+        error_limit = min(max(int(request.args.get('error_limit', 1000)), 1), 10000)
+    except ValueError:
+        return jsonify({'error': 'error_offset and error_limit must be integers'}), 400
+    
+    try:
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            
+            # A job lost with another process would otherwise stay running forever
+            fail_stale_mcq_imports(conn, cursor, job_id)
+            
+            cursor.execute("""
+                SELECT upload_id as job_id, admin_id, filename, category_id, status,
+                       total_questions, successful_imports, failed_imports, message,
+                       upload_date, started_at, finished_at
+                FROM MCQ_Upload_Log
+                WHERE upload_id = %s
+            """, (job_id,))
+            job = cursor.fetchone()
+            
+            if not job:
+                return jsonify({'error': 'Upload job not found'}), 404
+            
+            cursor.execute("""
+                SELECT row_num as `row`, error, row_data
+                FROM MCQ_Upload_Errors
+                WHERE upload_id = %s
+                ORDER BY row_num
+                LIMIT %s OFFSET %s
+            """, (job_id, error_limit, error_offset))
+            errors = cursor.fetchall()
+            for error in errors:
+                error['data'] = json.loads(error.pop('row_data')) if error['row_data'] else None
+            
+            job['total_processed'] = job['total_questions']
+            job['successful'] = job['successful_imports']
+            job['failed'] = job['failed_imports']
+            job['errors'] = errors
+            job['error_offset'] = error_offset
+            
+            return jsonify(job), 200
+    
+    except Error as e:
+        logger.error(f"MCQ upload status error: {e}")
+        return jsonify({'error': 'Failed to fetch upload status'}), 500
+
+def run_mcq_import(job_id, path, admin_id, category_id):
+    """Background job: import a saved MCQ CSV in chunks, recording progress in MCQ_Upload_Log"""
+    with queued_mcq_imports_lock:
+        queued_mcq_imports.discard(job_id)
+    try:
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            cursor.execute("""
+                UPDATE MCQ_Upload_Log SET status = 'running', started_at = NOW(), heartbeat_at = NOW()
+                WHERE upload_id = %s AND status = 'queued'
+            """, (job_id,))
+            conn.commit()
+            if not cursor.rowcount:
+                # Already marked failed as stale; its file has been removed
+                logger.warning(f"MCQ upload job {job_id} was given up before it started")
+                return
+            
+            totals = {'processed': 0, 'successful': 0, 'failed': 0}
+            
+            with open(path, newline='', encoding='utf-8-sig') as saved:
+                csv_reader = csv.DictReader(saved)
+                chunk = []
+                # start=2 because row 1 is header
+                for row_num, row in enumerate(csv_reader, start=2):
+                    chunk.append((row_num, row))
+                    if len(chunk) >= MCQ_IMPORT_CHUNK_SIZE:
+                        import_mcq_chunk(conn, cursor, job_id, admin_id, category_id, chunk, totals)
+                        chunk = []
+                if chunk:
+                    import_mcq_chunk(conn, cursor, job_id, admin_id, category_id, chunk, totals)
+            
+            cursor.execute("""
+                UPDATE MCQ_Upload_Log SET status = 'completed', finished_at = NOW()
+                WHERE upload_id = %s
+            """, (job_id,))
+            conn.commit()
+            
+            logger.info(f"MCQ upload job {job_id} completed: {totals['successful']} imported, {totals['failed']} failed")
+    
+    except Exception as e:
+        logger.error(f"MCQ upload job {job_id} failed: {e}")
+        try:
+            with get_db_connection() as conn:
+                cursor = get_db_cursor(conn)
+                cursor.execute("""
+                    UPDATE MCQ_Upload_Log SET status = 'failed', message = %s, finished_at = NOW()
+                    WHERE upload_id = %s
+                """, (str(e)[:255], job_id))
+                conn.commit()
+        except Error as log_error:
+            logger.error(f"Could not record failure of MCQ upload job {job_id}: {log_error}")
+    
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+def import_mcq_chunk(conn, cursor, job_id, admin_id, category_id, chunk, totals):
+    """
+    Validate and insert one chunk of (row_num, row) MCQ rows, record its
+    errors and commit it together with the job's progress
+    """
+    errors = []
+    valid = []
+    for row_num, row in chunk:
+        try:
+            valid.append((row_num, row, validate_mcq_row(row, category_id)))
+        except ValueError as e:
+            errors.append((row_num, str(e), row))
+    
+    # Resolve every deck and category the chunk refers to in one query
+    deck_ids = {values[0] for _, _, values in valid}
+    category_ids = {values[1] for _, _, values in valid if values[1] is not None}
+    existing_decks = set()
+    existing_categories = set()
+    if deck_ids:
+        query = f"SELECT 'deck' as kind, deck_id as id FROM Decks WHERE deck_id IN ({', '.join(['%s'] * len(deck_ids))})"
+        params = list(deck_ids)
+        if category_ids:
+            query += f"""
+                UNION ALL
+                SELECT 'category', category_id FROM MCQ_Categories
+                WHERE category_id IN ({', '.join(['%s'] * len(category_ids))})
+            """
+            params.extend(category_ids)
+        cursor.execute(query, tuple(params))
+        for ref in cursor.fetchall():
+            (existing_decks if ref['kind'] == 'deck' else existing_categories).add(ref['id'])
+    
+    rows = []
+    for row_num, row, values in valid:
+        if values[0] not in existing_decks:
+            errors.append((row_num, f"Deck {values[0]} does not exist", row))
+        elif values[1] is not None and values[1] not in existing_categories:
+            errors.append((row_num, f"Category {values[1]} does not exist", row))
+        else:
+            rows.append((row_num, row, values + (admin_id,)))
+    
+    insert_query = """
+        INSERT INTO MCQ_Questions 
+        (deck_id, category_id, question_text, option_a, option_b, option_c, option_d, 
+         correct_option, explanation, difficulty, created_by)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    successful = 0
+    if rows:
+        try:
+            cursor.executemany(insert_query, [values for _, _, values in rows])
+            successful = len(rows)
+        except Error:
+            # Retry row by row so the offending rows can be reported
+            for row_num, row, values in rows:
+                try:
+                    cursor.execute(insert_query, values)
+                    successful += 1
+                except Error as e:
+                    errors.append((row_num, str(e), row))
+    
+    if errors:
+        cursor.executemany("""
+            INSERT INTO MCQ_Upload_Errors (upload_id, row_num, error, row_data)
+            VALUES (%s, %s, %s, %s)
+        """, [(job_id, row_num, error[:500], json.dumps(row)) for row_num, error, row in errors])
+    
+    totals['processed'] += len(chunk)
+    totals['successful'] += successful
+    totals['failed'] += len(errors)
+    cursor.execute("""
+        UPDATE MCQ_Upload_Log
+        SET total_questions = %s, successful_imports = %s, failed_imports = %s, heartbeat_at = NOW()
+        WHERE upload_id = %s
+    """, (totals['processed'], totals['successful'], totals['failed'], job_id))
+    
+    # Jobs waiting behind this one are still alive too
+    with queued_mcq_imports_lock:
+        waiting = list(queued_mcq_imports)
+    if waiting:
+        cursor.execute(f"""
+            UPDATE MCQ_Upload_Log SET heartbeat_at = NOW()
+            WHERE upload_id IN ({', '.join(['%s'] * len(waiting))}) AND status = 'queued'
+        """, tuple(waiting))
+    conn.commit()
+    
+    if successful:
+        # Question counts changed
+        invalidate_mcq_categories()
 
 @app.route('/mcq/deck/<int:deck_id>', methods=['GET'])
 @login_required
 def get_deck_mcqs(deck_id):
-    """Get all MCQs for a specific deck (questions only, no answers for students)"""
+    """
+    Get the MCQs for a specific deck (questions only, no answers for students),
+    newest first (?limit=&cursor= to page)
+    """
+    try:
+        limit, after = get_page_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     try:
         with get_db_connection() as conn:
             cursor = get_db_cursor(conn)
             
             # Verify deck access
-            cursor.execute("SELECT user_id FROM Decks WHERE deck_id = %s", (deck_id,))
-            deck = cursor.fetchone()
+            owner = get_deck_owner(cursor, deck_id)
             
-            if not deck:
+            if owner is None:
                 return jsonify({'error': 'Deck not found'}), 404
             
-            if deck['user_id'] != session['user_id']:
+            if owner != session['user_id']:
                 return jsonify({'error': 'Unauthorized'}), 403
             
             # Get MCQs
@@ -1569,14 +4557,15 @@ def get_deck_mcqs(deck_id):
                     difficulty, created_at
                 FROM MCQ_Questions
                 WHERE deck_id = %s
-                ORDER BY created_at DESC
             """
-            cursor.execute(query, (deck_id,))
-            mcqs = cursor.fetchall()
+            mcqs, next_cursor = keyset_page(
+                cursor, query, (deck_id,), 'created_at', 'mcq_id', 'mcq_id', limit, after
+            )
             
             return jsonify({
                 'mcqs': mcqs,
-                'total': len(mcqs)
+                'total': len(mcqs),
+                'next_cursor': next_cursor
             }), 200
     
     except Error as e:
@@ -1617,55 +4606,66 @@ def check_mcq_answer(mcq_id):
             
             # Update or insert MCQ performance
             cursor.execute("""
-                SELECT mcq_performance_id, times_attempted, times_correct
+                SELECT mcq_performance_id, times_attempted, times_correct, last_attempt_date,
+                       next_review_date, `interval`, ease_factor, stability, difficulty
                 FROM MCQ_Performance
                 WHERE user_id = %s AND mcq_id = %s
             """, (session['user_id'], mcq_id))
             
             performance = cursor.fetchone()
             
+            # Reschedule with the deck's (or user's) scheduler, grading the answer as a rating
+            now = datetime.now()
+            scheduler = get_schedulers(cursor, session['user_id'], [mcq['deck_id']])[mcq['deck_id']]
+            current, elapsed_days = scheduling_state(performance, now.date())
+            new_state = scheduler.review(MCQ_RATINGS[is_correct], current, elapsed_days)
+            next_review = now.date() + timedelta(days=new_state.interval)
+            
             if performance:
                 # Update existing performance
                 new_attempts = performance['times_attempted'] + 1
                 new_correct = performance['times_correct'] + (1 if is_correct else 0)
                 
-                # Calculate next review date (simple spaced repetition)
-                if is_correct:
-                    interval_days = min(new_correct * 2, 30)  # Max 30 days
-                else:
-                    interval_days = 1  # Review tomorrow if incorrect
-                
-                next_review = datetime.now().date() + timedelta(days=interval_days)
-                
                 cursor.execute("""
                     UPDATE MCQ_Performance
                     SET times_attempted = %s, times_correct = %s, 
-                        last_attempt_date = NOW(), next_review_date = %s
+                        last_attempt_date = %s, next_review_date = %s,
+                        `interval` = %s, ease_factor = %s, stability = %s, difficulty = %s
                     WHERE user_id = %s AND mcq_id = %s
-                """, (new_attempts, new_correct, next_review, session['user_id'], mcq_id))
+                """, (new_attempts, new_correct, now, next_review, *new_state, session['user_id'], mcq_id))
             else:
                 # Insert new performance record
-                next_review = datetime.now().date() + timedelta(days=(2 if is_correct else 1))
-                
                 cursor.execute("""
                     INSERT INTO MCQ_Performance 
-                    (user_id, mcq_id, times_attempted, times_correct, next_review_date)
-                    VALUES (%s, %s, 1, %s, %s)
-                """, (session['user_id'], mcq_id, (1 if is_correct else 0), next_review))
+                    (user_id, mcq_id, times_attempted, times_correct, last_attempt_date, next_review_date,
+                     `interval`, ease_factor, stability, difficulty)
+                    VALUES (%s, %s, 1, %s, %s, %s, %s, %s, %s, %s)
+                """, (session['user_id'], mcq_id, (1 if is_correct else 0), now, next_review, *new_state))
+            
+            # Move the MCQ in the due histogram
+            mcq_due_changes = Counter({next_review: 1})
+            if performance and performance['next_review_date']:
+                mcq_due_changes[performance['next_review_date']] -= 1
+            adjust_user_stats(cursor, session['user_id'], mcq_due_changes=mcq_due_changes)
             
             # Award points if correct
             if is_correct:
-                cursor.execute("""
-                    UPDATE Users SET points = points + 5 WHERE user_id = %s
-                """, (session['user_id'],))
+                add_points(cursor, session['user_id'], [(MCQ_CORRECT_POINTS, 'mcq', mcq_id)])
             
             conn.commit()
             
+            # Logged on the card rating scale: 'good' if correct, 'forgot' if wrong
+            review_log.append([(
+                now, session['user_id'], 'mcq', mcq_id, RATING_NAMES.index(MCQ_RATINGS[is_correct]),
+                current.interval, new_state.interval, new_state.ease_factor,
+                parse_response_ms(data.get('response_ms'))
+            )])
+            
             return jsonify({
                 'correct': is_correct,
                 'correct_answer': mcq['correct_option'],
                 'explanation': mcq['explanation'],
-                'points_earned': 5 if is_correct else 0
+                'points_earned': MCQ_CORRECT_POINTS if is_correct else 0
             }), 200
     
     except Error as e:
@@ -1686,13 +4686,12 @@ def get_mcq_study_session():
             
             if deck_id:
                 # Verify deck ownership
-                cursor.execute("SELECT user_id FROM Decks WHERE deck_id = %s", (deck_id,))
-                deck = cursor.fetchone()
+                owner = get_deck_owner(cursor, deck_id)
                 
-                if not deck:
+                if owner is None:
                     return jsonify({'error': 'Deck not found'}), 404
                 
-                if deck['user_id'] != session['user_id']:
+                if owner != session['user_id']:
                     return jsonify({'error': 'Unauthorized'}), 403
                 
                 # Get MCQs from specific deck
@@ -1808,6 +4807,8 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'database': 'connected',
+            'pool': db_pool.stats(),
+            'events': event_queue.stats(),
             'timestamp': datetime.now().isoformat()
         }), 200
     except Exception as e:
@@ -1815,9 +4816,89 @@ def health_check():
         return jsonify({
             'status': 'unhealthy',
             'database': 'disconnected',
+            'pool': db_pool.stats(),
             'error': str(e)
         }), 503
 
+@app.route('/health/pool', methods=['GET'])
+def pool_stats():
+    """Connection pool statistics (does not borrow a connection)"""
+    return jsonify({'pool': db_pool.stats()}), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint (in-process counters only, no database access)"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/admin/sql-stats', methods=['GET'])
+@admin_required
+def get_sql_stats():
+    """
+    Admin-only: the top statements by fingerprint (?top=&order=total|count|max|avg)
+    and the most recent slow statements with their EXPLAIN plans (?explain=0 to skip)
+    """
+    top = request.args.get('top', default=20, type=int)
+    order_by = request.args.get('order', 'total')
+    if order_by not in ('total', 'count', 'max', 'avg'):
+        return jsonify({'error': 'order must be one of total, count, max, avg'}), 400
+    
+    statements, dropped = statement_stats.top(max(top, 1), order_by)
+    slow = statement_stats.slow()
+    
+    if request.args.get('explain', '1') != '0' and slow:
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor(dictionary=True, buffered=True)
+                for statement in slow:
+                    statement['explain'] = explain_statement(cursor, statement)
+                cursor.close()
+        except Error as e:
+            logger.error(f"SQL stats explain error: {e}")
+    
+    # Parameters may hold personal data; they are only used for EXPLAIN
+    for statement in slow:
+        del statement['params']
+    
+    return jsonify({
+        'statements': statements,
+        'untracked_fingerprints': dropped,
+        'slow_threshold_ms': SQL_SLOW_MS,
+        'slow': slow
+    }), 200
+
+@app.route('/admin/sql-stats', methods=['DELETE'])
+@admin_required
+def reset_sql_stats():
+    """Admin-only: Clear the statement aggregates and slow statement log"""
+    statement_stats.reset()
+    return jsonify({'message': 'SQL statistics reset'}), 200
+
+@app.route('/health/events', methods=['GET'])
+def event_queue_stats():
+    """Background event queue depth and processing lag"""
+    stats = {'queue': event_queue.stats()}
+    try:
+        with get_db_connection() as conn:
+            cursor = get_db_cursor(conn)
+            cursor.execute("""
+                SELECT
+                    COUNT(*) as depth,
+                    COALESCE(SUM(attempts >= %s), 0) as dead,
+                    COALESCE(MAX(TIMESTAMPDIFF(MICROSECOND, created_at, NOW(3))) / 1000, 0) as oldest_ms
+                FROM EventOutbox
+            """, (event_queue.max_attempts,))
+            outbox = cursor.fetchone()
+            stats['outbox'] = {
+                'depth': int(outbox['depth']),
+                'dead': int(outbox['dead']),
+                'oldest_ms': float(outbox['oldest_ms'])
+            }
+        return jsonify(stats), 200
+    except Error as e:
+        logger.error(f"Event queue stats error: {e}")
+        stats['error'] = 'Outbox unavailable'
+        return jsonify(stats), 503
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
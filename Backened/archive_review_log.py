@@ -0,0 +1,188 @@
+"""
+Review log partition maintenance
+Adds monthly ReviewLog partitions ahead of time, and exports partitions
+older than --keep-months to compressed columnar files before dropping them,
+so the hot table stays small while the history is kept on disk.
+
+Files are Parquet when pyarrow is installed (pip install pyarrow), otherwise
+NumPy .npz archives (one compressed array per column; NULLs become NaN).
+
+Examples:
+    python archive_review_log.py --dry-run
+    python archive_review_log.py --keep-months 6 --output-dir /var/backups/review_log
+"""
+
+import argparse
+import os
+from datetime import date, datetime
+import mysql.connector
+from mysql.connector import Error
+import numpy as np
+from dotenv import load_dotenv
+
+from App1 import REVIEW_LOG_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'database': os.environ.get('DB_NAME', 'autorevise_db')
+}
+
+FETCH_SIZE = 50000
+
+def add_months(day, months):
+    """First day of the month `months` after day's month"""
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+def partition_name(month_start):
+    return f"p{month_start:%Y%m}"
+
+def list_partitions(cursor):
+    """[(name, upper bound date or None for MAXVALUE, approximate rows)] in order"""
+    cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ReviewLog'
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    partitions = []
+    for name, description, rows in cursor.fetchall():
+        if name is None:
+            raise RuntimeError("ReviewLog is not partitioned; run schema_review_log.sql")
+        bound = None if description == 'MAXVALUE' else datetime.strptime(description.strip("'"), '%Y-%m-%d').date()
+        partitions.append((name, bound, rows))
+    return partitions
+
+def add_future_partitions(cursor, partitions, months_ahead, dry_run):
+    """Split pmax so that every month up to months_ahead from now has its own partition"""
+    bounds = [bound for _, bound, _ in partitions if bound]
+    next_start = max(bounds) if bounds else add_months(date.today(), 0)
+    target = add_months(date.today(), months_ahead + 1)
+
+    new_partitions = []
+    while next_start < target:
+        new_partitions.append(
+            f"PARTITION {partition_name(next_start)} VALUES LESS THAN ('{add_months(next_start, 1).isoformat()}')"
+        )
+        next_start = add_months(next_start, 1)
+
+    if not new_partitions:
+        print("✓ Future partitions already exist")
+        return
+    print(f"{'Would add' if dry_run else 'Adding'} {len(new_partitions)} partition(s) up to {target.isoformat()}")
+    if not dry_run:
+        cursor.execute(f"""
+            ALTER TABLE ReviewLog REORGANIZE PARTITION pmax INTO (
+                {', '.join(new_partitions)},
+                PARTITION pmax VALUES LESS THAN (MAXVALUE)
+            )
+        """)
+
+def read_partition(cursor, name):
+    """Column name -> list of values for every row in one partition"""
+    columns = {column: [] for column in REVIEW_LOG_COLUMNS}
+    cursor.execute(f"SELECT {', '.join(REVIEW_LOG_COLUMNS)} FROM ReviewLog PARTITION ({name}) ORDER BY reviewed_at")
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        for column, values in zip(REVIEW_LOG_COLUMNS, zip(*rows)):
+            columns[column].extend(values)
+    columns['ease_factor'] = [float(value) if value is not None else None for value in columns['ease_factor']]
+    return columns
+
+def write_parquet(columns, path):
+    pq.write_table(pa.table(columns), path, compression='zstd')
+    return pq.read_metadata(path).num_rows
+
+def write_npz(columns, path):
+    arrays = {}
+    for column, values in columns.items():
+        if column == 'reviewed_at':
+            arrays[column] = np.array(values, dtype='datetime64[ms]')
+        elif column == 'item_type':
+            arrays[column] = np.array(values, dtype='U4')
+        elif any(value is None for value in values):
+            arrays[column] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        else:
+            arrays[column] = np.array(values)
+    np.savez_compressed(path, **arrays)
+    with np.load(path) as archive:
+        return len(archive['reviewed_at'])
+
+def archive_partition(cursor, name, output_dir):
+    """Export one partition; returns (path, rows written, rows in the partition)"""
+    columns = read_partition(cursor, name)
+    extension = 'parquet' if pa else 'npz'
+    path = os.path.join(output_dir, f"review_log_{name}.{extension}")
+    written = write_parquet(columns, path) if pa else write_npz(columns, path)
+    return path, written, len(columns['reviewed_at'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Add ReviewLog partitions and archive old ones")
+    parser.add_argument('--keep-months', type=int, default=6,
+                        help="Months kept in the database besides the current one (default 6)")
+    parser.add_argument('--months-ahead', type=int, default=3, help="Future months to partition (default 3)")
+    parser.add_argument('--output-dir', default='review_log_archive', help="Where archives are written")
+    parser.add_argument('--no-drop', action='store_true', help="Export old partitions but keep them")
+    parser.add_argument('--dry-run', action='store_true', help="Only print what would be done")
+    args = parser.parse_args()
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        print("=" * 60)
+        print("Review Log Partition Maintenance")
+        print("=" * 60)
+        print(f"Archive format: {'Parquet' if pa else 'NumPy .npz (install pyarrow for Parquet)'}")
+
+        partitions = list_partitions(cursor)
+        add_future_partitions(cursor, partitions, args.months_ahead, args.dry_run)
+
+        cutoff = add_months(date.today(), -args.keep_months)
+        cold = [(name, rows) for name, bound, rows in partitions if bound and bound <= cutoff]
+        if not cold:
+            print(f"✓ No partitions end before {cutoff.isoformat()}")
+            return
+
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name, approximate_rows in cold:
+            if args.dry_run:
+                print(f"Would archive {name} (~{approximate_rows:,} rows)")
+                continue
+
+            path, written, rows = archive_partition(cursor, name, args.output_dir)
+            if written != rows:
+                print(f"❌ {name}: wrote {written:,} of {rows:,} rows to {path}; partition kept")
+                continue
+            print(f"✓ {name}: {rows:,} rows -> {path}")
+
+            if not args.no_drop:
+                cursor.execute(f"ALTER TABLE ReviewLog DROP PARTITION {name}")
+                print(f"✓ Dropped partition {name}")
+
+        print("\n✅ Done")
+
+    except (Error, RuntimeError) as e:
+        print(f"❌ Error: {e}")
+
+    finally:
+        if 'connection' in locals() and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+if __name__ == '__main__':
+    main()
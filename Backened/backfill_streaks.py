@@ -0,0 +1,98 @@
+"""
+Backfill study streaks
+Derives StudyStreaks rows for existing users from their StudyLog history
+using set-based gaps-and-islands queries, one batch of users at a time
+"""
+
+import argparse
+import mysql.connector
+from mysql.connector import Error
+import os
+from dotenv import load_dotenv
+
+from App1 import backfill_study_streaks, calculate_streak, effective_streak
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'database': os.environ.get('DB_NAME', 'autorevise_db')
+}
+
+def verify_sample(cursor, sample_size):
+    """Compare stored streaks with calculate_streak for a sample of users"""
+    cursor.execute("""
+        SELECT user_id, current_streak, longest_streak, last_study_date
+        FROM StudyStreaks
+        ORDER BY RAND()
+        LIMIT %s
+    """, (sample_size,))
+    streaks = cursor.fetchall()
+
+    mismatches = 0
+    for streak in streaks:
+        cursor.execute("""
+            SELECT study_date
+            FROM StudyLog
+            WHERE user_id = %s
+            ORDER BY study_date DESC
+        """, (streak['user_id'],))
+        expected = calculate_streak([row['study_date'] for row in cursor.fetchall()])
+        stored = effective_streak(streak)
+        if expected != stored:
+            mismatches += 1
+            print(f"  ✗ User {streak['user_id']}: stored {stored}, expected {expected}")
+
+    return len(streaks), mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive StudyStreaks rows from StudyLog history")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Users per batch (default 5000)")
+    parser.add_argument('--verify', type=int, default=0, metavar='N',
+                        help="Afterwards, check N random users against calculate_streak")
+    args = parser.parse_args()
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor(dictionary=True)
+
+        print("=" * 60)
+        print("Study Streak Backfill")
+        print("=" * 60)
+
+        cursor.execute("SELECT COALESCE(MIN(user_id), 0) as low, COALESCE(MAX(user_id), 0) as high FROM Users")
+        bounds = cursor.fetchone()
+
+        batches = 0
+        for low in range(bounds['low'], bounds['high'] + 1, args.batch_size):
+            backfill_study_streaks(cursor, low, low + args.batch_size)
+            connection.commit()
+            batches += 1
+            print(f"✓ Users {low} - {low + args.batch_size - 1}")
+
+        cursor.execute("SELECT COUNT(*) as total, MAX(longest_streak) as longest FROM StudyStreaks")
+        summary = cursor.fetchone()
+        print(f"\n✅ Backfilled {summary['total']} users in {batches} batch(es); longest streak: {summary['longest'] or 0} days")
+
+        if args.verify:
+            print(f"\nVerifying {args.verify} random users against calculate_streak...")
+            checked, mismatches = verify_sample(cursor, args.verify)
+            if mismatches:
+                print(f"⚠️ {mismatches} of {checked} users differ")
+            else:
+                print(f"✅ All {checked} sampled users match")
+
+    except Error as e:
+        print(f"❌ Database error: {e}")
+
+    finally:
+        if 'connection' in locals() and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+if __name__ == '__main__':
+    main()
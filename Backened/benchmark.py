@@ -0,0 +1,209 @@
+"""
+Micro-benchmarks for the scheduling, streak and CSV validation primitives
+Times calculate_sm2, calculate_sm2_batch, calculate_streak and the MCQ CSV
+validation loop at realistic input sizes. Each case also digests its output,
+so an optimized version can be shown to be faster *and* identical.
+No database is needed.
+
+Examples:
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --compare bench_baseline.json
+    python benchmark.py --scale 0.1 --case streak
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+import numpy as np
+
+from App1 import (
+    MCQ_REQUIRED_COLUMNS, RATING_NAMES, calculate_sm2, calculate_sm2_batch,
+    calculate_streak, validate_mcq_row
+)
+
+# Full-scale input sizes (multiplied by --scale)
+SM2_REVIEWS = 1_000_000
+STREAK_HISTORY_DAYS = 3650   # ten years of daily study
+STREAK_HISTORIES = 200
+MCQ_CSV_ROWS = 100_000
+
+def digest(values):
+    """Stable hash of a case's output, for comparing implementations"""
+    sha = hashlib.sha1()
+    for value in values:
+        sha.update(repr(value).encode('utf-8'))
+    return sha.hexdigest()
+
+def sm2_inputs(size, seed):
+    rng = np.random.default_rng(seed)
+    ratings = rng.integers(0, len(RATING_NAMES), size)
+    intervals = rng.choice([0, 1, 2, 3, 6, 10, 15, 30, 60, 120, 365], size)
+    eases = np.round(rng.uniform(1.3, 3.0, size), 2)
+    return ratings, intervals, eases
+
+def streak_inputs(size, seed):
+    """Histories (newest first) with a current streak of varying length, then gaps"""
+    rng = random.Random(seed)
+    today = date.today()
+    histories = []
+    for _ in range(size):
+        start = today - timedelta(days=rng.choice((0, 1, 2)))
+        streak = rng.randint(0, STREAK_HISTORY_DAYS)
+        days = [start - timedelta(days=offset) for offset in range(streak)]
+        day = start - timedelta(days=streak + 1)
+        while len(days) < STREAK_HISTORY_DAYS:
+            days.append(day)
+            day -= timedelta(days=rng.choice((1, 1, 1, 2, 5)))
+        histories.append(days)
+    return histories
+
+def mcq_csv_inputs(size, seed):
+    """An MCQ upload CSV, with roughly one row in ten invalid"""
+    rng = random.Random(seed)
+    columns = MCQ_REQUIRED_COLUMNS + ['explanation', 'difficulty', 'category_id']
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns)
+    writer.writeheader()
+    for i in range(size):
+        row = {
+            'question_text': f'  Question {i}: what is {i} + {i}?  ',
+            'option_a': str(i), 'option_b': str(2 * i), 'option_c': str(3 * i), 'option_d': str(4 * i),
+            'correct_option': rng.choice('abcdABCD'),
+            'deck_id': str(rng.randint(1, 500)),
+            'explanation': rng.choice(('', f'{i} + {i} = {2 * i}')),
+            'difficulty': rng.choice(('', 'easy', 'Medium', 'HARD')),
+            'category_id': rng.choice(('', '3', '7'))
+        }
+        if rng.random() < 0.1:
+            row[rng.choice(('question_text', 'option_c', 'correct_option', 'deck_id', 'difficulty'))] = rng.choice(('', 'x'))
+        writer.writerow(row)
+    return out.getvalue()
+
+# Each case: (prepare(scale, seed) -> input, run(input) -> output values, size label)
+
+def run_sm2_scalar(inputs):
+    ratings, intervals, eases = inputs
+    return [
+        calculate_sm2(RATING_NAMES[rating], interval, ease)
+        for rating, interval, ease in zip(ratings.tolist(), intervals.tolist(), eases.tolist())
+    ]
+
+def run_sm2_batch(inputs):
+    new_intervals, new_eases = calculate_sm2_batch(*inputs)
+    return list(zip(new_intervals.tolist(), new_eases.tolist()))
+
+def run_streak(histories):
+    return [calculate_streak(history) for history in histories]
+
+def run_mcq_validation(text):
+    results = []
+    for row in csv.DictReader(io.StringIO(text)):
+        try:
+            results.append(validate_mcq_row(row, default_category_id=1))
+        except ValueError as e:
+            results.append(str(e))
+    return results
+
+CASES = {
+    'sm2_scalar': (lambda scale, seed: sm2_inputs(int(SM2_REVIEWS * scale), seed), run_sm2_scalar,
+                   lambda scale: f'{int(SM2_REVIEWS * scale):,} reviews'),
+    'sm2_batch': (lambda scale, seed: sm2_inputs(int(SM2_REVIEWS * scale), seed), run_sm2_batch,
+                  lambda scale: f'{int(SM2_REVIEWS * scale):,} reviews'),
+    'streak': (lambda scale, seed: streak_inputs(max(int(STREAK_HISTORIES * scale), 1), seed), run_streak,
+               lambda scale: f'{max(int(STREAK_HISTORIES * scale), 1):,} x {STREAK_HISTORY_DAYS}-day histories'),
+    'mcq_validation': (lambda scale, seed: mcq_csv_inputs(int(MCQ_CSV_ROWS * scale), seed), run_mcq_validation,
+                       lambda scale: f'{int(MCQ_CSV_ROWS * scale):,} CSV rows')
+}
+
+def run_case(name, scale, seed, repeat):
+    prepare, run, size = CASES[name]
+    inputs = prepare(scale, seed)
+    timings = []
+    output = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = run(inputs)
+        timings.append(time.perf_counter() - started)
+    return {
+        'size': size(scale),
+        'median_s': round(statistics.median(timings), 6),
+        'min_s': round(min(timings), 6),
+        'repeat': repeat,
+        'digest': digest(output)
+    }
+
+def compare(results, baseline, tolerance):
+    """Print timing changes against a baseline; returns the cases that regressed or changed output"""
+    failures = []
+    print(f"\n{'Case':<16} {'Base (s)':>10} {'Now (s)':>10} {'Speedup':>8}  Output")
+    print("-" * 60)
+    for name, result in results.items():
+        base = baseline['cases'].get(name)
+        if not base or base['size'] != result['size']:
+            print(f"{name:<16} {'-':>10} {result['median_s']:>10.4f} {'-':>8}  (no baseline at this size)")
+            continue
+        speedup = base['median_s'] / result['median_s'] if result['median_s'] else float('inf')
+        identical = base['digest'] == result['digest']
+        if not identical or speedup < 1 / (1 + tolerance):
+            failures.append(name)
+        print(f"{name:<16} {base['median_s']:>10.4f} {result['median_s']:>10.4f} {speedup:>7.2f}x  "
+              f"{'identical' if identical else 'CHANGED ⚠️'}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scheduling, streak and CSV validation primitives")
+    parser.add_argument('--case', action='append', choices=sorted(CASES), help="Run only these cases (repeatable)")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply input sizes by this factor (default 1)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case (default 5)")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed for the inputs (default 1)")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Write the results as a baseline JSON")
+    parser.add_argument('--compare', metavar='PATH', help="Compare against a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="Allowed slowdown before flagging a regression (default 0.1 = 10%%)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Primitive Micro-benchmarks")
+    print("=" * 60)
+    print(f"{'Case':<16} {'Input':<30} {'Median (s)':>11} {'Min (s)':>9}")
+    print("-" * 70)
+
+    results = {}
+    for name in args.case or CASES:
+        results[name] = run_case(name, args.scale, args.seed, args.repeat)
+        print(f"{name:<16} {results[name]['size']:<30} {results[name]['median_s']:>11.4f} {results[name]['min_s']:>9.4f}")
+
+    # The vectorized scheduler must agree with the scalar reference
+    if 'sm2_scalar' in results and 'sm2_batch' in results:
+        agree = results['sm2_scalar']['digest'] == results['sm2_batch']['digest']
+        print(f"\nsm2_batch matches sm2_scalar: {'✅ yes' if agree else '❌ no'}")
+        if not agree:
+            return 1
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'seed': args.seed, 'scale': args.scale, 'cases': results}, f, indent=2)
+        print(f"\n✅ Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('seed') != args.seed:
+            print("⚠️ Baseline used a different seed; outputs are not comparable")
+        failures = compare(results, baseline, args.tolerance)
+        if failures:
+            print(f"\n⚠️ Slower or different output: {', '.join(failures)}")
+            return 1
+        print("\n✅ No regressions against the baseline")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Fit per-user FSRS weights from review history
+Replays each user's ReviewLog through the FSRS memory model and fits the 17
+weights that best predict whether each review was recalled. Every item is
+stepped through in parallel with NumPy, and the finite-difference gradient of
+all weights comes from the same batched pass, so 100k reviews fit in seconds.
+Fitted weights are used once the user (or deck) selects the 'fsrs' scheduler.
+
+Examples:
+    python fit_scheduler.py --dry-run
+    python fit_scheduler.py --user 42 --iterations 300
+"""
+
+import argparse
+import json
+import os
+import time
+import mysql.connector
+from mysql.connector import Error
+import numpy as np
+from dotenv import load_dotenv
+
+from App1 import (
+    FSRS_DEFAULT_WEIGHTS, FSRS_WEIGHT_BOUNDS, fsrs_initial_state, fsrs_next_state,
+    fsrs_retrievability
+)
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'database': os.environ.get('DB_NAME', 'autorevise_db')
+}
+
+FINITE_DIFFERENCE_STEP = 1e-4
+
+def load_sequences(cursor, user_id):
+    """Per-item [(days since the previous review, grade)] lists, oldest review first"""
+    cursor.execute("""
+        SELECT item_type, item_id, reviewed_at, rating, prev_interval
+        FROM ReviewLog
+        WHERE user_id = %s
+        ORDER BY item_type, item_id, reviewed_at
+    """, (user_id,))
+
+    sequences = []
+    item = None
+    for item_type, item_id, reviewed_at, rating, prev_interval in cursor.fetchall():
+        if (item_type, item_id) != item:
+            item = (item_type, item_id)
+            # Only items whose first review is still in the log can be replayed
+            sequence = [] if not prev_interval else None
+            if sequence is not None:
+                sequences.append(sequence)
+            previous = reviewed_at
+        if sequence is None:
+            continue
+
+        # Rating codes 0-3 (forgot..easy) are FSRS grades 1-4
+        sequence.append(((reviewed_at - previous).days, rating + 1))
+        previous = reviewed_at
+    return sequences
+
+def pack_sequences(sequences):
+    """
+    (elapsed, grades, active): padded (items x reviews) matrices with the
+    longest sequence first, and the number of items still active at each review
+    """
+    sequences = sorted((sequence for sequence in sequences if len(sequence) > 1), key=len, reverse=True)
+    if not sequences:
+        return None
+
+    lengths = np.array([len(sequence) for sequence in sequences])
+    elapsed = np.zeros((len(sequences), lengths[0]))
+    grades = np.ones((len(sequences), lengths[0]), dtype=np.int64)
+    for row, sequence in enumerate(sequences):
+        elapsed[row, :len(sequence)], grades[row, :len(sequence)] = zip(*sequence)
+
+    active = np.cumsum(np.bincount(lengths, minlength=lengths[0] + 1)[::-1])[::-1][1:]
+    return elapsed, grades, active
+
+def log_loss(weights, batch):
+    """Mean recall log loss of every weight vector in weights (P x 17) over the batch"""
+    elapsed, grades, active = batch
+    w = np.asarray(weights, dtype=np.float64)[:, None, :]
+
+    total = np.zeros(len(w))
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        stability, difficulty = fsrs_initial_state(w, grades[:, 0])
+        for step in range(1, grades.shape[1]):
+            count = active[step]
+            stability, difficulty = stability[:, :count], difficulty[:, :count]
+            days, grade = elapsed[:count, step], grades[:count, step]
+
+            recall = np.clip(fsrs_retrievability(days, stability), 1e-6, 1 - 1e-6)
+            total -= np.where(grade > 1, np.log(recall), np.log1p(-recall)).sum(axis=1)
+            stability, difficulty = fsrs_next_state(w, stability, difficulty, days, grade)
+
+    return total / active[1:].sum()
+
+def fit_weights(batch, iterations, learning_rate, tolerance=1e-6):
+    """
+    Adam on weights scaled to [0, 1] within FSRS_WEIGHT_BOUNDS. The loss and
+    all 17 forward differences are evaluated in one batched pass per step.
+    Returns: (weights, loss, steps)
+    """
+    lower, upper = np.array(FSRS_WEIGHT_BOUNDS).T
+    span = upper - lower
+    position = np.clip((np.array(FSRS_DEFAULT_WEIGHTS) - lower) / span, 0, 1)
+    probes = np.vstack([np.zeros(len(span)), np.eye(len(span)) * FINITE_DIFFERENCE_STEP])
+
+    first_moment = np.zeros(len(span))
+    second_moment = np.zeros(len(span))
+    best_loss, best_position = np.inf, position
+    previous_loss = np.inf
+    for step in range(1, iterations + 1):
+        losses = log_loss(lower + np.clip(position + probes, 0, 1) * span, batch)
+        loss = losses[0]
+        if loss < best_loss:
+            best_loss, best_position = loss, position
+        if abs(previous_loss - loss) < tolerance:
+            break
+        previous_loss = loss
+
+        gradient = (losses[1:] - loss) / FINITE_DIFFERENCE_STEP
+        first_moment = 0.9 * first_moment + 0.1 * gradient
+        second_moment = 0.999 * second_moment + 0.001 * gradient ** 2
+        update = (first_moment / (1 - 0.9 ** step)) / (np.sqrt(second_moment / (1 - 0.999 ** step)) + 1e-8)
+        position = np.clip(position - learning_rate * update, 0, 1)
+
+    return lower + best_position * span, float(best_loss), step
+
+def fit_user(cursor, user_id, iterations, learning_rate):
+    """Fit one user; returns None if they have no item reviewed twice"""
+    batch = pack_sequences(load_sequences(cursor, user_id))
+    if batch is None:
+        return None
+
+    started = time.perf_counter()
+    baseline = float(log_loss(np.array([FSRS_DEFAULT_WEIGHTS]), batch)[0])
+    weights, loss, steps = fit_weights(batch, iterations, learning_rate)
+    return {
+        'weights': [round(float(weight), 4) for weight in weights],
+        'review_count': int(batch[2][1:].sum()),
+        'log_loss': loss,
+        'baseline_log_loss': baseline,
+        'steps': steps,
+        'seconds': time.perf_counter() - started
+    }
+
+def fit_and_save(connection, cursor, user_id, args):
+    """Fit one user and store the weights if they beat the defaults; returns 1 if saved"""
+    result = fit_user(cursor, user_id, args.iterations, args.learning_rate)
+    if result is None:
+        print(f"- User {user_id}: no item reviewed twice, skipped")
+        return 0
+
+    improved = result['log_loss'] < result['baseline_log_loss']
+    print(f"{'✓' if improved else '-'} User {user_id}: {result['review_count']:,} reviews, "
+          f"log loss {result['baseline_log_loss']:.4f} -> {result['log_loss']:.4f} "
+          f"({result['steps']} steps, {result['seconds']:.1f}s)")
+    if not improved or args.dry_run:
+        return 0
+
+    cursor.execute("""
+        INSERT INTO SchedulerParameters (user_id, weights, review_count, log_loss, baseline_log_loss)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            weights = VALUES(weights),
+            review_count = VALUES(review_count),
+            log_loss = VALUES(log_loss),
+            baseline_log_loss = VALUES(baseline_log_loss)
+    """, (user_id, json.dumps(result['weights']), result['review_count'],
+          result['log_loss'], result['baseline_log_loss']))
+    connection.commit()
+    return 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit per-user FSRS weights from ReviewLog")
+    parser.add_argument('--user', type=int, action='append', help="Fit only these users (repeatable)")
+    parser.add_argument('--min-reviews', type=int, default=1000,
+                        help="Skip users with fewer logged reviews (default 1000)")
+    parser.add_argument('--iterations', type=int, default=200, help="Optimizer steps per user (default 200)")
+    parser.add_argument('--learning-rate', type=float, default=0.01, help="Adam step size (default 0.01)")
+    parser.add_argument('--dry-run', action='store_true', help="Fit and report without saving")
+    args = parser.parse_args()
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        print("=" * 60)
+        print("FSRS Parameter Fitting")
+        print("=" * 60)
+
+        # ReviewLog has no foreign keys, so it still holds rows of deleted users
+        if args.user:
+            placeholders = ', '.join(['%s'] * len(args.user))
+            cursor.execute(f"SELECT user_id FROM Users WHERE user_id IN ({placeholders})", tuple(args.user))
+        else:
+            cursor.execute("""
+                SELECT r.user_id FROM ReviewLog r
+                JOIN Users u ON u.user_id = r.user_id
+                GROUP BY r.user_id
+                HAVING COUNT(*) >= %s
+            """, (args.min_reviews,))
+        user_ids = [row[0] for row in cursor.fetchall()]
+        print(f"Users to fit: {len(user_ids)}\n")
+
+        saved = 0
+        failed = 0
+        for user_id in user_ids:
+            try:
+                saved += fit_and_save(connection, cursor, user_id, args)
+            except Error as e:
+                # e.g. the user was deleted while fitting; carry on with the others
+                connection.rollback()
+                failed += 1
+                print(f"❌ User {user_id}: {e}")
+
+        if args.dry_run:
+            print("\n✅ Dry run; nothing saved")
+        else:
+            print(f"\n✅ Saved weights for {saved} user(s)")
+        if failed:
+            print(f"⚠️ {failed} user(s) failed")
+
+    except Error as e:
+        print(f"❌ Database error: {e}")
+
+    finally:
+        if 'connection' in locals() and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+if __name__ == '__main__':
+    main()
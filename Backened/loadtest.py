@@ -0,0 +1,461 @@
+"""
+Study workflow load test
+Seeds synthetic users, decks, cards and MCQs, then drives concurrent study
+sessions (login -> /stats -> /study-session -> /submit-review ... ->
+/mcq/study-session -> /mcq/<id>/check ...) against a running App1 server,
+or in-process through Flask's test client (--in-process, no server needed).
+Reports throughput, latency percentiles and DB statements per endpoint and
+can save a baseline JSON to compare later runs against.
+
+Examples:
+    python loadtest.py seed --users 50 --decks 2 --cards 200 --mcqs 20
+    python loadtest.py run --url http://127.0.0.1:5000 --vus 20 --duration 60 --save-baseline baseline.json
+    python loadtest.py run --in-process --vus 8 --duration 30 --compare baseline.json
+    python loadtest.py cleanup
+
+DB statement counts are read from /metrics before and after the run; with
+several server processes only the process answering the scrape is counted.
+"""
+
+import argparse
+import http.cookiejar
+import json
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+import mysql.connector
+from mysql.connector import Error
+import numpy as np
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'database': os.environ.get('DB_NAME', 'autorevise_db')
+}
+
+# Synthetic accounts are recognised (and cleaned up) by this email domain
+LOADTEST_DOMAIN = 'loadtest.invalid'
+LOADTEST_PASSWORD = 'loadtest-password'
+
+RATINGS = ('forgot', 'hard', 'good', 'easy')
+RATING_WEIGHTS = (0.1, 0.2, 0.5, 0.2)
+
+INSERT_BATCH = 1000
+
+# ============================================================================
+# SEEDING
+# ============================================================================
+
+def insert_batched(cursor, query, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        cursor.executemany(query, rows[start:start + INSERT_BATCH])
+
+def seed(connection, users, decks_per_user, cards_per_deck, mcqs_per_deck, seed_value):
+    """Create synthetic users with decks, cards and MCQs; returns the number of users created"""
+    from App1 import rebuild_user_stats
+
+    rng = random.Random(seed_value)
+    cursor = connection.cursor()
+
+    cursor.execute("SELECT COUNT(*) FROM Users WHERE email LIKE %s", (f'%@{LOADTEST_DOMAIN}',))
+    existing = cursor.fetchone()[0]
+
+    # One hash for every synthetic account keeps seeding fast
+    password_hash = bcrypt.hashpw(LOADTEST_PASSWORD.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    insert_batched(cursor, "INSERT INTO Users (username, email, password_hash) VALUES (%s, %s, %s)", [
+        (f'loadtest_{i}', f'loadtest_{i}@{LOADTEST_DOMAIN}', password_hash)
+        for i in range(existing, existing + users)
+    ])
+    connection.commit()
+
+    cursor.execute(
+        "SELECT user_id FROM Users WHERE email LIKE %s ORDER BY user_id DESC LIMIT %s",
+        (f'%@{LOADTEST_DOMAIN}', users)
+    )
+    user_ids = [row[0] for row in cursor.fetchall()]
+
+    insert_batched(cursor, "INSERT INTO Decks (user_id, deck_name, description) VALUES (%s, %s, %s)", [
+        (user_id, f'Load test deck {d + 1}', 'Synthetic deck') for user_id in user_ids for d in range(decks_per_user)
+    ])
+    connection.commit()
+
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    cursor.execute(f"SELECT deck_id, user_id FROM Decks WHERE user_id IN ({placeholders})", tuple(user_ids))
+    decks = cursor.fetchall()
+
+    for deck_id, user_id in decks:
+        insert_batched(cursor, "INSERT INTO Cards (deck_id, front_content, back_content) VALUES (%s, %s, %s)", [
+            (deck_id, f'Question {c + 1} of deck {deck_id}', f'Answer {c + 1}') for c in range(cards_per_deck)
+        ])
+        insert_batched(cursor, """
+            INSERT INTO MCQ_Questions
+                (deck_id, question_text, option_a, option_b, option_c, option_d, correct_option, difficulty, created_by)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, [
+            (deck_id, f'MCQ {m + 1} of deck {deck_id}', 'Option A', 'Option B', 'Option C', 'Option D',
+             rng.choice('ABCD'), rng.choice(('easy', 'medium', 'hard')), user_id)
+            for m in range(mcqs_per_deck)
+        ])
+        connection.commit()
+
+    # Keep the statistics rollups consistent with the seeded rows
+    dict_cursor = connection.cursor(dictionary=True)
+    for user_id in user_ids:
+        rebuild_user_stats(dict_cursor, user_id)
+    connection.commit()
+    dict_cursor.close()
+    cursor.close()
+
+    return len(user_ids)
+
+def cleanup(connection):
+    """Delete every synthetic user (decks, cards and history cascade)"""
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM Users WHERE email LIKE %s", (f'%@{LOADTEST_DOMAIN}',))
+    deleted = cursor.rowcount
+    connection.commit()
+    cursor.close()
+    return deleted
+
+def seeded_emails(connection, limit):
+    cursor = connection.cursor()
+    cursor.execute(
+        "SELECT email FROM Users WHERE email LIKE %s ORDER BY user_id LIMIT %s",
+        (f'%@{LOADTEST_DOMAIN}', limit)
+    )
+    emails = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return emails
+
+# ============================================================================
+# CLIENTS
+# ============================================================================
+
+class HttpClient:
+    """JSON client for a running server, keeping the session cookie"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        try:
+            with self.opener.open(req, timeout=30) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+class InProcessClient:
+    """Same interface, calling App1 through Flask's test client"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+
+class Recorder:
+    """Latency samples and error counts per endpoint, shared by all virtual users"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def call(self, client, method, path, body=None, label=None):
+        started = time.perf_counter()
+        try:
+            status, payload = client.request(method, path, body)
+        except OSError:
+            status, payload = None, b''
+        elapsed = time.perf_counter() - started
+
+        label = label or f'{method} {path.split("?")[0]}'
+        with self._lock:
+            self.latencies[label].append(elapsed)
+            if status is None or status >= 400:
+                self.errors[label] += 1
+
+        if status is None or status >= 400:
+            return None
+        try:
+            return json.loads(payload or b'null')
+        except ValueError:
+            return None
+
+def run_session(client, recorder, email, rng, cards_per_session, mcqs_per_session):
+    """One realistic study session for one user"""
+    if recorder.call(client, 'POST', '/login', {'email': email, 'password': LOADTEST_PASSWORD}) is None:
+        return
+    recorder.call(client, 'GET', '/stats')
+
+    study = recorder.call(client, 'GET', f'/study-session?limit={cards_per_session}') or {}
+    for card in study.get('cards', []):
+        recorder.call(client, 'POST', '/submit-review', {
+            'card_id': card['card_id'],
+            'rating': rng.choices(RATINGS, RATING_WEIGHTS)[0]
+        })
+
+    mcq_study = recorder.call(client, 'GET', f'/mcq/study-session?limit={mcqs_per_session}') or {}
+    for mcq in mcq_study.get('mcqs', []):
+        recorder.call(
+            client, 'POST', f'/mcq/{mcq["mcq_id"]}/check', {'answer': rng.choice('ABCD')},
+            label='POST /mcq/<id>/check'
+        )
+
+    recorder.call(client, 'POST', '/logout')
+
+def virtual_user(make_client, recorder, emails, index, deadline, sessions, seed_value, cards, mcqs):
+    rng = random.Random(seed_value + index)
+    client = make_client()
+    completed = 0
+    while time.monotonic() < deadline and (not sessions or completed < sessions):
+        run_session(client, recorder, rng.choice(emails), rng, cards, mcqs)
+        completed += 1
+    return completed
+
+METRIC_LINE = re.compile(r'^(\w+)\{(.*)\} ([0-9.eE+-]+)$')
+METRIC_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+def scrape_db_statements(client):
+    """{route: (requests, db statements)} from /metrics, or None if unavailable"""
+    status, payload = client.request('GET', '/metrics')
+    if status != 200:
+        return None
+
+    totals = defaultdict(lambda: [0.0, 0.0])
+    for line in payload.decode('utf-8').splitlines():
+        match = METRIC_LINE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        route = dict(METRIC_LABEL.findall(labels)).get('route')
+        if name == 'autorevise_http_request_duration_seconds_count':
+            totals[route][0] += float(value)
+        elif name == 'autorevise_http_request_db_statements_total':
+            totals[route][1] += float(value)
+    return totals
+
+# Endpoint labels used by the workload -> Flask route templates in /metrics
+ENDPOINT_ROUTES = {
+    'POST /login': '/login',
+    'GET /stats': '/stats',
+    'GET /study-session': '/study-session',
+    'POST /submit-review': '/submit-review',
+    'GET /mcq/study-session': '/mcq/study-session',
+    'POST /mcq/<id>/check': '/mcq/<int:mcq_id>/check',
+    'POST /logout': '/logout'
+}
+
+def summarize(recorder, elapsed, before, after):
+    endpoints = {}
+    for label, samples in sorted(recorder.latencies.items()):
+        latencies_ms = np.array(samples) * 1000
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        summary = {
+            'requests': len(samples),
+            'errors': recorder.errors[label],
+            'throughput_rps': round(len(samples) / elapsed, 2),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2)
+        }
+        route = ENDPOINT_ROUTES.get(label)
+        if before is not None and after is not None and route in after:
+            requests = after[route][0] - before.get(route, (0, 0))[0]
+            statements = after[route][1] - before.get(route, (0, 0))[1]
+            if requests:
+                summary['db_statements_per_request'] = round(statements / requests, 2)
+        endpoints[label] = summary
+
+    total = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        'duration_s': round(elapsed, 2),
+        'total_requests': total,
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0,
+        'endpoints': endpoints
+    }
+
+def print_summary(result):
+    print(f"\n{'Endpoint':<26} {'Reqs':>7} {'Err':>5} {'RPS':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'DB/req':>7}")
+    print("-" * 83)
+    for label, row in result['endpoints'].items():
+        print(f"{label:<26} {row['requests']:>7} {row['errors']:>5} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+              f"{row.get('db_statements_per_request', '-'):>7}")
+    print("-" * 83)
+    print(f"Total: {result['total_requests']} requests in {result['duration_s']}s "
+          f"({result['throughput_rps']} req/s)")
+
+def compare(result, baseline, tolerance):
+    """Print p95 and DB statement changes against a baseline; returns the regressed endpoints"""
+    regressions = []
+    print(f"\n{'Endpoint':<26} {'p95 base':>10} {'p95 now':>10} {'change':>8} {'DB base':>8} {'DB now':>8}")
+    print("-" * 75)
+    for label, row in result['endpoints'].items():
+        base = baseline['endpoints'].get(label)
+        if not base:
+            continue
+        change = (row['p95_ms'] - base['p95_ms']) / base['p95_ms'] if base['p95_ms'] else 0
+        db_base = base.get('db_statements_per_request')
+        db_now = row.get('db_statements_per_request')
+        flag = ''
+        if change > tolerance or (db_base is not None and db_now is not None and db_now > db_base):
+            regressions.append(label)
+            flag = '  ⚠️'
+        print(f"{label:<26} {base['p95_ms']:>10.1f} {row['p95_ms']:>10.1f} {change:>+8.0%} "
+              f"{db_base if db_base is not None else '-':>8} {db_now if db_now is not None else '-':>8}{flag}")
+    return regressions
+
+def run(args):
+    connection = mysql.connector.connect(**DB_CONFIG)
+    try:
+        emails = seeded_emails(connection, args.users)
+    finally:
+        connection.close()
+    if not emails:
+        print("❌ No load test users found. Run 'python loadtest.py seed' first.")
+        return 1
+
+    if args.in_process:
+        from App1 import app
+        make_client = lambda: InProcessClient(app)
+    else:
+        make_client = lambda: HttpClient(args.url)
+
+    print("=" * 60)
+    print("Study Workflow Load Test")
+    print("=" * 60)
+    print(f"Target: {'in-process' if args.in_process else args.url}")
+    print(f"Virtual users: {args.vus}, users: {len(emails)}, "
+          f"duration: {args.duration}s" + (f", sessions per VU: {args.sessions}" if args.sessions else ""))
+
+    scraper = make_client()
+    before = scrape_db_statements(scraper)
+
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + args.duration
+    with ThreadPoolExecutor(max_workers=args.vus) as executor:
+        futures = [
+            executor.submit(
+                virtual_user, make_client, recorder, emails, index, deadline,
+                args.sessions, args.seed, args.cards, args.mcqs
+            )
+            for index in range(args.vus)
+        ]
+        sessions = sum(future.result() for future in futures)
+    elapsed = time.monotonic() - started
+
+    after = scrape_db_statements(scraper)
+    if after is None:
+        print("⚠️ /metrics unavailable; DB statement counts not reported")
+
+    result = summarize(recorder, elapsed, before, after)
+    result['config'] = {
+        'virtual_users': args.vus,
+        'users': len(emails),
+        'duration_s': args.duration,
+        'sessions': sessions,
+        'cards_per_session': args.cards,
+        'mcqs_per_session': args.mcqs,
+        'seed': args.seed,
+        'target': 'in-process' if args.in_process else args.url
+    }
+    print_summary(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n✅ Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print(f"\n⚠️ Regressed: {', '.join(regressions)}")
+            return 1
+        print("\n✅ No regressions against the baseline")
+
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed synthetic data and load test the study workflow")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help="Create synthetic users, decks, cards and MCQs")
+    seed_parser.add_argument('--users', type=int, default=50, help="Users to create (default 50)")
+    seed_parser.add_argument('--decks', type=int, default=2, help="Decks per user (default 2)")
+    seed_parser.add_argument('--cards', type=int, default=200, help="Cards per deck (default 200)")
+    seed_parser.add_argument('--mcqs', type=int, default=20, help="MCQs per deck (default 20)")
+    seed_parser.add_argument('--seed', type=int, default=1, help="Random seed (default 1)")
+
+    run_parser = commands.add_parser('run', help="Drive concurrent study sessions")
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default='http://127.0.0.1:5000', help="Server to test (default http://127.0.0.1:5000)")
+    target.add_argument('--in-process', action='store_true', help="Call App1 through Flask's test client instead")
+    run_parser.add_argument('--vus', type=int, default=10, help="Concurrent virtual users (default 10)")
+    run_parser.add_argument('--users', type=int, default=1000, help="At most this many seeded users to log in as")
+    run_parser.add_argument('--duration', type=float, default=30, help="Seconds to run (default 30)")
+    run_parser.add_argument('--sessions', type=int, default=0, help="Stop each VU after N sessions (0 = run for --duration)")
+    run_parser.add_argument('--cards', type=int, default=20, help="Cards reviewed per session (default 20)")
+    run_parser.add_argument('--mcqs', type=int, default=10, help="MCQs answered per session (default 10)")
+    run_parser.add_argument('--seed', type=int, default=1, help="Random seed (default 1)")
+    run_parser.add_argument('--save-baseline', metavar='PATH', help="Write the results as a baseline JSON")
+    run_parser.add_argument('--compare', metavar='PATH', help="Compare against a saved baseline")
+    run_parser.add_argument('--tolerance', type=float, default=0.2,
+                            help="Allowed p95 increase before flagging a regression (default 0.2 = 20%%)")
+
+    commands.add_parser('cleanup', help="Delete all synthetic users and their data")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'run':
+            return run(args)
+
+        connection = mysql.connector.connect(**DB_CONFIG)
+        try:
+            if args.command == 'seed':
+                started = time.perf_counter()
+                created = seed(connection, args.users, args.decks, args.cards, args.mcqs, args.seed)
+                print(f"✅ Seeded {created} users x {args.decks} decks x {args.cards} cards / {args.mcqs} MCQs "
+                      f"in {time.perf_counter() - started:.1f}s")
+            else:
+                print(f"✅ Deleted {cleanup(connection)} load test users")
+        finally:
+            connection.close()
+        return 0
+
+    except Error as e:
+        print(f"❌ Database error: {e}")
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,16 @@
 """
 Make a user admin
-Quick script to grant admin privileges to a user
+Quick script to grant (or, with --revoke, remove) admin privileges
 """
 
+import argparse
 import mysql.connector
 from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 
+from App1 import invalidate_admin_status
+
 # Load environment variables
 load_dotenv()
 
@@ -38,6 +41,7 @@ def make_user_admin(user_id):
         # Update user to admin
         cursor.execute("UPDATE Users SET is_admin = TRUE WHERE user_id = %s", (user_id,))
         connection.commit()
+        invalidate_admin_status()
         
         print(f"✅ User {user[1]} (ID: {user_id}) is now an admin!")
         
@@ -52,6 +56,36 @@ def make_user_admin(user_id):
             cursor.close()
             connection.close()
 
+def revoke_user_admin(user_id):
+    """Remove admin privileges from a user"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+        
+        cursor.execute("UPDATE Users SET is_admin = FALSE WHERE user_id = %s AND is_admin", (user_id,))
+        revoked = cursor.rowcount
+        connection.commit()
+        
+        if not revoked:
+            print(f"❌ User with ID {user_id} not found or not an admin!")
+            return False
+        
+        # Running app processes stop honouring the old status right away
+        invalidate_admin_status()
+        
+        print(f"✅ User ID {user_id} is no longer an admin")
+        
+        return True
+        
+    except Error as e:
+        print(f"❌ Database error: {e}")
+        return False
+    
+    finally:
+        if 'connection' in locals() and connection.is_connected():
+            cursor.close()
+            connection.close()
+
 def list_all_users():
     """List all users in the database"""
     try:
@@ -82,6 +116,13 @@ def list_all_users():
             connection.close()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Grant or revoke admin privileges")
+    parser.add_argument('--revoke', type=int, metavar='USER_ID', help="Remove admin privileges from this user")
+    args = parser.parse_args()
+    
+    if args.revoke is not None:
+        exit(0 if revoke_user_admin(args.revoke) else 1)
+    
     print("=" * 60)
     print("Make User Admin Script")
     print("=" * 60)
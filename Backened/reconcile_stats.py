@@ -0,0 +1,189 @@
+"""
+Reconcile per-user statistics rollups
+Recomputes UserStats and UserDueHistogram from the source tables in bulk,
+reports drift and optionally rewrites the rows that drifted
+"""
+
+import argparse
+from collections import defaultdict
+import mysql.connector
+from mysql.connector import Error
+import os
+from dotenv import load_dotenv
+
+from App1 import rebuild_user_stats
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'database': os.environ.get('DB_NAME', 'autorevise_db')
+}
+
+STAT_COLUMNS = ('total_decks', 'total_cards', 'reviewed_cards')
+
+def expected_stats(cursor, low, high):
+    """Rollup values computed from the source tables for user_id in [low, high)"""
+    cursor.execute("""
+        SELECT
+            u.user_id,
+            COALESCE(dk.total, 0) as total_decks,
+            COALESCE(cd.total, 0) as total_cards,
+            COALESCE(rv.total, 0) as reviewed_cards
+        FROM Users u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) as total FROM Decks
+            WHERE user_id >= %s AND user_id < %s GROUP BY user_id
+        ) dk ON dk.user_id = u.user_id
+        LEFT JOIN (
+            SELECT d.user_id, COUNT(*) as total FROM Cards c
+            JOIN Decks d ON c.deck_id = d.deck_id
+            WHERE d.user_id >= %s AND d.user_id < %s GROUP BY d.user_id
+        ) cd ON cd.user_id = u.user_id
+        LEFT JOIN (
+            SELECT cp.user_id, COUNT(*) as total FROM CardPerformance cp
+            JOIN Cards c ON cp.card_id = c.card_id
+            JOIN Decks d ON c.deck_id = d.deck_id AND d.user_id = cp.user_id
+            WHERE cp.user_id >= %s AND cp.user_id < %s GROUP BY cp.user_id
+        ) rv ON rv.user_id = u.user_id
+        WHERE u.user_id >= %s AND u.user_id < %s
+    """, (low, high) * 4)
+    return {row['user_id']: row for row in cursor.fetchall()}
+
+def stored_stats(cursor, low, high):
+    cursor.execute(f"""
+        SELECT user_id, {', '.join(STAT_COLUMNS)}
+        FROM UserStats
+        WHERE user_id >= %s AND user_id < %s
+    """, (low, high))
+    return {row['user_id']: row for row in cursor.fetchall()}
+
+def expected_histograms(cursor, low, high):
+    """user_id -> {due_date: (cards, mcqs)} computed from the performance tables"""
+    cursor.execute("""
+        SELECT user_id, due_date, SUM(card_count) as card_count, SUM(mcq_count) as mcq_count FROM (
+            SELECT user_id, next_review_date as due_date, COUNT(*) as card_count, 0 as mcq_count
+            FROM CardPerformance
+            WHERE user_id >= %s AND user_id < %s
+            GROUP BY user_id, next_review_date
+            UNION ALL
+            SELECT user_id, next_review_date, 0, COUNT(*)
+            FROM MCQ_Performance
+            WHERE user_id >= %s AND user_id < %s AND next_review_date IS NOT NULL
+            GROUP BY user_id, next_review_date
+        ) due
+        GROUP BY user_id, due_date
+    """, (low, high) * 2)
+    histograms = defaultdict(dict)
+    for row in cursor.fetchall():
+        histograms[row['user_id']][row['due_date']] = (int(row['card_count']), int(row['mcq_count']))
+    return histograms
+
+def stored_histograms(cursor, low, high):
+    cursor.execute("""
+        SELECT user_id, due_date, card_count, mcq_count
+        FROM UserDueHistogram
+        WHERE user_id >= %s AND user_id < %s AND (card_count <> 0 OR mcq_count <> 0)
+    """, (low, high))
+    histograms = defaultdict(dict)
+    for row in cursor.fetchall():
+        histograms[row['user_id']][row['due_date']] = (row['card_count'], row['mcq_count'])
+    return histograms
+
+def reconcile(connection, batch_size, fix, verbose):
+    cursor = connection.cursor(dictionary=True)
+
+    cursor.execute("SELECT COALESCE(MIN(user_id), 0) as low, COALESCE(MAX(user_id), 0) as high FROM Users")
+    bounds = cursor.fetchone()
+
+    checked = 0
+    missing = 0
+    drifted = 0
+    fixed = 0
+
+    for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+        high = low + batch_size
+        expected = expected_stats(cursor, low, high)
+        stored = stored_stats(cursor, low, high)
+        expected_hist = expected_histograms(cursor, low, high)
+        stored_hist = stored_histograms(cursor, low, high)
+
+        to_fix = []
+        for user_id, row in expected.items():
+            checked += 1
+            current = stored.get(user_id)
+
+            if current is None:
+                missing += 1
+                to_fix.append(user_id)
+                if verbose:
+                    print(f"  User {user_id}: no rollup row")
+                continue
+
+            differences = [
+                f"{column} {current[column]} -> {row[column]}"
+                for column in STAT_COLUMNS if current[column] != row[column]
+            ]
+            if expected_hist.get(user_id, {}) != stored_hist.get(user_id, {}):
+                differences.append("due histogram")
+
+            if differences:
+                drifted += 1
+                to_fix.append(user_id)
+                if verbose:
+                    print(f"  User {user_id}: {', '.join(differences)}")
+
+        if fix and to_fix:
+            for user_id in to_fix:
+                rebuild_user_stats(cursor, user_id)
+            connection.commit()
+            fixed += len(to_fix)
+
+    if fix:
+        # Dates whose count has dropped to zero are no longer needed
+        cursor.execute("DELETE FROM UserDueHistogram WHERE card_count = 0 AND mcq_count = 0")
+        connection.commit()
+
+    cursor.close()
+    return checked, missing, drifted, fixed
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute per-user statistics rollups and report drift")
+    parser.add_argument('--fix', action='store_true', help="Rewrite rollups that are missing or drifted")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Users per batch (default 1000)")
+    parser.add_argument('--verbose', action='store_true', help="Print every drifted user")
+    args = parser.parse_args()
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+
+        print("=" * 60)
+        print("User Statistics Reconciliation")
+        print("=" * 60)
+
+        checked, missing, drifted, fixed = reconcile(connection, args.batch_size, args.fix, args.verbose)
+
+        print(f"\nUsers checked:       {checked}")
+        print(f"Missing rollups:     {missing}")
+        print(f"Drifted rollups:     {drifted}")
+        if args.fix:
+            print(f"Rollups rebuilt:     {fixed}")
+        elif missing or drifted:
+            print("\nRun with --fix to rebuild them.")
+
+        if not missing and not drifted:
+            print("\n✅ All rollups match the source tables")
+
+    except Error as e:
+        print(f"❌ Database error: {e}")
+
+    finally:
+        if 'connection' in locals() and connection.is_connected():
+            connection.close()
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@ from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 
+from App1 import invalidate_mcq_categories
+
 # Load environment variables
 load_dotenv()
 
@@ -190,6 +192,9 @@ def main():
         for cat in categories:
             print(f"  • {cat[0]}")
         
+        # Running app processes rebuild their category catalog
+        invalidate_mcq_categories()
+        
         print("\n" + "="*60)
         print("✓ MCQ CATEGORIES SCHEMA UPDATE COMPLETE!")
         print("="*60)
@@ -8,6 +8,8 @@ from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 
+from App1 import invalidate_mcq_categories
+
 # Load environment variables
 load_dotenv()
 
@@ -52,6 +54,9 @@ def run_sql_file(filename):
         
         # Commit changes
         connection.commit()
+        
+        # Running app processes rebuild their category catalog
+        invalidate_mcq_categories()
         print(f"\n✅ Successfully executed all statements!")
         print(f"✅ MCQ tables created successfully!")
         
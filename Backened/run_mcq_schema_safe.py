@@ -7,6 +7,8 @@ from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 
+from App1 import invalidate_mcq_categories
+
 # Load environment variables
 load_dotenv()
 
@@ -138,6 +140,9 @@ def run_safe_schema_update():
         # Commit all changes
         connection.commit()
         
+        # Running app processes rebuild their category catalog
+        invalidate_mcq_categories()
+        
         print("\n" + "=" * 60)
         print("✅ MCQ Schema Update Completed Successfully!")
         print("=" * 60)
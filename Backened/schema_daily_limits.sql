@@ -0,0 +1,17 @@
+-- ============================================================================
+-- AutoRevise Database - Daily Study Limits
+-- ============================================================================
+-- Purpose: Count first-time card reviews per day so study sessions can cap
+--          new cards (DAILY_NEW_CARD_LIMIT) separately from reviews
+--          (DAILY_REVIEW_LIMIT)
+-- Run this after schema2.sql
+-- ============================================================================
+
+USE autorevise_db;
+
+-- Incremented by the same StudyLog upsert as cards_reviewed; days logged
+-- before this column existed count as having no new cards
+ALTER TABLE StudyLog
+    ADD COLUMN new_cards_reviewed INT NOT NULL DEFAULT 0 AFTER cards_reviewed;
+
+SELECT 'StudyLog.new_cards_reviewed added successfully!' AS Status;
@@ -0,0 +1,17 @@
+-- ============================================================================
+-- AutoRevise Database - Deck Version Counters
+-- ============================================================================
+-- Purpose: Cheap validator for conditional GETs of a deck's card listing
+--          (ETag / If-None-Match on GET /decks/<deck_id>/cards)
+-- Run this after schema2.sql
+-- ============================================================================
+
+USE autorevise_db;
+
+-- Bumped in the same transaction as every write that changes what the
+-- deck's card listing shows: card create, edit, delete, bulk upload and
+-- reviews of the deck's cards
+ALTER TABLE Decks
+ADD COLUMN version BIGINT NOT NULL DEFAULT 0;
+
+SELECT 'Decks.version column added successfully!' AS Status;
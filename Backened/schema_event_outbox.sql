@@ -0,0 +1,37 @@
+-- ============================================================================
+-- AutoRevise Database - Event Outbox
+-- ============================================================================
+-- Purpose: Durable queue of domain events (deck created, cards added,
+--          review submitted, streak changed) that the app's background
+--          workers use to award achievements off the request path
+-- Run this after schema2.sql
+-- ============================================================================
+
+USE autorevise_db;
+
+-- Rows are written in the same transaction as the change that caused them
+-- and deleted once processed. A worker claims a batch by stamping it with
+-- its claim_token; the claim expires at claimed_until so events held by a
+-- crashed process are picked up again. Rows whose attempts reached
+-- EVENT_MAX_ATTEMPTS stay in the table for inspection.
+CREATE TABLE IF NOT EXISTS EventOutbox (
+    event_id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    user_id INT NOT NULL,
+    event_type VARCHAR(32) NOT NULL,
+    created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    claim_token CHAR(32) NULL,
+    claimed_until TIMESTAMP(3) NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    INDEX idx_outbox_claim_token (claim_token),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- Achievements awarded in the background are reported once through
+-- /achievements/notifications (or /check-achievements), then marked seen
+ALTER TABLE UserAchievements
+ADD COLUMN seen_at TIMESTAMP NULL DEFAULT NULL;
+
+-- Achievements earned before this column existed count as already seen
+UPDATE UserAchievements SET seen_at = earned_at WHERE seen_at IS NULL;
+
+SELECT 'EventOutbox table created successfully!' AS Status;
@@ -0,0 +1,27 @@
+-- ============================================================================
+-- AutoRevise Database - MCQ Due Counts for the Review Forecast
+-- ============================================================================
+-- Purpose: Count each user's scheduled MCQs per day next to their cards, so
+--          /forecast reads one histogram instead of scanning CardPerformance
+--          and MCQ_Performance
+-- Run this after schema_user_stats.sql; afterwards reconcile_stats.py
+-- also checks the MCQ counts
+-- ============================================================================
+
+USE autorevise_db;
+
+-- Adjusted with the MCQ_Performance write in /mcq/<id>/check
+ALTER TABLE UserDueHistogram
+    ADD COLUMN mcq_count INT NOT NULL DEFAULT 0 AFTER card_count;
+
+-- Fill in MCQ counts for users whose rollup is already built; the others
+-- get them when their rollup is built
+INSERT INTO UserDueHistogram (user_id, due_date, card_count, mcq_count)
+SELECT p.user_id, p.next_review_date, 0, COUNT(*)
+FROM MCQ_Performance p
+JOIN UserStats s ON s.user_id = p.user_id
+WHERE p.next_review_date IS NOT NULL
+GROUP BY p.user_id, p.next_review_date
+ON DUPLICATE KEY UPDATE mcq_count = VALUES(mcq_count);
+
+SELECT 'UserDueHistogram.mcq_count added successfully!' AS Status;
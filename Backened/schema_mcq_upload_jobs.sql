@@ -0,0 +1,33 @@
+-- ============================================================================
+-- AutoRevise Database - Background MCQ Upload Jobs
+-- ============================================================================
+-- Purpose: Track MCQ CSV imports that run as background jobs: status and
+--          progress on MCQ_Upload_Log, and the full per-row error report
+-- Run this after schema_mcq_update.sql and schema_mcq_categories.sql
+-- ============================================================================
+
+USE autorevise_db;
+
+-- Existing log rows describe finished uploads, hence the 'completed' default
+-- total_questions / successful_imports / failed_imports are updated after
+-- every chunk while the job runs; heartbeat_at is refreshed with them, and
+-- jobs whose heartbeat is older than MCQ_IMPORT_STALE_SECONDS are marked
+-- failed (their process was restarted)
+ALTER TABLE MCQ_Upload_Log
+ADD COLUMN status ENUM('queued', 'running', 'completed', 'failed') NOT NULL DEFAULT 'completed',
+ADD COLUMN message VARCHAR(255) NULL,
+ADD COLUMN started_at TIMESTAMP NULL,
+ADD COLUMN finished_at TIMESTAMP NULL,
+ADD COLUMN heartbeat_at TIMESTAMP NULL;
+
+-- One row per rejected CSV row (row_num counts the header as row 1)
+CREATE TABLE IF NOT EXISTS MCQ_Upload_Errors (
+    upload_id INT NOT NULL,
+    row_num INT NOT NULL,
+    error VARCHAR(500) NOT NULL,
+    row_data JSON NULL,
+    PRIMARY KEY (upload_id, row_num),
+    FOREIGN KEY (upload_id) REFERENCES MCQ_Upload_Log(upload_id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+SELECT 'MCQ upload job tables created successfully!' AS Status;
@@ -0,0 +1,24 @@
+-- ============================================================================
+-- AutoRevise Database - Keyset Pagination Indexes
+-- ============================================================================
+-- Purpose: Support newest-first (created_at, id) paging of card and MCQ
+--          listings so each page is a short index range scan
+-- Run this after schema_mcq_categories.sql
+-- ============================================================================
+
+USE autorevise_db;
+
+-- Used in: get_cards (GET /decks/<deck_id>/cards)
+CREATE INDEX idx_cards_deck_created
+ON Cards(deck_id, created_at, card_id);
+
+-- Used in: get_deck_mcqs (GET /mcq/deck/<deck_id>)
+CREATE INDEX idx_mcq_deck_created
+ON MCQ_Questions(deck_id, created_at, mcq_id);
+
+-- Used in: get_mcqs_by_category (GET /mcq/category/<category_id>)
+CREATE INDEX idx_mcq_category_created
+ON MCQ_Questions(category_id, created_at, mcq_id);
+
+SHOW INDEXES FROM Cards;
+SHOW INDEXES FROM MCQ_Questions;
@@ -0,0 +1,29 @@
+-- ============================================================================
+-- AutoRevise Database - Points Ledger
+-- ============================================================================
+-- Purpose: Append-only history of points earned (reviews, correct MCQ
+--          answers, achievements). Writers insert here instead of updating
+--          Users.points; the app's background aggregator folds entries into
+--          Users.points, and reads add the entries not folded yet
+-- Run this after schema2.sql
+-- ============================================================================
+
+USE autorevise_db;
+
+-- reason: 'review' (reference_id = card_id), 'mcq' (mcq_id),
+-- 'achievement' (achievement_id, or NULL for a combined entry)
+CREATE TABLE IF NOT EXISTS PointsLedger (
+    entry_id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    user_id INT NOT NULL,
+    points INT NOT NULL,
+    reason VARCHAR(16) NOT NULL,
+    reference_id INT NULL,
+    created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    folded BOOLEAN NOT NULL DEFAULT FALSE,
+    -- Unfolded tail per user (reads) and oldest unfolded entries (aggregator)
+    INDEX idx_ledger_user_folded (user_id, folded),
+    INDEX idx_ledger_folded (folded, entry_id),
+    -- /points/history keyset pagination
+    INDEX idx_ledger_user_created (user_id, created_at, entry_id),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+) ENGINE=InnoDB;
@@ -0,0 +1,49 @@
+-- ============================================================================
+-- AutoRevise Database - Review Log
+-- ============================================================================
+-- Purpose: Append-only history of every card review and MCQ answer, for
+--          analytics. CardPerformance / MCQ_Performance keep only the
+--          current state; this table keeps how it got there
+-- Run this after schema2.sql
+-- ============================================================================
+
+USE autorevise_db;
+
+-- Range-partitioned by month so old months can be exported and dropped
+-- cheaply (archive_review_log.py, which also adds partitions ahead of time;
+-- rows past the last month land in pmax until then).
+-- Partitioned tables cannot have foreign keys, and the partitioning column
+-- must be part of the primary key.
+--
+-- rating = 0 forgot, 1 hard, 2 good, 3 easy for both item types; MCQs log
+-- 2 (good) when answered correctly and 0 (forgot) when wrong.
+-- item_type 'card': item_id = card_id, intervals in days and the new ease
+--                   factor (SM-2)
+-- item_type 'mcq':  item_id = mcq_id, intervals and ease factor as for cards
+--                   (rows written before schema_schedulers.sql only have
+--                   new_interval)
+CREATE TABLE IF NOT EXISTS ReviewLog (
+    review_id BIGINT NOT NULL AUTO_INCREMENT,
+    reviewed_at DATETIME(3) NOT NULL,
+    user_id INT NOT NULL,
+    item_type ENUM('card', 'mcq') NOT NULL,
+    item_id INT NOT NULL,
+    rating TINYINT NOT NULL,
+    prev_interval INT NULL,
+    new_interval INT NULL,
+    ease_factor DECIMAL(4,2) NULL,
+    response_ms INT NULL,
+    PRIMARY KEY (review_id, reviewed_at),
+    INDEX idx_review_log_user (user_id, reviewed_at),
+    INDEX idx_review_log_item (item_type, item_id, reviewed_at)
+) ENGINE=InnoDB
+PARTITION BY RANGE COLUMNS (reviewed_at) (
+    PARTITION p202610 VALUES LESS THAN ('2026-11-01'),
+    PARTITION p202611 VALUES LESS THAN ('2026-12-01'),
+    PARTITION p202612 VALUES LESS THAN ('2027-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+-- MCQ answers used to be logged as 1 (correct) / 0 (wrong); move correct
+-- answers onto the shared scale. MCQs never log 1 now, so this is safe to re-run.
+UPDATE ReviewLog SET rating = 2 WHERE item_type = 'mcq' AND rating = 1;
@@ -0,0 +1,55 @@
+-- ============================================================================
+-- AutoRevise Database - Pluggable Schedulers
+-- ============================================================================
+-- Purpose: Store FSRS memory state next to the SM-2 state, give MCQs the
+--          same scheduling columns as cards, let users and decks choose a
+--          scheduler, and keep per-user FSRS weights fitted by
+--          fit_scheduler.py
+-- Run this after schema2.sql and schema_mcq_update.sql
+-- ============================================================================
+
+USE autorevise_db;
+
+-- ============================================================================
+-- 1. MEMORY STATE
+-- ============================================================================
+
+-- NULL until the item is first reviewed with FSRS
+ALTER TABLE CardPerformance
+    ADD COLUMN stability DOUBLE NULL AFTER ease_factor,
+    ADD COLUMN difficulty DOUBLE NULL AFTER stability;
+
+-- NULL for MCQs last answered before this migration; the interval is then
+-- taken from last_attempt_date and next_review_date
+ALTER TABLE MCQ_Performance
+    ADD COLUMN `interval` INT NULL AFTER next_review_date,
+    ADD COLUMN ease_factor DECIMAL(4,2) NULL AFTER `interval`,
+    ADD COLUMN stability DOUBLE NULL AFTER ease_factor,
+    ADD COLUMN difficulty DOUBLE NULL AFTER stability;
+
+-- ============================================================================
+-- 2. SCHEDULER CHOICE
+-- ============================================================================
+
+-- 'sm2' or 'fsrs'; NULL inherits (deck -> user -> DEFAULT_SCHEDULER)
+ALTER TABLE Users ADD COLUMN scheduler VARCHAR(16) NULL;
+ALTER TABLE Decks ADD COLUMN scheduler VARCHAR(16) NULL;
+
+-- ============================================================================
+-- 3. FITTED PARAMETERS
+-- ============================================================================
+
+-- weights: JSON array of the 17 FSRS weights fitted from the user's ReviewLog
+-- log_loss / baseline_log_loss: recall prediction loss of the fitted and the
+-- default weights on the same reviews
+CREATE TABLE IF NOT EXISTS SchedulerParameters (
+    user_id INT PRIMARY KEY,
+    weights TEXT NOT NULL,
+    review_count INT NOT NULL,
+    log_loss DOUBLE NOT NULL,
+    baseline_log_loss DOUBLE NOT NULL,
+    fitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+SELECT 'Scheduler tables and columns created successfully!' AS Status;
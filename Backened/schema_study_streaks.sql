@@ -0,0 +1,24 @@
+-- ============================================================================
+-- AutoRevise Database - Study Streak State
+-- ============================================================================
+-- Purpose: Keep each user's streak next to StudyLog so reads and
+--          achievement checks no longer walk the full StudyLog history
+-- Run this after schema2.sql, then run backfill_streaks.py once to derive
+-- streaks for existing users
+-- ============================================================================
+
+USE autorevise_db;
+
+-- Updated together with the daily StudyLog upsert
+-- current_streak is the length of the run of consecutive study days ending
+-- on last_study_date; it only counts as "current" while last_study_date is
+-- today or yesterday
+CREATE TABLE IF NOT EXISTS StudyStreaks (
+    user_id INT PRIMARY KEY,
+    current_streak INT NOT NULL DEFAULT 0,
+    longest_streak INT NOT NULL DEFAULT 0,
+    last_study_date DATE NULL,
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+SELECT 'StudyStreaks table created successfully!' AS Status;
@@ -0,0 +1,45 @@
+-- ============================================================================
+-- AutoRevise Database - Per-User Statistics Rollup
+-- ============================================================================
+-- Purpose: Keep dashboard statistics up to date on every write so /stats
+--          reads one row instead of running eight aggregate queries
+-- Run this after schema2.sql, then run reconcile_stats.py --fix once to
+-- populate rows for existing users (users without a row are also
+-- initialised lazily on their first /stats request)
+-- ============================================================================
+
+USE autorevise_db;
+
+-- ============================================================================
+-- 1. USERSTATS TABLE
+-- ============================================================================
+
+-- One row per user, adjusted in the same transaction as the write that
+-- changes it (deck/card create and delete, reviews)
+-- version is bumped on every adjustment; a missing row means "not yet
+-- initialised" and write paths leave the user alone until it is built
+CREATE TABLE IF NOT EXISTS UserStats (
+    user_id INT PRIMARY KEY,
+    total_decks INT NOT NULL DEFAULT 0,
+    total_cards INT NOT NULL DEFAULT 0,
+    reviewed_cards INT NOT NULL DEFAULT 0,   -- cards with a CardPerformance row
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- ============================================================================
+-- 2. USERDUEHISTOGRAM TABLE
+-- ============================================================================
+
+-- Number of the user's reviewed cards scheduled on each date
+-- Cards due today = SUM(card_count) for due_date <= today
+CREATE TABLE IF NOT EXISTS UserDueHistogram (
+    user_id INT NOT NULL,
+    due_date DATE NOT NULL,
+    card_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, due_date),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+SELECT 'User statistics rollup tables created successfully!' AS Status;
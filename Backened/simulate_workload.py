@@ -0,0 +1,134 @@
+"""
+Review workload simulator
+Projects daily review load from current CardPerformance state, for one user,
+one deck or the whole database (capacity planning)
+"""
+
+import argparse
+import mysql.connector
+from mysql.connector import Error
+import numpy as np
+import os
+import time
+from datetime import date, timedelta
+from dotenv import load_dotenv
+
+from App1 import DEFAULT_RATING_PROBABILITIES, RATING_NAMES, simulate_review_load
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD'),
+    'database': os.environ.get('DB_NAME', 'autorevise_db')
+}
+
+FETCH_SIZE = 50000
+
+def load_card_state(cursor, user_id=None, deck_id=None, include_new=True):
+    """Load (interval, ease, due_in_days) arrays, streaming rows in chunks"""
+    filters = []
+    params = []
+    if user_id:
+        filters.append("cp.user_id = %s")
+        params.append(user_id)
+    if deck_id:
+        filters.append("c.deck_id = %s")
+        params.append(deck_id)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+    cursor.execute(f"""
+        SELECT cp.interval, cp.ease_factor, DATEDIFF(cp.next_review_date, CURDATE())
+        FROM CardPerformance cp
+        JOIN Cards c ON cp.card_id = c.card_id
+        {where}
+    """, tuple(params))
+
+    chunks = []
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        chunks.append(np.array(rows, dtype=np.float64))
+    state = np.concatenate(chunks) if chunks else np.empty((0, 3))
+
+    new_cards = 0
+    if include_new:
+        # Cards the owner has never reviewed
+        filters = ["cp.card_id IS NULL"]
+        params = []
+        if user_id:
+            filters.append("d.user_id = %s")
+            params.append(user_id)
+        if deck_id:
+            filters.append("c.deck_id = %s")
+            params.append(deck_id)
+        cursor.execute(f"""
+            SELECT COUNT(*)
+            FROM Cards c
+            JOIN Decks d ON c.deck_id = d.deck_id
+            LEFT JOIN CardPerformance cp ON c.card_id = cp.card_id AND cp.user_id = d.user_id
+            WHERE {' AND '.join(filters)}
+        """, tuple(params))
+        new_cards = cursor.fetchone()[0]
+
+    intervals = np.concatenate([state[:, 0], np.zeros(new_cards)]).astype(np.int64)
+    eases = np.concatenate([state[:, 1], np.full(new_cards, 2.5)])
+    due_in = np.concatenate([state[:, 2], np.zeros(new_cards)]).astype(np.int64)
+    return intervals, eases, due_in
+
+def main():
+    parser = argparse.ArgumentParser(description="Project daily review load over the next N days")
+    parser.add_argument('--user-id', type=int, help="Only this user's cards")
+    parser.add_argument('--deck-id', type=int, help="Only this deck's cards")
+    parser.add_argument('--days', type=int, default=30, help="Days to project (default 30)")
+    parser.add_argument('--no-new', action='store_true', help="Ignore cards that were never reviewed")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for reproducible runs")
+    for name in RATING_NAMES:
+        parser.add_argument(f'--{name}', type=float, default=DEFAULT_RATING_PROBABILITIES[name],
+                            help=f"Probability of a '{name}' rating (default {DEFAULT_RATING_PROBABILITIES[name]})")
+    args = parser.parse_args()
+
+    rating_probabilities = {name: getattr(args, name) for name in RATING_NAMES}
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        started = time.perf_counter()
+        intervals, eases, due_in = load_card_state(cursor, args.user_id, args.deck_id, not args.no_new)
+        loaded = time.perf_counter()
+
+        load = simulate_review_load(intervals, eases, due_in, args.days, rating_probabilities, args.seed)
+        finished = time.perf_counter()
+
+        print("=" * 60)
+        print("Review Workload Projection")
+        print("=" * 60)
+        print(f"Cards simulated: {len(intervals):,}")
+        print(f"Rating distribution: {rating_probabilities}")
+        print(f"Load time: {loaded - started:.2f}s, simulation time: {finished - loaded:.2f}s\n")
+
+        today = date.today()
+        print(f"{'Date':<12} {'Reviews':>10}")
+        print("-" * 23)
+        for offset, count in enumerate(load):
+            print(f"{(today + timedelta(days=offset)).isoformat():<12} {count:>10,}")
+        print("-" * 23)
+        print(f"{'Total':<12} {load.sum():>10,}")
+        print(f"{'Peak':<12} {load.max():>10,}")
+        print(f"{'Mean':<12} {load.mean():>10,.1f}")
+
+    except Error as e:
+        print(f"❌ Database error: {e}")
+
+    finally:
+        if 'connection' in locals() and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+if __name__ == '__main__':
+    main()
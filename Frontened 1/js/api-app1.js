@@ -45,6 +45,29 @@ class AutoReviseAPI {
         return this.user;
     }
 
+    /**
+     * Cached GET response (body + ETag) for an endpoint, kept for the browser session
+     */
+    loadCachedResponse(endpoint) {
+        const entry = sessionStorage.getItem(`autorevise_etag:${endpoint}`);
+        return entry ? JSON.parse(entry) : null;
+    }
+
+    saveCachedResponse(endpoint, etag, body) {
+        try {
+            sessionStorage.setItem(`autorevise_etag:${endpoint}`, JSON.stringify({ etag, body }));
+        } catch (error) {
+            // Storage full: this response just won't be revalidated
+            sessionStorage.removeItem(`autorevise_etag:${endpoint}`);
+        }
+    }
+
+    clearCachedResponses() {
+        Object.keys(sessionStorage)
+            .filter(key => key.startsWith('autorevise_etag:'))
+            .forEach(key => sessionStorage.removeItem(key));
+    }
+
     /**
      * Make API request with error handling
      */
@@ -59,14 +82,32 @@ class AutoReviseAPI {
             ...options
         };
 
+        // Revalidate GETs we have a copy of; the server answers 304 if unchanged
+        const isGet = !config.method || config.method.toUpperCase() === 'GET';
+        const cached = isGet ? this.loadCachedResponse(endpoint) : null;
+        if (cached) {
+            config.headers = { ...config.headers, 'If-None-Match': cached.etag };
+        }
+
         try {
             const response = await fetch(url, config);
-            const data = await response.json();
+
+            if (response.status === 304 && cached) {
+                return JSON.parse(cached.body);
+            }
+
+            const body = await response.text();
+            const data = JSON.parse(body);
 
             if (!response.ok) {
                 throw new Error(data.error || `HTTP error! status: ${response.status}`);
             }
 
+            const etag = response.headers.get('ETag');
+            if (isGet && etag) {
+                this.saveCachedResponse(endpoint, etag, body);
+            }
+
             return data;
         } catch (error) {
             console.error('API Request Error:', error);
@@ -104,6 +145,7 @@ class AutoReviseAPI {
         });
         
         if (data.user) {
+            this.clearCachedResponses();
             this.saveUserToStorage(data.user);
         }
         
@@ -118,6 +160,7 @@ class AutoReviseAPI {
             await this.request('/logout', { method: 'POST' });
         } finally {
             this.saveUserToStorage(null);
+            this.clearCachedResponses();
         }
     }
 
@@ -169,15 +212,27 @@ class AutoReviseAPI {
         });
     }
 
+    /**
+     * Set a deck's scheduler ('sm2', 'fsrs', or null to use each reviewer's own)
+     */
+    async setDeckScheduler(deckId, scheduler) {
+        return await this.request(`/decks/${deckId}/scheduler`, {
+            method: 'PUT',
+            body: JSON.stringify({ scheduler })
+        });
+    }
+
     // ========================================
     // CARD ENDPOINTS
     // ========================================
 
     /**
-     * Get all cards in a deck
+     * Get a page of cards in a deck, newest first
+     * Pass the previous response's next_cursor to get the following page
      */
-    async getCards(deckId) {
-        return await this.request(`/decks/${deckId}/cards`);
+    async getCards(deckId, cursor = null) {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        return await this.request(`/decks/${deckId}/cards${query}`);
     }
 
     /**
@@ -225,6 +280,28 @@ class AutoReviseAPI {
         });
     }
 
+    /**
+     * Upload a CSV file of cards (parsed on the server in chunks)
+     */
+    async uploadCardsCsv(deckId, file) {
+        const formData = new FormData();
+        formData.append('file', file);
+
+        // Not this.request(): the browser must set the multipart Content-Type
+        const response = await fetch(`${this.baseURL}/decks/${deckId}/upload-cards`, {
+            method: 'POST',
+            credentials: 'include',
+            body: formData
+        });
+        const data = await response.json();
+
+        if (!response.ok) {
+            throw new Error(data.error || `HTTP error! status: ${response.status}`);
+        }
+
+        return data;
+    }
+
     // ========================================
     // STUDY SESSION ENDPOINTS
     // ========================================
@@ -253,6 +330,18 @@ class AutoReviseAPI {
         });
     }
 
+    /**
+     * Submit several card reviews in one request
+     * reviews: [{ card_id, rating, response_ms }, ...]
+     */
+    async submitReviews(reviews, options = {}) {
+        return await this.request('/submit-reviews', {
+            method: 'POST',
+            body: JSON.stringify({ reviews }),
+            ...options
+        });
+    }
+
     // ========================================
     // STATISTICS ENDPOINTS
     // ========================================
@@ -264,6 +353,38 @@ class AutoReviseAPI {
         return await this.request('/stats');
     }
 
+    /**
+     * The user's scheduler and fitted FSRS parameters
+     */
+    async getScheduler() {
+        return await this.request('/scheduler');
+    }
+
+    /**
+     * Set the user's scheduler ('sm2', 'fsrs', or null for the server default)
+     */
+    async setScheduler(scheduler) {
+        return await this.request('/scheduler', {
+            method: 'PUT',
+            body: JSON.stringify({ scheduler })
+        });
+    }
+
+    /**
+     * Cards and MCQs due on each of the next `days` days (at most 365)
+     */
+    async getForecast(days = 30) {
+        return await this.request(`/forecast?days=${days}`);
+    }
+
+    /**
+     * Points earned, newest first (pass next_cursor for the next page)
+     */
+    async getPointsHistory(cursor = null) {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        return await this.request(`/points/history${query}`);
+    }
+
     // ========================================
     // ACHIEVEMENTS ENDPOINTS
     // ========================================
@@ -283,6 +404,13 @@ class AutoReviseAPI {
             method: 'POST'
         });
     }
+
+    /**
+     * Achievements earned in the background since the last call
+     */
+    async getAchievementNotifications() {
+        return await this.request('/achievements/notifications');
+    }
 }
 
 // Create global API instance
@@ -12,6 +12,7 @@ if (!deckId) {
 // State
 let currentDeck = null;
 let cards = [];
+let nextCardsCursor = null;
 let currentEditingCardId = null;
 let currentDeletingCardId = null;
 
@@ -59,6 +60,7 @@ async function loadCards() {
         // Load cards
         const response = await api.getCards(deckId);
         cards = response.cards || [];
+        nextCardsCursor = response.next_cursor || null;
 
         // Hide loading state
         if (loadingState) {
@@ -103,6 +105,40 @@ function renderCards() {
         const cardElement = createCardElement(card, index + 1);
         cardsContainer.appendChild(cardElement);
     });
+
+    // Large decks are listed a page at a time
+    if (nextCardsCursor) {
+        const loadMoreBtn = document.createElement('button');
+        loadMoreBtn.className = 'btn btn-secondary';
+        loadMoreBtn.innerHTML = '<i class="fas fa-chevron-down"></i> Load more cards';
+        loadMoreBtn.addEventListener('click', loadMoreCards);
+        cardsContainer.appendChild(loadMoreBtn);
+    }
+}
+
+// Load the next page of cards
+let loadingMoreCards = false;
+
+async function loadMoreCards(e) {
+    // currentTarget is the button even when the click lands on its icon
+    const loadMoreBtn = e.currentTarget;
+    if (loadingMoreCards) {
+        return;
+    }
+    loadingMoreCards = true;
+    loadMoreBtn.disabled = true;
+    try {
+        const response = await api.getCards(deckId, nextCardsCursor);
+        cards = cards.concat(response.cards || []);
+        nextCardsCursor = response.next_cursor || null;
+        updateCardCount();
+        renderCards();
+    } catch (error) {
+        console.error('Error loading more cards:', error);
+        loadMoreBtn.disabled = false;
+    } finally {
+        loadingMoreCards = false;
+    }
 }
 
 // Create card element
@@ -169,7 +205,9 @@ function capitalizeFirst(str) {
 
 // Update card count
 function updateCardCount() {
-    document.querySelector('.card-count').textContent = `${cards.length} card${cards.length !== 1 ? 's' : ''}`;
+    // Cards are loaded a page at a time; the deck carries the full count
+    const total = currentDeck && currentDeck.card_count != null ? currentDeck.card_count : cards.length;
+    document.querySelector('.card-count').textContent = `${total} card${total !== 1 ? 's' : ''}`;
 }
 
 // Open add card modal
@@ -330,6 +368,7 @@ document.addEventListener('keydown', (e) => {
 // ========================================
 
 let parsedCSVData = null;
+let selectedCSVFile = null;
 
 /**
  * Open CSV upload modal
@@ -341,6 +380,7 @@ function openUploadModal() {
     // Reset form
     form.reset();
     parsedCSVData = null;
+    selectedCSVFile = null;
     document.getElementById('uploadPreview').style.display = 'none';
     document.getElementById('uploadError').style.display = 'none';
     
@@ -357,6 +397,7 @@ function closeUploadModal() {
     modal.classList.remove('active');
     document.body.style.overflow = 'auto';
     parsedCSVData = null;
+    selectedCSVFile = null;
 }
 
 /**
@@ -450,12 +491,13 @@ document.getElementById('csvFile').addEventListener('change', async (e) => {
     errorDiv.style.display = 'none';
     previewDiv.style.display = 'none';
     parsedCSVData = null;
+    selectedCSVFile = null;
     
     if (!file) return;
     
-    // Check file size (5MB max)
-    if (file.size > 5 * 1024 * 1024) {
-        errorDiv.textContent = 'File size exceeds 5MB limit';
+    // Check file size (50MB max)
+    if (file.size > 50 * 1024 * 1024) {
+        errorDiv.textContent = 'File size exceeds 50MB limit';
         errorDiv.style.display = 'block';
         e.target.value = '';
         return;
@@ -475,6 +517,7 @@ document.getElementById('csvFile').addEventListener('change', async (e) => {
         
         // Parse CSV
         parsedCSVData = parseCSV(text);
+        selectedCSVFile = file;
         
         if (parsedCSVData.length === 0) {
             errorDiv.textContent = 'No valid cards found in CSV file';
@@ -522,7 +565,7 @@ document.getElementById('uploadForm').addEventListener('submit', async (e) => {
     const uploadBtn = document.getElementById('uploadBtn');
     const errorDiv = document.getElementById('uploadError');
     
-    if (!parsedCSVData || parsedCSVData.length === 0) {
+    if (!selectedCSVFile || !parsedCSVData || parsedCSVData.length === 0) {
         errorDiv.textContent = 'Please select a valid CSV file';
         errorDiv.style.display = 'block';
         return;
@@ -534,8 +577,8 @@ document.getElementById('uploadForm').addEventListener('submit', async (e) => {
     errorDiv.style.display = 'none';
     
     try {
-        // Upload cards
-        const response = await api.uploadCardsBulk(deckId, parsedCSVData);
+        // Upload the file itself; the server parses it as a stream
+        const response = await api.uploadCardsCsv(deckId, selectedCSVFile);
         
         // Show success message
         const successMsg = response.failed > 0
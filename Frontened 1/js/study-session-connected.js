@@ -17,6 +17,11 @@ let sessionStats = {
     points: 0
 };
 let startTime = Date.now();
+let cardShownAt = Date.now();
+
+// Ratings not yet sent to the backend; flushed in batches via /submit-reviews
+const REVIEW_BATCH_SIZE = 20;
+let pendingReviews = [];
 
 // Initialize study session
 async function initStudySession() {
@@ -86,6 +91,7 @@ function loadCard(index) {
     const card = dueCards[index];
     currentCardIndex = index;
     isFlipped = false;
+    cardShownAt = Date.now();
 
     // Update card content
     document.getElementById('questionText').textContent = card.front_content;
@@ -146,39 +152,56 @@ function flipCard() {
 }
 
 // Rate card
-async function rateCard(rating) {
+function rateCard(rating) {
     if (!isFlipped) return;
 
     const card = dueCards[currentCardIndex];
+    isFlipped = false;
 
-    try {
-        // Submit review to backend (pass card_id and rating as separate parameters)
-        await api.submitReview(card.card_id, rating);
+    // Queue the review; it is sent with the next batch
+    pendingReviews.push({ card_id: card.card_id, rating, response_ms: Date.now() - cardShownAt });
+    if (pendingReviews.length >= REVIEW_BATCH_SIZE) {
+        flushReviews();
+    }
 
-        // Update session stats
-        sessionStats.completed++;
-        sessionStats[rating]++;
-        
-        // Calculate points
-        const points = { forgot: 5, hard: 10, good: 15, easy: 20 };
-        sessionStats.points += points[rating];
+    // Update session stats
+    sessionStats.completed++;
+    sessionStats[rating]++;
+    
+    // Calculate points
+    const points = { forgot: 5, hard: 10, good: 15, easy: 20 };
+    sessionStats.points += points[rating];
 
-        // Update stats display
-        document.getElementById('cardsCompleted').textContent = sessionStats.completed;
-        document.getElementById('pointsEarned').textContent = sessionStats.points;
+    // Update stats display
+    document.getElementById('cardsCompleted').textContent = sessionStats.completed;
+    document.getElementById('pointsEarned').textContent = sessionStats.points;
 
-        // Slide out animation
-        const flashcard = document.getElementById('flashcard');
-        flashcard.classList.add('slide-out');
+    // Slide out animation
+    const flashcard = document.getElementById('flashcard');
+    flashcard.classList.add('slide-out');
 
-        setTimeout(() => {
-            // Load next card
-            loadCard(currentCardIndex + 1);
-        }, 400);
+    setTimeout(() => {
+        // Load next card
+        loadCard(currentCardIndex + 1);
+    }, 400);
+}
+
+// Send queued reviews to the backend in one request
+async function flushReviews(options = {}) {
+    if (pendingReviews.length === 0) return;
 
+    const batch = pendingReviews;
+    pendingReviews = [];
+
+    try {
+        await api.submitReviews(batch, options);
     } catch (error) {
-        console.error('Error submitting review:', error);
-        alert('Failed to submit review: ' + error.message);
+        console.error('Error submitting reviews:', error);
+        // Put the batch back so it is retried with the next flush
+        pendingReviews = batch.concat(pendingReviews);
+        if (!options.keepalive) {
+            alert('Failed to submit reviews: ' + error.message);
+        }
     }
 }
 
@@ -196,6 +219,8 @@ function updateProgress() {
 
 // Show session complete
 function showSessionComplete() {
+    flushReviews();
+
     const totalTime = Math.floor((Date.now() - startTime) / 1000);
     const minutes = Math.floor(totalTime / 60);
     const seconds = totalTime % 60;
@@ -293,5 +318,10 @@ document.addEventListener('DOMContentLoaded', () => {
     initStudySession();
 });
 
+// Send any remaining reviews if the page is closed mid-session
+window.addEventListener('pagehide', () => {
+    flushReviews({ keepalive: true });
+});
+
 // Make rateCard globally available
 window.rateCard = rateCard;